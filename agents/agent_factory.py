@@ -1,26 +1,54 @@
-
-
-
-
 # agents/agent_factory.py
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 from environment.grid import Grid
+from agents.agent_params import AgentParams
 from agents.pacman_agent import PacmanAgent
+from agents.route_agent import RoutePacmanAgent
+from agents.incremental_agent import IncrementalPacmanAgent
+from agents.remote_agent import RemotePacmanAgent
 from agents.ghost_agent import GhostAgent
+from agents.decision_cache import DecisionCache
+from agents.ghost_policies import GhostField, GHOST_POLICIES
 from config import settings
 
+# Pacman agent classes selectable by strategy name
+PACMAN_STRATEGIES = {
+    "greedy": PacmanAgent,
+    "route": RoutePacmanAgent,
+    "incremental": IncrementalPacmanAgent,
+    "remote": RemotePacmanAgent,
+}
+
 class AgentFactory:
-    def __init__(self, grid: Grid, colors: List[Tuple[int, int, int]]):
+    def __init__(self, grid: Grid, colors: List[Tuple[int, int, int]], decision_cache: Optional[DecisionCache] = None,
+                 pacman_params: Optional[AgentParams] = None):
         self.grid = grid
         self.colors = colors
+        self.decision_cache = decision_cache  # Given to every Pacman whose decisions can be cached
+        self.pacman_params = pacman_params  # Heuristic constants of every Pacman, None for the settings' ones
         self.color_index = 0
+        self.ghost_index = 0
+        self.ghost_field = GhostField(grid)  # Shared by all ghosts, updated once per tick by the game
 
-    def create_pacman_agent(self, flag_id: str) -> PacmanAgent:
-        """Create a Pacman agent with the next available color."""
+    def create_pacman_agent(self, flag_id: str, strategy: Optional[str] = None) -> PacmanAgent:
+        """Create a Pacman agent with the next available color.
+        strategy selects the agent class (see PACMAN_STRATEGIES), defaults to settings.PACMAN_STRATEGY."""
+        strategy = strategy or settings.PACMAN_STRATEGY
+        if strategy not in PACMAN_STRATEGIES:
+            raise ValueError(f"Unknown Pacman strategy '{strategy}', expected one of {sorted(PACMAN_STRATEGIES)}")
         color = self.colors[self.color_index % len(self.colors)]
         self.color_index += 1
-        return PacmanAgent(self.grid, flag_id, color)
+        agent = PACMAN_STRATEGIES[strategy](self.grid, flag_id, color, self.pacman_params)
+        if agent.cacheable:
+            agent.decision_cache = self.decision_cache
+        return agent
 
-    def create_ghost_agent(self) -> GhostAgent:
-        """Create a Ghost agent with the default ghost color."""
-        return GhostAgent(self.grid, settings.COLOR_GHOST)
\ No newline at end of file
+    def create_ghost_agent(self, policy: Optional[str] = None) -> GhostAgent:
+        """Create a Ghost agent with the default ghost color.
+        policy selects its behavior (see GHOST_POLICIES), defaults to cycling through settings.GHOST_POLICIES."""
+        policy = policy or settings.GHOST_POLICIES[self.ghost_index % len(settings.GHOST_POLICIES)]
+        if policy not in GHOST_POLICIES:
+            raise ValueError(f"Unknown ghost policy '{policy}', expected one of {sorted(GHOST_POLICIES)}")
+        agent = GhostAgent(self.grid, settings.COLOR_GHOST, GHOST_POLICIES[policy](), self.ghost_field, self.ghost_index)
+        self.ghost_index += 1
+        return agent
@@ -0,0 +1,72 @@
+# agents/agent_params.py
+import random
+from typing import Dict, List, Tuple
+from config import settings
+
+class AgentParams:
+    """
+    Heuristic constants of PacmanAgent as one parameter vector, so they can be
+    tuned (see logic/tuner.py) instead of edited by hand:
+
+    - distance_weight, safety_weight: weights of closeness to Pacman and
+      distance from ghosts when scoring food in find_safest_food
+    - threat_penalty: food score lost when a ghost may reach the food
+    - horizon: moves ahead ghosts are predicted (the "markov" forecast covers
+      at most 3)
+    - safe_lookahead: predicted ghost moves a cell must avoid to be safe
+    - move_lookahead: the same, for the next step of a path and escape moves
+    """
+    # Name: (default, low, high), integer parameters have integer bounds
+    SPACE: Dict[str, Tuple[float, float, float]] = {
+        "distance_weight": (0.6, 0.0, 1.0),
+        "safety_weight": (0.4, 0.0, 1.0),
+        "threat_penalty": (0.5, 0.0, 2.0),
+        "horizon": (3, 1, 5),
+        "safe_lookahead": (2, 1, 4),
+        "move_lookahead": (3, 1, 5),
+    }
+    NAMES = list(SPACE)
+
+    def __init__(self, **values):
+        for name in values:
+            if name not in self.SPACE:
+                raise ValueError(f"Unknown agent parameter '{name}', expected one of {self.NAMES}")
+        for name, (default, low, high) in self.SPACE.items():
+            value = values.get(name, default)
+            setattr(self, name, int(round(value)) if isinstance(default, int) else float(value))
+
+    @classmethod
+    def from_settings(cls) -> 'AgentParams':
+        """Defaults overridden by settings.PACMAN_PARAMS"""
+        return cls(**(settings.PACMAN_PARAMS or {}))
+
+    @classmethod
+    def from_vector(cls, vector: List[float]) -> 'AgentParams':
+        return cls(**dict(zip(cls.NAMES, vector)))
+
+    @classmethod
+    def sample(cls, rng: random.Random) -> 'AgentParams':
+        """Uniformly random parameters within the bounds"""
+        values = {}
+        for name, (default, low, high) in cls.SPACE.items():
+            values[name] = rng.randint(low, high) if isinstance(default, int) else rng.uniform(low, high)
+        return cls(**values)
+
+    def vector(self) -> List[float]:
+        return [getattr(self, name) for name in self.NAMES]
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(zip(self.NAMES, self.vector()))
+
+    def key(self) -> str:
+        """Stable text form, used in cache keys"""
+        return ",".join(f"{name}={value:.6g}" for name, value in self.as_dict().items())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, AgentParams) and self.vector() == other.vector()
+
+    def __hash__(self) -> int:
+        return hash(tuple(self.vector()))
+
+    def __repr__(self) -> str:
+        return f"AgentParams({', '.join(f'{name}={value!r}' for name, value in self.as_dict().items())})"
@@ -0,0 +1,233 @@
+# agents/decision_cache.py
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+import numpy as np
+from config import settings
+from environment import packed_arrays
+from environment.map_analysis import map_digest
+from agents.agent_params import AgentParams
+
+MAGIC = b"PACBOOK\n"
+VERSION = 1
+_MASK = (1 << 64) - 1
+_ACTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0), (0, 0)]
+
+# Everything PacmanAgent.decide changes, so a hit replays it exactly:
+# (action, decisions, good decisions, ghost encounters, path efficiency gained, path afterwards)
+Decision = Tuple[Tuple[int, int], int, int, int, float, Tuple[Tuple[int, int], ...]]
+
+
+class DecisionBook:
+    """
+    Read-only decision table sorted by key, looked up by binary search.
+    It lives in a buffer no process writes to: a memory-mapped file (pages
+    shared through the OS cache) or a shared memory block workers attach to.
+    """
+
+    def __init__(self, buffer, owner=None):
+        self.header, data_start = packed_arrays.read_header(buffer, MAGIC)
+        arrays = packed_arrays.views(buffer, self.header, data_start)
+        self.keys = arrays["keys"]
+        self.actions = arrays["actions"]
+        self.counts = arrays["counts"]
+        self.efficiency = arrays["efficiency"]
+        self.path_start = arrays["path_start"]
+        self.path_cells = arrays["path_cells"]
+        self.width = self.header["width"]
+        self._owner = owner  # Keeps the shared memory block or memory map alive
+
+    @classmethod
+    def pack(cls, decisions: Dict[int, Decision], header: Dict[str, object]) -> bytearray:
+        keys = sorted(decisions)
+        width = header["width"]
+        paths = [decisions[key][5] for key in keys]
+        path_start = np.zeros(len(keys) + 1, dtype=np.int64)
+        path_start[1:] = np.cumsum([len(path) for path in paths])
+        return packed_arrays.pack(MAGIC, dict(header, version=VERSION), {
+            "keys": np.array(keys, dtype=np.uint64),
+            "actions": np.array([_ACTIONS.index(decisions[key][0]) for key in keys], dtype=np.int8),
+            "counts": np.array([decisions[key][1:4] for key in keys], dtype=np.int32).reshape(-1, 3),
+            "efficiency": np.array([decisions[key][4] for key in keys], dtype=np.float64),
+            "path_start": path_start,
+            "path_cells": np.array([y * width + x for path in paths for x, y in path], dtype=np.int32),
+        })
+
+    @classmethod
+    def load(cls, path: str) -> 'DecisionBook':
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        return cls(data, owner=data)
+
+    @classmethod
+    def attach(cls, name: str) -> 'DecisionBook':
+        """Map a book another process placed in shared memory with DecisionCache.share()"""
+        block = packed_arrays.attach(name)
+        return cls(block.buf, owner=block)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, key: int) -> Optional[Decision]:
+        i = int(np.searchsorted(self.keys, np.uint64(key)))
+        if i == len(self.keys) or int(self.keys[i]) != key:
+            return None
+        return self._decision(i)
+
+    def _decision(self, i: int) -> Decision:
+        cells = self.path_cells[self.path_start[i]:self.path_start[i + 1]].tolist()
+        decisions, good, encounters = self.counts[i].tolist()
+        return (_ACTIONS[self.actions[i]], decisions, good, encounters, float(self.efficiency[i]),
+                tuple((cell % self.width, cell // self.width) for cell in cells))
+
+    def items(self) -> Iterator[Tuple[int, Decision]]:
+        for i, key in enumerate(self.keys.tolist()):
+            yield key, self._decision(i)
+
+    def close(self):
+        if isinstance(self._owner, packed_arrays.SharedBlock):
+            self.keys = self.actions = self.counts = self.efficiency = self.path_start = self.path_cells = None
+            self._owner.close()
+        self._owner = None
+
+
+class DecisionCache:
+    """
+    Decisions of PacmanAgent keyed by a 64-bit hash of the situation: the
+    Zobrist hash of the agent's cell, the ghost cells and the remaining food,
+    mixed with the agent-side state decide() reads (its flag, planned path and
+    ghost direction predictions). Recent decisions live in a bounded LRU; an
+    optional read-only DecisionBook answers what earlier runs or other
+    processes already computed. Decisions that drew random numbers are never
+    stored, so replaying a cached game gives exactly the uncached game.
+    """
+
+    def __init__(self, map_path: str, namespace: str, max_entries: int = 10000, book: Optional[DecisionBook] = None):
+        self.map_sha1 = map_digest(map_path)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[int, Decision]' = OrderedDict()
+        self.book = None
+        if book is not None:
+            if book.header.get("map_sha1") != self.map_sha1 or book.header.get("namespace") != namespace \
+                    or book.header.get("version") != VERSION:
+                print("Ignoring decision book built for another map or agent configuration")
+            else:
+                self.book = book
+        self.lookups = 0
+        self.hits = 0
+        self.book_hits = 0
+        self._width = None
+        self._flag_index: Dict[str, int] = {}
+        self._lock = threading.Lock()  # Agents may decide concurrently in "thread" executor mode
+
+    def key(self, agent, position: Tuple[int, int]) -> int:
+        grid = agent.grid
+        if self._width is None:
+            self._width = grid.width
+            self._flag_index = {fid: i for i, (_, _, fid) in enumerate(grid.get_flag_positions())}
+        board = grid.get_zobrist().board_hash(position, agent.ghost_positions)
+        # Hashes of int tuples don't depend on PYTHONHASHSEED, so keys agree across processes
+        state = hash((self._flag_index.get(agent.flag_id, -1), tuple(agent.path),
+                      tuple(sorted(agent.ghost_direction_predictions.items()))))
+        return board ^ (state & _MASK)
+
+    def lookup(self, key: int) -> Optional[Decision]:
+        with self._lock:
+            self.lookups += 1
+            decision = self.entries.get(key)
+            if decision is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return decision
+        if self.book is not None:
+            decision = self.book.get(key)
+            if decision is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.book_hits += 1
+        return decision
+
+    def store(self, key: int, decision: Decision):
+        with self._lock:
+            self.entries[key] = decision
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)  # Evict the least recently used decision
+
+    def choose(self, agent, position: Tuple[int, int]) -> Tuple[int, int]:
+        """agent.decide(position), answered from the cache when the situation was seen before"""
+        key = self.key(agent, position)
+        decision = self.lookup(key)
+        if decision is not None:
+            action, decisions, good, encounters, efficiency, path = decision
+            agent.total_decisions += decisions
+            agent.good_decisions += good
+            agent.ghost_encounters += encounters
+            agent.total_path_efficiency += efficiency
+            agent.path = list(path)
+            return action
+        before = (agent.total_decisions, agent.good_decisions, agent.ghost_encounters, agent.total_path_efficiency)
+        agent.drew_random = False
+        action = agent.decide(position)
+        if not agent.drew_random:
+            self.store(key, (action, agent.total_decisions - before[0], agent.good_decisions - before[1],
+                             agent.ghost_encounters - before[2], agent.total_path_efficiency - before[3],
+                             tuple(agent.path)))
+        return action
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "book_hits": self.book_hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "entries": len(self.entries),
+        }
+
+    def freeze(self) -> bytearray:
+        """Book holding the decisions of the book and the LRU, packed for a file or shared memory"""
+        decisions = dict(self.book.items()) if self.book is not None else {}
+        decisions.update(self.entries)
+        return DecisionBook.pack(decisions, {"map_sha1": self.map_sha1, "namespace": self.namespace,
+                                             "width": self._width or (self.book.width if self.book else 0)})
+
+    def share(self) -> packed_arrays.SharedBlock:
+        """
+        Freeze the cache into a new shared memory block worker processes attach to
+        with DecisionBook.attach(block.name); the caller unlinks it when they are done.
+        """
+        return packed_arrays.share(self.freeze())
+
+    def save(self, path: str):
+        data = self.freeze()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)  # Readers mapping the old file keep their pages
+
+
+def settings_namespace(params: Optional[AgentParams] = None) -> str:
+    """Agent configuration the cached decisions are valid for, params defaulting to the settings' ones"""
+    params = params if params is not None else AgentParams.from_settings()
+    return (f"{settings.PACMAN_STRATEGY}:{settings.PATH_SEARCH}:{settings.INFLUENCE_RADIUS}:{settings.INFLUENCE_WEIGHT}:"
+            f"{settings.GHOST_PREDICTION}:{settings.CAPTURE_RISK}:{params.key()}")
+
+# Caches of this process, shared by every game on the same map and configuration
+_caches: Dict[Tuple[str, str], DecisionCache] = {}
+
+def decision_cache_for(map_path: str, params: Optional[AgentParams] = None) -> Optional[DecisionCache]:
+    """This process's decision cache for a map and Pacman parameters, None when disabled in settings"""
+    if not settings.DECISION_CACHE_SIZE:
+        return None
+    namespace = settings_namespace(params)
+    cache_key = (os.path.abspath(map_path), namespace)
+    if cache_key not in _caches:
+        book = None
+        if settings.DECISION_BOOK_SHM:
+            book = DecisionBook.attach(settings.DECISION_BOOK_SHM)
+        elif settings.DECISION_CACHE_PATH and os.path.exists(settings.DECISION_CACHE_PATH):
+            book = DecisionBook.load(settings.DECISION_CACHE_PATH)
+        _caches[cache_key] = DecisionCache(map_path, namespace, settings.DECISION_CACHE_SIZE, book)
+    return _caches[cache_key]
@@ -1,19 +1,32 @@
 # agents/ghost_agent.py
-import random
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 from environment.grid import Grid
+from agents.ghost_policies import GhostField, RandomPolicy
 
 class GhostAgent:
-    def __init__(self, grid: Grid, color: Tuple[int, int, int]):
+    def __init__(self, grid: Grid, color: Tuple[int, int, int], policy=None,
+                 field: Optional[GhostField] = None, index: int = 0):
         self.grid = grid
         self.color = color
         self.actions = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # up, right, down, left
         self.protected = False  # Ghost becomes protected when reaching a flag
+        self.policy = policy or RandomPolicy()
+        self.field = field  # Shared per-tick precomputation, required by non-random policies
+        self.index = index  # Ghost number, used by per-ghost target tiles
+        self.last_action = (0, 0)
+
+    def reset(self):
+        """Start a new episode, the policy and shared field are kept"""
+        self.protected = False
+        self.last_action = (0, 0)
 
     def choose_action(self, position: Tuple[int, int]) -> Tuple[int, int]:
         """
-        Choose a random legal action for the ghost, even if protected.
+        Choose a legal action for the ghost according to its policy, even if protected.
         Returns (dx, dy) representing movement.
         """
-        legal_actions = [action for action in self.actions if self.grid.is_valid((position[0] + action[0], position[1] + action[1]))]
-        return random.choice(legal_actions) if legal_actions else (0, 0)
\ No newline at end of file
+        legal_actions = self.grid.get_valid_actions(position)
+        if not legal_actions:
+            return (0, 0)
+        self.last_action = self.policy.choose(self, position, legal_actions)
+        return self.last_action
@@ -0,0 +1,171 @@
+# agents/ghost_policies.py
+import random
+import threading
+from typing import Tuple, List, Dict, Optional
+from environment.grid import Grid
+from algorithms.bfs import BFS
+
+UNREACHABLE = 10 ** 9
+
+class GhostField:
+    """
+    Per-tick knowledge shared by every ghost: Pacman positions, their last
+    movement directions and one BFS distance field toward each Pacman.
+    Fields are computed at most once per Pacman position, so the per-ghost
+    cost of a decision is a handful of dict lookups however many ghosts play.
+    """
+
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self.bfs = BFS(grid)
+        self.tick = 0
+        self.pacman_positions: List[Tuple[int, int]] = []
+        self.pacman_directions: List[Tuple[int, int]] = []
+        self.ghost_positions: List[Tuple[int, int]] = []
+        self._fields: Dict[Tuple[int, int], Dict[Tuple[int, int], int]] = {}
+        self._lock = threading.Lock()  # Ghosts may decide concurrently (see AgentExecutor)
+
+    def update(self, pacman_positions: List[Tuple[int, int]], ghost_positions: List[Tuple[int, int]]):
+        """Record the state of a new tick"""
+        directions = []
+        for i, pos in enumerate(pacman_positions):
+            if i < len(self.pacman_positions) and pos != self.pacman_positions[i]:
+                old = self.pacman_positions[i]
+                directions.append((pos[0] - old[0], pos[1] - old[1]))
+            elif i < len(self.pacman_directions):
+                directions.append(self.pacman_directions[i])
+            else:
+                directions.append((0, 0))
+        self.pacman_directions = directions
+        self.pacman_positions = list(pacman_positions)
+        self.ghost_positions = list(ghost_positions)
+        self.tick += 1
+        # Keep only the fields of Pacmans that did not move, the others are rebuilt on first use
+        self._fields = {pos: self._fields[pos] for pos in self.pacman_positions if pos in self._fields}
+
+    def reset(self):
+        """Start a new episode; distance fields only depend on the walls and are kept"""
+        self.tick = 0
+        self.pacman_positions = []
+        self.pacman_directions = []
+        self.ghost_positions = []
+
+    def distance_to_pacman(self, pos: Tuple[int, int], pacman_index: int) -> int:
+        pacman_pos = self.pacman_positions[pacman_index]
+        field = self._fields.get(pacman_pos)
+        if field is None:
+            with self._lock:
+                field = self._fields.get(pacman_pos)
+                if field is None:
+                    field = self.bfs.distance_map(pacman_pos)
+                    self._fields[pacman_pos] = field
+        return field.get(pos, UNREACHABLE)
+
+    def nearest_pacman(self, pos: Tuple[int, int]) -> Optional[int]:
+        """Index of the Pacman closest to pos by maze distance, None if none reachable"""
+        best, best_distance = None, UNREACHABLE
+        for i in range(len(self.pacman_positions)):
+            distance = self.distance_to_pacman(pos, i)
+            if distance < best_distance:
+                best, best_distance = i, distance
+        return best
+
+    def corner(self, index: int) -> Tuple[int, int]:
+        """Home corner of a ghost for scatter mode (clockwise from top-right)"""
+        corners = [(self.grid.width - 1, 0), (0, 0), (self.grid.width - 1, self.grid.height - 1), (0, self.grid.height - 1)]
+        return corners[index % len(corners)]
+
+
+def _toward(position: Tuple[int, int], target: Tuple[int, int], legal_actions: List[Tuple[int, int]],
+            last_action: Tuple[int, int]) -> Tuple[int, int]:
+    """Arcade target-tile rule: never reverse unless forced, take the move closest to target in a straight line"""
+    reverse = (-last_action[0], -last_action[1])
+    candidates = [a for a in legal_actions if a != reverse] or legal_actions
+    return min(candidates, key=lambda a: (position[0] + a[0] - target[0]) ** 2 + (position[1] + a[1] - target[1]) ** 2)
+
+
+class RandomPolicy:
+    """Uniformly random legal move (the original ghost behavior)"""
+
+    def choose(self, ghost, position, legal_actions):
+        return random.choice(legal_actions)
+
+
+class ChasePolicy:
+    """Step down the shared distance field of the nearest Pacman"""
+
+    def choose(self, ghost, position, legal_actions):
+        field = ghost.field
+        target = field.nearest_pacman(position)
+        if target is None:
+            return random.choice(legal_actions)
+        return min(legal_actions, key=lambda a: field.distance_to_pacman((position[0] + a[0], position[1] + a[1]), target))
+
+
+class AmbushPolicy:
+    """Aim a few tiles ahead of the nearest Pacman's heading to cut it off"""
+
+    def __init__(self, lead: int = 4):
+        self.lead = lead
+
+    def choose(self, ghost, position, legal_actions):
+        field = ghost.field
+        target = field.nearest_pacman(position)
+        if target is None:
+            return random.choice(legal_actions)
+        px, py = field.pacman_positions[target]
+        dx, dy = field.pacman_directions[target]
+        return _toward(position, (px + dx * self.lead, py + dy * self.lead), legal_actions, ghost.last_action)
+
+
+class ScatterPolicy:
+    """Patrol the ghost's home corner"""
+
+    def choose(self, ghost, position, legal_actions):
+        return _toward(position, ghost.field.corner(ghost.index), legal_actions, ghost.last_action)
+
+
+class ClassicPolicy:
+    """
+    Arcade personalities chosen by ghost index, alternating scatter and chase waves:
+    0 targets Pacman, 1 targets 4 tiles ahead of it, 2 mirrors ghost 0 around the tile
+    2 ahead of Pacman and 3 chases only while farther than 8 tiles.
+    """
+
+    def __init__(self, scatter_ticks: int = 20, chase_ticks: int = 60):
+        self.scatter_ticks = scatter_ticks
+        self.chase_ticks = chase_ticks
+
+    def target_tile(self, ghost, position) -> Tuple[int, int]:
+        field = ghost.field
+        corner = field.corner(ghost.index)
+        if field.tick % (self.scatter_ticks + self.chase_ticks) < self.scatter_ticks:
+            return corner
+        target = field.nearest_pacman(position)
+        if target is None:
+            return corner
+        px, py = field.pacman_positions[target]
+        dx, dy = field.pacman_directions[target]
+        personality = ghost.index % 4
+        if personality == 1:
+            return (px + 4 * dx, py + 4 * dy)
+        if personality == 2 and field.ghost_positions:
+            bx, by = field.ghost_positions[0]
+            ax, ay = px + 2 * dx, py + 2 * dy
+            return (2 * ax - bx, 2 * ay - by)
+        if personality == 3 and field.distance_to_pacman(position, target) <= 8:
+            return corner
+        return (px, py)
+
+    def choose(self, ghost, position, legal_actions):
+        return _toward(position, self.target_tile(ghost, position), legal_actions, ghost.last_action)
+
+
+# Ghost policies selectable by name
+GHOST_POLICIES = {
+    "random": RandomPolicy,
+    "chase": ChasePolicy,
+    "ambush": AmbushPolicy,
+    "scatter": ScatterPolicy,
+    "classic": ClassicPolicy,
+}
@@ -0,0 +1,70 @@
+# agents/incremental_agent.py
+from typing import Tuple, Optional
+from environment.grid import Grid
+from agents.agent_params import AgentParams
+from agents.pacman_agent import PacmanAgent
+from algorithms.dstar_lite import DStarLite
+
+class IncrementalPacmanAgent(PacmanAgent):
+    """
+    Pacman agent that keeps one D* Lite search toward all remaining food (then its
+    flag) across ticks. Cells around ghosts are made temporarily expensive instead
+    of rejecting unsafe paths, so each tick only repairs what ghosts and eaten
+    food changed.
+    """
+    cacheable = False  # Decisions also depend on the D* Lite search state
+
+    def __init__(self, grid: Grid, flag_id: str, color: Tuple[int, int, int], params: Optional[AgentParams] = None):
+        super().__init__(grid, flag_id, color, params)
+        self.planner = DStarLite(grid)
+        self.planning = False
+
+    def reset(self):
+        super().reset()
+        self.planning = False  # The next decision starts a new search
+
+    def current_goals(self) -> set:
+        food_positions = self.grid.get_food_positions()
+        if not food_positions:
+            return {self.get_flag_position()}
+        if len(food_positions) == len(self.planner.goals):
+            return self.planner.goals  # Nothing eaten since last tick
+        return set(food_positions)
+
+    def choose_action(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        """Choose the next action for Pacman by repairing the previous plan"""
+        if self.protected:
+            return (0, 0)
+
+        # Immediate danger still overrides the plan, as in the base agent
+        if not self.is_position_safe(position):
+            escape_move = self.get_escape_route(position)
+            if escape_move:
+                self.total_decisions += 1
+                self.ghost_encounters += 1
+                self.path = []
+                return escape_move
+
+        if not self.planning:
+            self.planner.reset(position, self.current_goals())
+            self.planning = True
+        else:
+            self.planner.move_start(position)
+            self.planner.set_goals(self.current_goals())
+        self.planner.set_penalties(self.danger_penalties())
+        self.planner.compute()
+
+        self.path = self.planner.extract_path()
+        if len(self.path) > 1:
+            next_pos = self.path[1]
+            self.total_decisions += 1
+            self.total_path_efficiency += 1.0  # Step along the cheapest path
+            if self.is_position_safe(next_pos):
+                self.good_decisions += 1
+            else:
+                self.ghost_encounters += 1
+            return (next_pos[0] - position[0], next_pos[1] - position[1])
+
+        # Standing on a goal or cut off: let the base agent pick a safe move
+        self.path = []
+        return super().choose_action(position)
@@ -1,12 +1,19 @@
 # agents/pacman_agent.py
 import random
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Dict
+import numpy as np
 from environment.grid import Grid
+from agents.agent_params import AgentParams
+from algorithms import kernels
 from algorithms.astar import AStar
+from config import settings
+from logic.scoring import agent_intelligence
 import math
 
 class PacmanAgent:
-    def __init__(self, grid: Grid, flag_id: str, color: Tuple[int, int, int]):
+    cacheable = True  # decide() depends only on state a DecisionCache key covers
+
+    def __init__(self, grid: Grid, flag_id: str, color: Tuple[int, int, int], params: Optional[AgentParams] = None):
         self.grid = grid
         self.flag_id = flag_id
         self.color = color
@@ -22,6 +29,31 @@ class PacmanAgent:
         self.ghost_encounters = 0
         self.last_ghost_positions = []
         self.ghost_direction_predictions = {}
+        self.path_search = settings.PATH_SEARCH
+        # Ghost danger grid shared by all Pacmen, only the weighted search uses it
+        self.influence = None
+        if self.path_search == "weighted":
+            self.influence = grid.get_influence_map(settings.INFLUENCE_RADIUS, settings.INFLUENCE_WEIGHT)
+        # Exact random-ghost occupancy probabilities shared by all Pacmen, None predicts along corridors
+        self.forecast = grid.get_ghost_forecast() if settings.GHOST_PREDICTION == "markov" else None
+        self.capture_risk = settings.CAPTURE_RISK
+        self.params = params if params is not None else AgentParams.from_settings()  # Heuristic constants
+        self.decision_cache = None  # Shared DecisionCache, set by the agent factory when enabled
+        self.drew_random = False  # Whether the last decide() used random numbers (never cached)
+
+    def reset(self):
+        """Start a new episode on the same map, keeping the search structures built for it"""
+        self.protected = False
+        self.path = []
+        self.ghost_positions = []
+        self.move_count = 0
+        self.total_path_efficiency = 0.0
+        self.total_decisions = 0
+        self.good_decisions = 0
+        self.ghost_encounters = 0
+        self.last_ghost_positions = []
+        self.ghost_direction_predictions.clear()
+        self.drew_random = False
 
     # Scoring-related methods needed by Game class
     def get_path_efficiency(self) -> float:
@@ -43,21 +75,8 @@ class PacmanAgent:
         return 1.0 - (self.ghost_encounters / self.total_decisions)
 
     def get_intelligence_score(self) -> float:
-        """Calculate composite intelligence score (0-10)"""
-        if self.total_decisions == 0:
-            return 0.0
-        
-        decision_quality = self.get_decision_quality()
-        safety_score = self.get_safety_score()
-        path_efficiency = self.get_path_efficiency()
-        
-        intelligence_score = (
-            decision_quality * 0.5 +
-            safety_score * 0.3 +
-            path_efficiency * 0.2
-        ) * 10
-        
-        return max(0, min(10, intelligence_score))
+        """Calculate composite intelligence score (0-10), the "agent" scoring profile"""
+        return agent_intelligence(self)
 
     def update_ghost_positions(self, ghost_positions: List[Tuple[int, int]]):
         """Update ghost positions and track their movement patterns"""
@@ -70,6 +89,8 @@ class PacmanAgent:
         
         self.last_ghost_positions = ghost_positions.copy()
         self.ghost_positions = ghost_positions
+        if self.forecast is not None:
+            self.forecast.update(ghost_positions)  # Computed once per tick, whichever Pacman asks first
 
     def get_flag_position(self) -> Tuple[int, int]:
         """Get the position of this agent's flag"""
@@ -87,7 +108,11 @@ class PacmanAgent:
         food_positions = self.grid.get_food_positions()
         if not food_positions:
             return self.get_flag_position()  # Target flag when no food left
+        accelerated = kernels.accelerated()
+        if accelerated is not None and self.ghost_positions:
+            return self._find_safest_food_kernel(accelerated, position)
 
+        params = self.params
         scored_food = []
         for food_pos in food_positions:
             # Base score (inverse of distance)
@@ -103,50 +128,76 @@ class PacmanAgent:
             
             # Ghost movement prediction
             threat_score = 0
-            for ghost_idx, ghost_pos in enumerate(self.ghost_positions):
-                if ghost_idx in self.ghost_direction_predictions:
-                    dx, dy = self.ghost_direction_predictions[ghost_idx]
-                    predicted_path = self.predict_ghost_path(ghost_pos, (dx, dy))
-                    if food_pos in predicted_path:
-                        threat_score += 0.5  # Higher threat if ghost might intercept
+            if self.forecast is not None:
+                # Chance a ghost is there within the prediction horizon
+                threat_score = params.threat_penalty * self.forecast.risk(food_pos, params.horizon)
+            else:
+                for ghost_idx, ghost_pos in enumerate(self.ghost_positions):
+                    if ghost_idx in self.ghost_direction_predictions:
+                        dx, dy = self.ghost_direction_predictions[ghost_idx]
+                        predicted_path = self.predict_ghost_path(ghost_pos, (dx, dy))
+                        if food_pos in predicted_path:
+                            threat_score += params.threat_penalty  # Higher threat if ghost might intercept
 
-            total_score = base_score * 0.6 + safety_score * 0.4 - threat_score
+            total_score = base_score * params.distance_weight + safety_score * params.safety_weight - threat_score
             scored_food.append((total_score, food_pos))
         
         # Return position with highest score
         return max(scored_food, key=lambda x: x[0])[1]
 
+    def _find_safest_food_kernel(self, accelerated: kernels.Kernels, position: Tuple[int, int]) -> Tuple[int, int]:
+        """find_safest_food's scan through the backend's array kernel, same choice"""
+        grid, params = self.grid, self.params
+        bitboard = grid.get_bitboard()
+        food = bitboard.indices(bitboard.food)  # Row-major, like the food positions
+        if self.forecast is not None:
+            threat = params.threat_penalty * self.forecast.risks(food, params.horizon)
+        else:
+            threat = np.zeros(len(food))
+            for ghost_idx, ghost_pos in enumerate(self.ghost_positions):
+                if ghost_idx in self.ghost_direction_predictions:
+                    predicted = self.predict_ghost_path(ghost_pos, self.ghost_direction_predictions[ghost_idx])
+                    cells = np.array(sorted({y * grid.width + x for x, y in predicted}), dtype=np.int64)
+                    rows = np.minimum(np.searchsorted(food, cells), len(food) - 1)
+                    threat[rows[food[rows] == cells]] += params.threat_penalty  # Once per ghost, as in the scan
+        best = accelerated.food(food, grid.width, position[0], position[1],
+                                np.array(self.ghost_positions, dtype=np.int64), threat,
+                                grid.width + grid.height, params.distance_weight, params.safety_weight)
+        return (int(food[best] % grid.width), int(food[best] // grid.width))
+
+    def select_goal(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        """Pick the position to plan a path to (food or flag)"""
+        return self.find_safest_food(position)
+
     def predict_ghost_path(self, ghost_pos: Tuple[int, int], direction: Tuple[int, int]) -> List[Tuple[int, int]]:
-        """Predict ghost's path based on its current direction"""
-        path = []
-        x, y = ghost_pos
-        dx, dy = direction
-        
-        for _ in range(3):  # Predict 3 moves ahead
-            x += dx
-            y += dy
-            if not self.grid.is_valid((x, y)):
-                # Ghost hit a wall, try to find new direction
-                possible_moves = [
-                    (ndx, ndy) for ndx, ndy in self.actions 
-                    if self.grid.is_valid((x + ndx, y + ndy))
-                ]
-                if possible_moves:
-                    dx, dy = random.choice(possible_moves)
-                else:
-                    break
-            path.append((x, y))
-        
-        return path
+        """Predict ghost's path based on its current direction, following the corridor it is in"""
+        return self.grid.get_corridor_graph().follow(ghost_pos, direction, self.params.horizon)
+
+    def danger_penalties(self) -> Dict[Tuple[int, int], float]:
+        """This tick's ghost danger map (current and predicted ghost cells), built by the first Pacman to ask"""
+        if self.influence is None:
+            self.influence = self.grid.get_influence_map(settings.INFLUENCE_RADIUS, settings.INFLUENCE_WEIGHT)
+        if self.forecast is not None:
+            return self.influence.update(self.ghost_positions,
+                                         self.forecast.cells_at_risk(self.capture_risk, self.params.horizon))
+        predicted = []
+        for ghost_idx, ghost_pos in enumerate(self.ghost_positions):
+            if ghost_idx in self.ghost_direction_predictions:
+                predicted.extend(self.predict_ghost_path(ghost_pos, self.ghost_direction_predictions[ghost_idx]))
+        return self.influence.update(self.ghost_positions, predicted)
 
-    def is_position_safe(self, pos: Tuple[int, int], lookahead: int = 2) -> bool:
-        """Check if position is safe considering ghost movement predictions"""
+    def is_position_safe(self, pos: Tuple[int, int], lookahead: Optional[int] = None) -> bool:
+        """Check if position is safe considering ghost movement predictions (lookahead defaults to safe_lookahead)"""
+        if lookahead is None:
+            lookahead = self.params.safe_lookahead
         # Immediate danger check
         for ghost_pos in self.ghost_positions:
             if self.manhattan_distance(pos, ghost_pos) <= 1:
                 return False
         
         # Predictive danger check
+        if self.forecast is not None:
+            return self.forecast.risk(pos, lookahead) < self.capture_risk
         for ghost_idx, ghost_pos in enumerate(self.ghost_positions):
             if ghost_idx in self.ghost_direction_predictions:
                 dx, dy = self.ghost_direction_predictions[ghost_idx]
@@ -164,13 +215,14 @@ class PacmanAgent:
         for action in self.actions:
             new_pos = (position[0] + action[0], position[1] + action[1])
             if self.grid.is_valid(new_pos):
-                if self.is_position_safe(new_pos, lookahead=3):
+                if self.is_position_safe(new_pos, lookahead=self.params.move_lookahead):
                     safe_moves.append(action)
                 else:
                     danger_moves.append(action)
         
         # Prefer safe moves, but if none exist, choose least dangerous
         if safe_moves:
+            self.drew_random = True
             return random.choice(safe_moves)
         elif danger_moves:
             # Choose move that maximizes distance from nearest ghost
@@ -185,9 +237,15 @@ class PacmanAgent:
         return None
 
     def choose_action(self, position: Tuple[int, int]) -> Tuple[int, int]:
-        """Choose the next action for Pacman"""
+        """Choose the next action for Pacman, through the decision cache when there is one"""
         if self.protected:
             return (0, 0)
+        if self.decision_cache is not None:
+            return self.decision_cache.choose(self, position)
+        return self.decide(position)
+
+    def decide(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        """Compute the next action for Pacman"""
 
         # First priority: avoid immediate danger
         if not self.is_position_safe(position):
@@ -198,8 +256,15 @@ class PacmanAgent:
                 return escape_move
 
         # Second priority: follow optimal path to food or flag
-        if not self.path or position != self.path[0]:
-            goal = self.find_safest_food(position)
+        if self.path_search == "weighted":
+            # One search over the danger costs gives a path that is short and away from ghosts
+            penalties = self.danger_penalties()
+            if (len(self.path) <= 1 or position != self.path[0]
+                    or any(pos in penalties for pos in self.path[1:4])):
+                goal = self.select_goal(position)
+                self.path = self.astar.find_path(position, goal, penalties) or []
+        elif len(self.path) <= 1 or position != self.path[0]:
+            goal = self.select_goal(position)
             self.path = self.astar.find_path(position, goal) or []
             
             # If path is unsafe, find alternative
@@ -208,11 +273,15 @@ class PacmanAgent:
 
         if len(self.path) > 1:
             next_pos = self.path[1]
-            if self.is_position_safe(next_pos, lookahead=3):
+            safe = self.is_position_safe(next_pos, lookahead=self.params.move_lookahead)
+            if safe or self.path_search == "weighted":
                 action = (next_pos[0] - position[0], next_pos[1] - position[1])
                 self.path.pop(0)
                 self.total_decisions += 1
-                self.good_decisions += 1
+                if safe:
+                    self.good_decisions += 1
+                else:
+                    self.ghost_encounters += 1  # Cheapest way on despite the danger
                 
                 # Update path efficiency metric
                 optimal_path = self.astar.find_path(position, next_pos) or []
@@ -238,6 +307,7 @@ class PacmanAgent:
             legal_actions.sort(reverse=True)
             best_safety = legal_actions[0][0]
             best_actions = [action for safety, action in legal_actions if safety == best_safety]
+            self.drew_random = True
             action = random.choice(best_actions)
             
             self.total_decisions += 1
@@ -0,0 +1,31 @@
+# agents/remote_agent.py
+from typing import Tuple, Optional
+from environment.grid import Grid
+from agents.agent_params import AgentParams
+from agents.pacman_agent import PacmanAgent
+
+class RemotePacmanAgent(PacmanAgent):
+    """
+    Pacman agent driven from outside the process: whoever runs the game (see
+    logic/game_server.py) sets next_action before each update and the agent
+    plays it once. Illegal or missing actions make it stay.
+    """
+    cacheable = False  # Decisions are not made here
+
+    def __init__(self, grid: Grid, flag_id: str, color: Tuple[int, int, int], params: Optional[AgentParams] = None):
+        super().__init__(grid, flag_id, color, params)
+        self.next_action = (0, 0)
+
+    def reset(self):
+        super().reset()
+        self.next_action = (0, 0)
+
+    def choose_action(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        action, self.next_action = self.next_action, (0, 0)
+        if self.protected:
+            return (0, 0)
+        self.total_decisions += 1
+        if action != (0, 0) and action in self.grid.get_valid_actions(position):
+            self.good_decisions += 1
+            return action
+        return (0, 0)
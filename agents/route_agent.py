@@ -0,0 +1,26 @@
+# agents/route_agent.py
+from typing import Tuple, Optional
+from environment.grid import Grid
+from agents.agent_params import AgentParams
+from agents.pacman_agent import PacmanAgent
+from algorithms.route_planner import RoutePlanner
+from config import settings
+
+class RoutePacmanAgent(PacmanAgent):
+    """Pacman agent that follows a planned tour over all food instead of greedy targets."""
+    cacheable = False  # Decisions also depend on the planner's route
+
+    def __init__(self, grid: Grid, flag_id: str, color: Tuple[int, int, int], params: Optional[AgentParams] = None):
+        super().__init__(grid, flag_id, color, params)
+        self.planner: Optional[RoutePlanner] = None
+
+    def reset(self):
+        super().reset()
+        if self.planner is not None:
+            self.planner.reset()  # Keeps its distance rows, they only depend on the walls
+
+    def select_goal(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        """Follow the route planner, created lazily once the flag is known"""
+        if self.planner is None:
+            self.planner = RoutePlanner(self.grid, self.get_flag_position(), settings.ROUTE_IMPROVE_BUDGET)
+        return self.planner.next_target(position)
@@ -2,25 +2,37 @@
 
 
 # algorithms/astar.py
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Dict
 from heapq import heappush, heappop
+import numpy as np
 from environment.grid import Grid
+from algorithms import kernels
 
 class AStar:
     def __init__(self, grid: Grid):
         self.grid = grid
+        self.nodes_expanded = 0  # Nodes popped by the last search
+        self._scratch = None  # Per-cell arrays reused by the accelerated kernel, allocated on first use
+        self._generation = 0
 
     def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
         """Calculate Manhattan distance between two positions."""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
-    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int],
+                  penalties: Optional[Dict[Tuple[int, int], float]] = None) -> Optional[List[Tuple[int, int]]]:
         """
         Find shortest path from start to goal using A* algorithm.
+        With penalties (extra cost of entering a cell, e.g. ghost danger) the
+        cheapest path is returned instead; Manhattan distance stays admissible
+        since every step still costs at least 1.
         Returns path as list of positions or None if no path exists.
         """
         if not self.grid.is_valid(start) or not self.grid.is_valid(goal):
             return None
+        accelerated = kernels.accelerated()
+        if accelerated is not None:
+            return self._find_path_kernel(accelerated, start, goal, penalties)
 
         # Priority queue: (f_score, node)
         open_set = [(0, start)]
@@ -28,9 +40,11 @@ class AStar:
         came_from = {}
         g_score = {start: 0}  # Cost from start to node
         f_score = {start: self.manhattan_distance(start, goal)}  # Estimated total cost
+        self.nodes_expanded = 0
 
         while open_set:
             _, current = heappop(open_set)
+            self.nodes_expanded += 1
 
             if current == goal:
                 # Reconstruct path
@@ -42,8 +56,10 @@ class AStar:
                 return path[::-1]  # Reverse path
 
             for neighbor in self.grid.get_neighbors(current):
-                # Cost to neighbor is 1 (grid movement)
+                # Cost to neighbor is 1 (grid movement) plus its penalty
                 tentative_g_score = g_score[current] + 1
+                if penalties:
+                    tentative_g_score += penalties.get(neighbor, 0)
 
                 if tentative_g_score < g_score.get(neighbor, float('inf')):
                     # Update path and scores
@@ -52,4 +68,28 @@ class AStar:
                     f_score[neighbor] = tentative_g_score + self.manhattan_distance(neighbor, goal)
                     heappush(open_set, (f_score[neighbor], neighbor))
 
-        return None  # No path found
\ No newline at end of file
+        return None  # No path found
+
+    def _find_path_kernel(self, accelerated: kernels.Kernels, start: Tuple[int, int], goal: Tuple[int, int],
+                          penalties: Optional[Dict[Tuple[int, int], float]]) -> Optional[List[Tuple[int, int]]]:
+        """find_path through the backend's array kernel, same path and nodes_expanded"""
+        grid = self.grid
+        width, size = grid.width, grid.width * grid.height
+        if self._scratch is None or len(self._scratch[0]) != size:
+            # g score, came from, generation stamp and penalty of every cell
+            self._scratch = (np.zeros(size), np.zeros(size, dtype=np.int64), np.zeros(size, dtype=np.int64),
+                             np.zeros(size))
+            self._generation = 0
+        g_score, came_from, stamp, plane = self._scratch
+        self._generation += 1
+        penalized = [y * width + x for x, y in penalties if 0 <= x < width and 0 <= y < grid.height] \
+            if penalties else []
+        for index in penalized:
+            plane[index] = penalties[(index % width, index // width)]
+        path, self.nodes_expanded = accelerated.astar(
+            grid.get_move_masks(), width, grid.height, start[1] * width + start[0], goal[1] * width + goal[0],
+            plane, bool(penalties), g_score, came_from, stamp, self._generation)
+        plane[penalized] = 0.0
+        if len(path) == 0:
+            return None
+        return list(zip((path % width).tolist(), (path // width).tolist()))
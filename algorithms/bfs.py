@@ -0,0 +1,60 @@
+# algorithms/bfs.py
+from typing import List, Tuple, Optional, Dict
+from collections import deque
+import numpy as np
+from environment.grid import Grid
+from algorithms import kernels
+
+class BFS:
+    def __init__(self, grid: Grid):
+        self.grid = grid
+
+    def distance_map(self, start: Tuple[int, int]) -> Dict[Tuple[int, int], int]:
+        """
+        Compute the shortest-path distance from start to every reachable cell.
+        Returns a dict {position: distance}, empty if start is not valid.
+        """
+        if not self.grid.is_valid(start):
+            return {}
+
+        accelerated = kernels.accelerated()
+        if accelerated is not None:
+            width = self.grid.width
+            field = accelerated.bfs(self.grid.get_move_masks(), width, start[1] * width + start[0])
+            reached = np.flatnonzero(field >= 0)
+            reached = reached[np.argsort(field[reached], kind="stable")]  # Same order as the layers below
+            return dict(zip(zip((reached % width).tolist(), (reached // width).tolist()), field[reached].tolist()))
+
+        # One bitboard step per distance instead of one queue visit per cell
+        bitboard = self.grid.get_bitboard()
+        distances = {}
+        for distance, layer in enumerate(bitboard.distance_layers(bitboard.bit(start))):
+            for pos in bitboard.positions(layer):
+                distances[pos] = distance
+        return distances
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Find shortest path from start to goal using Breadth-First Search.
+        Returns path as list of positions or None if no path exists.
+        """
+        if not self.grid.is_valid(start) or not self.grid.is_valid(goal):
+            return None
+
+        came_from = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = came_from[current]
+                return path[::-1]
+
+            for neighbor in self.grid.get_neighbors(current):
+                if neighbor not in came_from:
+                    came_from[neighbor] = current
+                    queue.append(neighbor)
+
+        return None  # No path found
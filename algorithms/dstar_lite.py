@@ -0,0 +1,144 @@
+# algorithms/dstar_lite.py
+from typing import List, Tuple, Optional, Dict, Set, Iterable
+from heapq import heappush, heappop
+from environment.grid import Grid
+
+INF = float('inf')
+
+class DStarLite:
+    """
+    Incremental shortest paths toward a set of goal cells (D* Lite).
+
+    The search runs backwards from every goal at once, so g[s] is the cost of
+    the cheapest path from s to the nearest goal. Entering a cell costs 1 plus
+    its penalty. Between calls the search tree is kept: moving the start,
+    changing penalties or adding/removing goals only re-expands the cells
+    whose cost-to-goal actually changed.
+    """
+
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self.start: Optional[Tuple[int, int]] = None
+        self.goals: Set[Tuple[int, int]] = set()
+        self.penalties: Dict[Tuple[int, int], float] = {}
+        self.g: Dict[Tuple[int, int], float] = {}
+        self.rhs: Dict[Tuple[int, int], float] = {}
+        self.km = 0
+        self.nodes_expanded = 0  # Cells expanded by the last compute()
+        self._queue = []
+        self._queued: Dict[Tuple[int, int], Tuple[float, float]] = {}  # Current key of queued cells
+
+    def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
+        """Calculate Manhattan distance between two positions."""
+        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+
+    def cost(self, u: Tuple[int, int], v: Tuple[int, int]) -> float:
+        """Cost of moving from u into the neighboring cell v"""
+        return 1 + self.penalties.get(v, 0)
+
+    def _key(self, s: Tuple[int, int]) -> Tuple[float, float]:
+        best = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (best + self.manhattan_distance(self.start, s) + self.km, best)
+
+    def _push(self, s: Tuple[int, int]):
+        key = self._key(s)
+        self._queued[s] = key
+        heappush(self._queue, (key, s))
+
+    def _top(self):
+        """Smallest up-to-date queue entry, dropping stale ones"""
+        while self._queue:
+            key, s = self._queue[0]
+            if self._queued.get(s) == key:
+                return key, s
+            heappop(self._queue)
+        return (INF, INF), None
+
+    def _update_vertex(self, u: Tuple[int, int]):
+        if u not in self.goals:
+            self.rhs[u] = min((self.cost(u, s) + self.g.get(s, INF) for s in self.grid.get_neighbors(u)), default=INF)
+        self._queued.pop(u, None)
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+
+    def reset(self, start: Tuple[int, int], goals: Iterable[Tuple[int, int]]):
+        """Forget the search tree and plan from scratch"""
+        self.start = start
+        self.goals = set(goals)
+        self.g, self.rhs = {}, {}
+        self.km = 0
+        self._queue, self._queued = [], {}
+        for goal in self.goals:
+            self.rhs[goal] = 0
+            self._push(goal)
+
+    def move_start(self, start: Tuple[int, int]):
+        """Account for the agent's move so queued keys stay valid lower bounds"""
+        if self.start is not None and start != self.start:
+            self.km += self.manhattan_distance(self.start, start)
+        self.start = start
+
+    def set_goals(self, goals: Set[Tuple[int, int]]):
+        """Replace the goal set, repairing only around goals that appeared or vanished"""
+        added, removed = goals - self.goals, self.goals - goals
+        self.goals = set(goals)
+        for s in added:
+            self.rhs[s] = 0
+            self._queued.pop(s, None)
+            if self.g.get(s, INF) != 0:
+                self._push(s)
+        for s in removed:
+            self._update_vertex(s)
+
+    def set_penalties(self, penalties: Dict[Tuple[int, int], float]):
+        """Replace cell penalties, repairing the edges into cells whose penalty changed"""
+        changed = [s for s in set(penalties) | set(self.penalties) if penalties.get(s, 0) != self.penalties.get(s, 0)]
+        self.penalties = penalties
+        for v in changed:
+            for u in self.grid.get_neighbors(v):
+                self._update_vertex(u)
+
+    def compute(self):
+        """Bring g up to date for the current start"""
+        self.nodes_expanded = 0
+        while True:
+            top_key, u = self._top()
+            if u is None or not (top_key < self._key(self.start) or
+                                 self.rhs.get(self.start, INF) != self.g.get(self.start, INF)):
+                break
+            heappop(self._queue)
+            del self._queued[u]
+            self.nodes_expanded += 1
+            new_key = self._key(u)
+            if top_key < new_key:
+                self._push(u)
+            elif self.g.get(u, INF) > self.rhs.get(u, INF):
+                self.g[u] = self.rhs[u]
+                for s in self.grid.get_neighbors(u):
+                    self._update_vertex(s)
+            else:
+                self.g[u] = INF
+                for s in self.grid.get_neighbors(u) + [u]:
+                    self._update_vertex(s)
+
+    def path_cost(self) -> float:
+        """Cost from the start to the nearest goal, inf if none is reachable"""
+        return self.g.get(self.start, INF)
+
+    def next_step(self, position: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Neighbor of position on its cheapest way to a goal, None if no goal is reachable"""
+        if position in self.goals or self.g.get(position, INF) == INF:
+            return None
+        return min(self.grid.get_neighbors(position), key=lambda s: self.cost(position, s) + self.g.get(s, INF))
+
+    def extract_path(self, max_length: int = 10 ** 6) -> List[Tuple[int, int]]:
+        """Cheapest path from the start to a goal (start included), empty if unreachable"""
+        if self.g.get(self.start, INF) == INF:
+            return []
+        path = [self.start]
+        while path[-1] not in self.goals and len(path) <= max_length:
+            step = self.next_step(path[-1])
+            if step is None:
+                break
+            path.append(step)
+        return path
@@ -0,0 +1,96 @@
+# algorithms/hierarchical_astar.py
+from typing import List, Tuple, Optional
+from heapq import heappush, heappop
+from environment.grid import Grid
+
+class HierarchicalAStar:
+    """
+    A* over the grid's corridor graph: the search only expands junctions and
+    dead ends, walking whole corridors in one step, then the abstract route is
+    expanded back into a cell path. Paths have the same length as AStar's.
+    """
+
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self.nodes_expanded = 0  # Graph nodes popped by the last search
+
+    def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
+        """Calculate Manhattan distance between two positions."""
+        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Find shortest path from start to goal on the corridor graph.
+        Returns path as list of positions or None if no path exists.
+        """
+        self.nodes_expanded = 0
+        if not self.grid.is_valid(start) or not self.grid.is_valid(goal):
+            return None
+        if start == goal:
+            return [start]
+
+        graph = self.grid.get_corridor_graph()
+
+        # Ways from the graph to the goal: {node: (distance, cells from node to goal)}
+        goal_exits = {}
+        for node, distance, cells in graph.exits(goal):
+            if node not in goal_exits or distance < goal_exits[node][0]:
+                goal_exits[node] = (distance, cells[:-1][::-1] + [goal] if cells else [])
+
+        # Best complete path found so far: (cost, last graph node or None, cells to goal)
+        best = (float('inf'), None, [])
+        start_edge, goal_edge = graph.locate(start), graph.locate(goal)
+        if start_edge and goal_edge and start_edge[0] == goal_edge[0]:
+            # Same corridor: walking straight there may beat leaving it
+            cells = graph.edges[start_edge[0]].cells
+            k1, k2 = start_edge[1], goal_edge[1]
+            direct = cells[k1 + 1:k2 + 1] if k2 > k1 else cells[k2:k1][::-1]
+            best = (abs(k1 - k2), None, direct)
+
+        open_set = []
+        g_score = {}
+        came_from = {}  # node -> (previous node, edge id) or (None, cells from start)
+        for node, distance, cells in graph.exits(start):
+            if distance < g_score.get(node, float('inf')):
+                g_score[node] = distance
+                came_from[node] = (None, cells)
+                heappush(open_set, (distance + self.manhattan_distance(node, goal), distance, node))
+
+        while open_set:
+            f, cost, current = heappop(open_set)
+            if f >= best[0]:
+                break  # No remaining node can lead to a shorter path
+            if cost > g_score[current]:
+                continue  # Stale queue entry
+            self.nodes_expanded += 1
+
+            if current in goal_exits:
+                total = cost + goal_exits[current][0]
+                if total < best[0]:
+                    best = (total, current, goal_exits[current][1])
+
+            for neighbor, length, edge_id in graph.neighbors(current):
+                tentative_g_score = cost + length
+                if tentative_g_score < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = tentative_g_score
+                    came_from[neighbor] = (current, edge_id)
+                    heappush(open_set, (tentative_g_score + self.manhattan_distance(neighbor, goal),
+                                        tentative_g_score, neighbor))
+
+        if best[0] == float('inf'):
+            return None  # No path found
+
+        # Expand the abstract route back into cells, from the goal side
+        segments = [best[2]]
+        node = best[1]
+        while node is not None:
+            previous, link = came_from[node]
+            if previous is None:
+                segments.append(link)
+            else:
+                segments.append(graph.edges[link].walk_from(previous))
+            node = previous
+        path = [start]
+        for segment in reversed(segments):
+            path.extend(segment)
+        return path
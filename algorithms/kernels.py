@@ -0,0 +1,276 @@
+# algorithms/kernels.py
+"""
+Array kernels of the hot searches: A* (AStar.find_path), BFS distance fields
+(BFS.distance_map and the map analysis) and the food scan of
+PacmanAgent.find_safest_food, over flat NumPy arrays indexed y * width + x
+with the 4-bit move masks of Grid.get_move_masks.
+
+The kernels are written in the subset of Python that Numba compiles. The
+backend picks how they run:
+
+- "python": not at all, the callers keep their interpreted implementations
+  (dicts, heapq and bitboards, faster than these loops run by the interpreter)
+- "numba": jit-compiled, compiled code cached next to this file
+- "arrays": the kernels run by the interpreter, to test or debug them
+- "auto" (settings.KERNEL_BACKEND default): "numba" when it is installed,
+  else "python"
+
+Every backend gives the same paths, distances and choices as "python"
+(tests/test_kernels.py), so switching only changes the speed:
+
+    python -m algorithms.kernels data/maps/map1.txt --backend numba
+"""
+import argparse
+import time
+from typing import Callable, Dict, Optional
+import numpy as np
+from config import settings
+
+# Offset of the neighbor behind each move mask bit: up, right, down, left (grid._DIRECTIONS)
+_UP, _RIGHT, _DOWN, _LEFT = 0, 1, 2, 3
+
+
+def astar_path(masks, width, height, start, goal, penalties, use_penalties, g_score, came_from, stamp, generation):
+    """
+    A* from start to goal over grid indices, the same search as AStar.find_path:
+    the open set pops the lowest (f, x, y) first, neighbors go up, right,
+    down, left and a neighbor is updated only on a strictly cheaper cost, so
+    ties resolve exactly as with heapq and (f, (x, y)) tuples. Entering a
+    cell costs 1 plus penalties[cell] when use_penalties is set.
+
+    g_score, came_from and stamp are scratch arrays of one entry per cell,
+    reused across calls: an entry is only valid when its stamp equals this
+    call's generation. Returns (path of grid indices, empty if there is none,
+    nodes popped).
+    """
+    goal_x, goal_y = goal % width, goal // width
+    # Binary heap of f scores with the tie key x * height + y (orders like (x, y))
+    heap_f = np.empty(64, dtype=np.float64)
+    heap_key = np.empty(64, dtype=np.int64)
+    heap_f[0] = 0.0
+    heap_key[0] = (start % width) * height + start // width
+    size = 1
+    g_score[start] = 0.0
+    stamp[start] = generation
+    expanded = 0
+
+    while size > 0:
+        # Pop the root, then sift the last entry down from it
+        current_key = heap_key[0]
+        current = (current_key % height) * width + current_key // height
+        size -= 1
+        last_f, last_key = heap_f[size], heap_key[size]
+        i = 0
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and (heap_f[child + 1] < heap_f[child] or (
+                    heap_f[child + 1] == heap_f[child] and heap_key[child + 1] < heap_key[child])):
+                child += 1
+            if heap_f[child] < last_f or (heap_f[child] == last_f and heap_key[child] < last_key):
+                heap_f[i], heap_key[i] = heap_f[child], heap_key[child]
+                i = child
+            else:
+                break
+        heap_f[i], heap_key[i] = last_f, last_key
+        expanded += 1
+
+        if current == goal:
+            length = 1
+            node = goal
+            while node != start:
+                node = came_from[node]
+                length += 1
+            path = np.empty(length, dtype=np.int64)
+            node = goal
+            for j in range(length - 1, -1, -1):
+                path[j] = node
+                if j > 0:
+                    node = came_from[node]
+            return path, expanded
+
+        mask = masks[current]
+        for bit in range(4):
+            if not mask & (1 << bit):
+                continue
+            if bit == _UP:
+                neighbor = current - width
+            elif bit == _RIGHT:
+                neighbor = current + 1
+            elif bit == _DOWN:
+                neighbor = current + width
+            else:
+                neighbor = current - 1
+            tentative = g_score[current] + 1.0
+            if use_penalties:
+                tentative += penalties[neighbor]
+            if stamp[neighbor] == generation and tentative >= g_score[neighbor]:
+                continue
+            came_from[neighbor] = current
+            g_score[neighbor] = tentative
+            stamp[neighbor] = generation
+            x, y = neighbor % width, neighbor // width
+            f = tentative + (abs(x - goal_x) + abs(y - goal_y))
+            key = x * height + y
+            # Push, growing the heap when full, then sift up
+            if size == heap_f.shape[0]:
+                grown_f = np.empty(2 * size, dtype=np.float64)
+                grown_key = np.empty(2 * size, dtype=np.int64)
+                grown_f[:size] = heap_f
+                grown_key[:size] = heap_key
+                heap_f, heap_key = grown_f, grown_key
+            i = size
+            size += 1
+            while i > 0:
+                parent = (i - 1) // 2
+                if f < heap_f[parent] or (f == heap_f[parent] and key < heap_key[parent]):
+                    heap_f[i], heap_key[i] = heap_f[parent], heap_key[parent]
+                    i = parent
+                else:
+                    break
+            heap_f[i], heap_key[i] = f, key
+
+    return np.empty(0, dtype=np.int64), expanded
+
+
+def bfs_field(masks, width, start):
+    """Moves from start to every cell as an int32 array, -1 where unreachable"""
+    field = np.full(masks.shape[0], -1, dtype=np.int32)
+    queue = np.empty(masks.shape[0], dtype=np.int64)
+    field[start] = 0
+    queue[0] = start
+    head, tail = 0, 1
+    while head < tail:
+        current = queue[head]
+        head += 1
+        mask = masks[current]
+        for bit in range(4):
+            if not mask & (1 << bit):
+                continue
+            if bit == _UP:
+                neighbor = current - width
+            elif bit == _RIGHT:
+                neighbor = current + 1
+            elif bit == _DOWN:
+                neighbor = current + width
+            else:
+                neighbor = current - 1
+            if field[neighbor] < 0:
+                field[neighbor] = field[current] + 1
+                queue[tail] = neighbor
+                tail += 1
+    return field
+
+
+def best_food(food, width, px, py, ghosts, threat, scale, distance_weight, safety_weight):
+    """
+    Index into food (grid indices, row-major) of the best scored food for a
+    Pacman at (px, py), as in PacmanAgent.find_safest_food: closeness times
+    distance_weight plus distance to the nearest of ghosts ((x, y) rows) over
+    scale times safety_weight, minus threat. The first of equal scores wins.
+    """
+    best, best_score = -1, 0.0
+    for i in range(food.shape[0]):
+        x, y = food[i] % width, food[i] // width
+        base_score = 1.0 / (abs(px - x) + abs(py - y) + 1)
+        nearest = abs(x - ghosts[0, 0]) + abs(y - ghosts[0, 1])
+        for g in range(1, ghosts.shape[0]):
+            distance = abs(x - ghosts[g, 0]) + abs(y - ghosts[g, 1])
+            if distance < nearest:
+                nearest = distance
+        safety_score = nearest / scale
+        total = base_score * distance_weight + safety_score * safety_weight - threat[i]
+        if best < 0 or total > best_score:
+            best, best_score = i, total
+    return best
+
+
+class Kernels:
+    """One backend's implementation of every kernel"""
+
+    def __init__(self, name: str, astar: Callable, bfs: Callable, food: Callable):
+        self.name = name
+        self.astar = astar
+        self.bfs = bfs
+        self.food = food
+
+
+def _load_arrays() -> Kernels:
+    return Kernels("arrays", astar_path, bfs_field, best_food)
+
+def _load_numba() -> Kernels:
+    import numba  # ImportError when not installed
+    jit = numba.njit(cache=True)
+    return Kernels("numba", jit(astar_path), jit(bfs_field), jit(best_food))
+
+# Backend name: loader of its kernels, None for the interpreted implementations
+KERNEL_BACKENDS: Dict[str, Optional[Callable[[], Kernels]]] = {
+    "python": None,
+    "numba": _load_numba,
+    "arrays": _load_arrays,
+}
+
+_loaded: Dict[str, Kernels] = {}
+_active: Optional[Kernels] = None
+_backend: Optional[str] = None  # Selected backend, None until first use
+
+
+def set_backend(name: str) -> str:
+    """
+    Select the backend the searches use from now on: a KERNEL_BACKENDS name
+    or "auto". Returns the backend in use; "numba" raises ImportError when
+    Numba is not installed, where "auto" falls back to "python".
+    """
+    global _active, _backend
+    if name == "auto":
+        try:
+            return set_backend("numba")
+        except ImportError:
+            return set_backend("python")
+    if name not in KERNEL_BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{name}', expected 'auto' or one of {list(KERNEL_BACKENDS)}")
+    loader = KERNEL_BACKENDS[name]
+    if loader is not None and name not in _loaded:
+        _loaded[name] = loader()
+    _active = _loaded.get(name)
+    _backend = name
+    return name
+
+def backend() -> str:
+    """Name of the backend in use, settings.KERNEL_BACKEND until set_backend is called"""
+    if _backend is None:
+        set_backend(settings.KERNEL_BACKEND)
+    return _backend
+
+def accelerated() -> Optional[Kernels]:
+    """Kernels of the backend in use, None when the interpreted implementations run"""
+    if _backend is None:
+        set_backend(settings.KERNEL_BACKEND)
+    return _active
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the searches of a map under a kernel backend")
+    parser.add_argument("map", help="Map file")
+    parser.add_argument("--backend", default=settings.KERNEL_BACKEND,
+                        help=f"'auto' or one of {list(KERNEL_BACKENDS)}")
+    parser.add_argument("--repeat", type=int, default=20, help="Searches of each kind")
+    args = parser.parse_args()
+
+    from algorithms import kernels  # The module the searches use, not this __main__ copy
+    from environment.grid import Grid
+    from algorithms.astar import AStar
+    from algorithms.bfs import BFS
+    print(f"backend: {kernels.set_backend(args.backend)}")
+    grid = Grid(args.map)
+    cells = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_valid((x, y))]
+    start, goal = cells[0], cells[-1]
+    astar, bfs = AStar(grid), BFS(grid)
+    astar.find_path(start, goal)  # Compiles (or loads) the jitted kernels before timing
+    bfs.distance_map(start)
+    for label, search in (("A*", lambda: astar.find_path(start, goal)), ("BFS", lambda: bfs.distance_map(start))):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            search()
+        print(f"{label}: {(time.perf_counter() - started) / args.repeat * 1000:.3f} ms")
@@ -0,0 +1,138 @@
+# algorithms/route_planner.py
+from typing import List, Tuple, Dict
+from environment.grid import Grid
+from algorithms.bfs import BFS
+
+UNREACHABLE = 10 ** 9  # Distance used for targets that cannot be reached
+
+class RoutePlanner:
+    """
+    Orders all remaining food followed by the agent's flag into a single route.
+
+    The route is built once with a nearest-neighbor pass over a pairwise BFS
+    distance matrix, then improved with 2-opt moves a few at a time: every call
+    to next_target() spends at most `improve_budget` move evaluations, resuming
+    where the previous tick stopped. Eaten food is dropped from the route
+    without rebuilding it.
+    """
+
+    def __init__(self, grid: Grid, flag_position: Tuple[int, int], improve_budget: int = 200):
+        self.grid = grid
+        self.flag_position = flag_position
+        self.improve_budget = improve_budget
+        self.bfs = BFS(grid)
+        self.route: List[Tuple[int, int]] = []  # Food in visiting order, flag is the implicit last stop
+        self.built = False
+        self.converged = False
+        self._distances: Dict[Tuple[int, int], Dict[Tuple[int, int], int]] = {}
+        self.analysis = grid.get_analysis()  # Precomputed distances from the flags, when available
+        self._cursor = (1, 2)  # Resumable 2-opt position (i, j)
+        self._improved_this_pass = False
+
+    def distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
+        """Shortest-path distance between two targets, cached per source."""
+        if pos2 in self._distances and pos1 not in self._distances:
+            pos1, pos2 = pos2, pos1
+        row = self._distances.get(pos1)
+        if row is None and self.analysis is not None:
+            for source, target in ((pos1, pos2), (pos2, pos1)):
+                key = self.analysis.key_index(source)
+                if key is not None:
+                    distance = self.analysis.distance(key, target)
+                    return distance if distance >= 0 else UNREACHABLE
+        if row is None:
+            row = self.bfs.distance_map(pos1)
+            self._distances[pos1] = row
+        return row.get(pos2, UNREACHABLE)
+
+    def reset(self):
+        """Forget the route, for a new episode on the same map"""
+        self.route = []
+        self.built = False
+        self.converged = False
+        self._cursor = (1, 2)
+        self._improved_this_pass = False
+
+    def build(self, position: Tuple[int, int]):
+        """Build the initial route from position with the nearest-neighbor heuristic."""
+        remaining = set(self.grid.get_food_positions())
+        route = []
+        current_row = self.bfs.distance_map(position)
+        while remaining:
+            nearest = min(remaining, key=lambda pos: (current_row.get(pos, UNREACHABLE), pos))
+            route.append(nearest)
+            remaining.discard(nearest)
+            self.distance(nearest, nearest)  # Make sure the row of nearest is cached
+            current_row = self._distances[nearest]
+        self.route = route
+        self.built = True
+        self.converged = False
+        self._cursor = (1, 2)
+        self._improved_this_pass = False
+
+    def sync(self):
+        """Drop food that has been eaten since the last call."""
+        food_positions = self.grid.get_food_positions()
+        if len(food_positions) == len(self.route):
+            return
+        food_set = set(food_positions)
+        self.route = [pos for pos in self.route if pos in food_set]
+        self.converged = False
+        self._cursor = (1, 2)  # The shorter route gets a fresh pass
+        self._improved_this_pass = False
+
+    def improve(self, budget: int) -> int:
+        """
+        Run up to `budget` 2-opt move evaluations on the route.
+        The first target (currently being chased) and the flag stay in place.
+        Returns the number of evaluations performed.
+        """
+        sequence = self.route + [self.flag_position]
+        last = len(sequence) - 2  # Last index that may be moved
+        if self.converged or last < 2:
+            self.converged = True
+            return 0
+
+        i, j = self._cursor
+        evaluations = 0
+        while evaluations < budget:
+            if i >= last:
+                # End of a full pass: stop once a pass finds nothing to improve
+                if not self._improved_this_pass:
+                    self.converged = True
+                    break
+                self._improved_this_pass = False
+                i, j = 1, 2
+                continue
+            if j > last:
+                i += 1
+                j = i + 1
+                continue
+
+            a, b = sequence[i - 1], sequence[i]
+            c, e = sequence[j], sequence[j + 1]
+            delta = (self.distance(a, c) + self.distance(b, e)
+                     - self.distance(a, b) - self.distance(c, e))
+            evaluations += 1
+            if delta < 0:
+                sequence[i:j + 1] = sequence[i:j + 1][::-1]
+                self._improved_this_pass = True
+            j += 1
+
+        self._cursor = (i, j)
+        self.route = sequence[:-1]
+        return evaluations
+
+    def route_length(self, position: Tuple[int, int]) -> int:
+        """Total path length of the current route starting from position."""
+        sequence = [position] + self.route + [self.flag_position]
+        return sum(self.distance(sequence[k + 1], sequence[k]) for k in range(len(sequence) - 1))
+
+    def next_target(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        """Return the next food (or the flag) to head for, improving the route along the way."""
+        if not self.built:
+            self.build(position)
+        else:
+            self.sync()
+        self.improve(self.improve_budget)
+        return self.route[0] if self.route else self.flag_position
@@ -0,0 +1,69 @@
+# algorithms/ucs.py
+from typing import List, Tuple, Optional, Dict
+from heapq import heappush, heappop
+from environment.grid import Grid
+
+class UCS:
+    """Uniform-cost search: entering a cell costs 1 plus its penalty (e.g. ghost danger)."""
+
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self.nodes_expanded = 0  # Nodes popped by the last search
+
+    def cost_map(self, start: Tuple[int, int],
+                 penalties: Optional[Dict[Tuple[int, int], float]] = None) -> Dict[Tuple[int, int], float]:
+        """
+        Compute the cheapest cost from start to every reachable cell.
+        Returns a dict {position: cost}, empty if start is not valid.
+        """
+        penalties = penalties or {}
+        if not self.grid.is_valid(start):
+            return {}
+
+        costs = {}
+        open_set = [(0, start)]
+        while open_set:
+            cost, current = heappop(open_set)
+            if current in costs:
+                continue  # Already settled with a lower cost
+            costs[current] = cost
+            for neighbor in self.grid.get_neighbors(current):
+                if neighbor not in costs:
+                    heappush(open_set, (cost + 1 + penalties.get(neighbor, 0), neighbor))
+        return costs
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int],
+                  penalties: Optional[Dict[Tuple[int, int], float]] = None) -> Optional[List[Tuple[int, int]]]:
+        """
+        Find the cheapest path from start to goal using Uniform-Cost Search.
+        Returns path as list of positions or None if no path exists.
+        """
+        penalties = penalties or {}
+        self.nodes_expanded = 0
+        if not self.grid.is_valid(start) or not self.grid.is_valid(goal):
+            return None
+
+        came_from = {start: None}
+        g_score = {start: 0}
+        open_set = [(0, start)]
+        while open_set:
+            cost, current = heappop(open_set)
+            if cost > g_score[current]:
+                continue  # Stale queue entry
+            self.nodes_expanded += 1
+
+            if current == goal:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = came_from[current]
+                return path[::-1]
+
+            for neighbor in self.grid.get_neighbors(current):
+                tentative_g_score = cost + 1 + penalties.get(neighbor, 0)
+                if tentative_g_score < g_score.get(neighbor, float('inf')):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    heappush(open_set, (tentative_g_score, neighbor))
+
+        return None  # No path found
@@ -1,7 +1,58 @@
 # Game Settings Configuration
+import os
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # The project directory
 
 CELL_SIZE = 32
 FPS = 8  # Slightly slower for better visibility
+DISPLAY_BACKEND = "pygame"        # "pygame" (window), "console", "null" (no output) or "frames" (recording)
+FRAME_EXPORT_FORMAT = "png"       # Recording format of the "frames" backend: "png", "gif" or "array"
+FRAME_EXPORT_PATH = "recordings/game"  # Directory of the PNG frames, or GIF file (".gif" added)
+SIM_SECONDS_PER_TICK = 1 / 8  # Simulated time per game tick used by scoring, whatever the real frame rate
+VIEW_MAX_WIDTH = 960              # Largest game area of the pygame window in pixels, bigger maps scroll in it
+VIEW_MAX_HEIGHT = 704
+VIEW_CHUNK_CELLS = 16             # Side in cells of the pre-rendered chunks of walls and food
+VIEW_CHUNK_CACHE = 64             # Chunks kept rendered, the least recently shown are dropped first
+ZOOM_LEVELS = (8, 12, 16, 24, 32, 48)  # Cell sizes the +/- keys and mouse wheel step through
+CAMERA_FOLLOW = 0                 # Index of the Pacman the camera keeps in view, None for a free camera
+MINIMAP_SIZE = 160                # Largest side of the minimap shown when the map does not fit, 0 disables it
+# Font lookups and sprite atlases kept across launches, whatever the working directory; None keeps them in memory
+ASSET_CACHE_DIR = os.path.join(_ROOT, "data", "cache")
+POPUP_SECONDS = 4.0               # Time a score popup rises and fades over, whatever the frame rate
+POPUP_RISE = 64                   # Pixels a score popup moves up over its life
+POPUP_CAPACITY = 4096             # Score popups shown at once, the oldest gives way to a new one beyond it
+
+# Agent Settings
+PACMAN_STRATEGY = "greedy"        # "greedy" (one food at a time), "route" (planned tour over all food)
+                                  # or "incremental" (D* Lite replanning around ghosts), "remote" is for the game server
+ROUTE_IMPROVE_BUDGET = 200        # 2-opt move evaluations per tick for the route planner
+PACMAN_PARAMS = {}                # Overrides of PacmanAgent's heuristic constants by name (see agents/agent_params.py),
+                                  # e.g. the best candidate of `python -m logic.tuner`
+PATH_SEARCH = "shortest"          # "shortest" (A*, unsafe paths rejected) or "weighted" (A* over ghost danger costs)
+KERNEL_BACKEND = "auto"           # Search kernels: "python", "numba" (jit-compiled, optional dependency), "arrays" or
+                                  # "auto" (numba when installed), see algorithms/kernels.py
+INFLUENCE_RADIUS = 2              # Distance around a ghost with a danger cost
+INFLUENCE_WEIGHT = 10             # Danger cost per step of closeness to a ghost
+GHOST_PREDICTION = "corridor"     # "corridor" (follow each ghost's corridor 3 moves) or "markov" (exact random-walk
+                                  # occupancy probabilities, see environment/ghost_forecast.py)
+CAPTURE_RISK = 0.25               # Ghost occupancy probability from which a cell is unsafe with "markov" prediction
+GHOST_POLICIES = ["random"]       # Per-ghost policy, cycled: "random", "chase", "ambush", "scatter" or "classic"
+AGENT_EXECUTOR = "sync"           # "sync" (agents decide one after another) or "thread" (concurrent, with deadline)
+AGENT_DEADLINE_MS = 50            # Time an agent gets to decide in "thread" mode before its fallback is used
+PACMAN_FALLBACK = "path"          # Action on a missed deadline: "path" (next step of current path) or "stay"
+GHOST_FALLBACK = "random"         # Action on a missed deadline: "random" (random legal move) or "stay"
+SCORING_PROFILE = "game"          # Intelligence formula: "game" (time, path, decisions, safety) or "agent" (PacmanAgent's)
+METRICS_DB = None                 # SQLite file episode results and high scores are appended to, e.g. "data/metrics.db"
+METRICS_TICKS = False             # Also record every Pacman's position and score on every tick
+DECISION_CACHE_SIZE = 0           # Pacman decisions remembered per map and configuration (LRU), 0 disables the cache
+DECISION_CACHE_PATH = None        # File the cached decisions are loaded from and saved to, e.g. "data/map1.book"
+DECISION_BOOK_SHM = None          # Name of a shared memory decision book to use instead (see DecisionCache.share)
+
+# Game Server Settings (python -m logic.game_server)
+SERVER_MAPS_DIR = os.path.join(_ROOT, "data", "maps")  # Maps clients can JOIN, by file name without ".txt"
+SERVER_DEADLINE_MS = 100          # Time a client gets to send a tick's actions before its Pacmen stay
+SERVER_MAX_TICKS = 1000           # Moves after which an unfinished game ends with LIMIT
+SERVER_MAX_SESSIONS = 1000        # Connections refused beyond this many
 
 # Enhanced Colors (RGB)
 COLOR_BG = (10, 10, 40)           # Dark blue background
@@ -16,4 +67,4 @@ COLOR_STATUS_BAR = (30, 30, 80)
 COLOR_BORDER = (100, 100, 200)
 COLOR_TEXT = (255, 255, 255)
 COLOR_VICTORY = (50, 255, 50)
-COLOR_GAME_OVER = (255, 50, 50)
\ No newline at end of file
+COLOR_GAME_OVER = (255, 50, 50)
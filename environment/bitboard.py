@@ -0,0 +1,122 @@
+# environment/bitboard.py
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+
+# Boards above this many bits convert to positions through NumPy instead of a per-bit table
+_TABLE_BITS = 4096
+
+
+class Bitboard:
+    """
+    Whole-map sets of cells as Python ints, one bit per cell: bit
+    y * stride + x for cell (x, y), with stride = width + 1 so every row ends
+    with a guard bit that is never open. Moving a whole set one step in every
+    direction is then four shifts and an AND with the open cells; the guard
+    column stops left/right shifts from wrapping to the next row and the mask
+    drops whatever falls off the top or bottom. Flood fills, BFS layers and
+    reachability cost one such step per distance instead of one visit per
+    cell, whatever the size of the map.
+
+    open holds the walkable cells, food the cells with food (kept in sync with
+    the grid, see Grid.get_bitboard).
+    """
+
+    def __init__(self, grid):
+        from environment.grid import CELL_WALL, CELL_FOOD  # Lazy: grid builds its bitboard on first use
+        self.width, self.height = grid.width, grid.height
+        self.stride = grid.width + 1
+        cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.height, grid.width)
+        self.open = self._from_mask(cells != CELL_WALL)
+        self.food = self._from_mask(cells == CELL_FOOD)
+        self._table = None  # Position of every bit on small boards
+        if self.height * self.stride <= _TABLE_BITS:
+            self._table = [(i % self.stride, i // self.stride) for i in range(self.height * self.stride)]
+
+    def _from_mask(self, mask: np.ndarray) -> int:
+        """Bitboard of the True cells of a (height, width) mask"""
+        padded = np.zeros((self.height, self.stride), dtype=bool)
+        padded[:, :self.width] = mask
+        return int.from_bytes(np.packbits(padded.ravel(), bitorder="little").tobytes(), "little")
+
+    def bit(self, pos: Tuple[int, int]) -> int:
+        """Single-cell bitboard, 0 outside the map"""
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return 1 << (y * self.stride + x)
+        return 0
+
+    def from_positions(self, positions: Iterable[Tuple[int, int]]) -> int:
+        bits = 0
+        for pos in positions:
+            bits |= self.bit(pos)
+        return bits
+
+    def _bit_indices(self, bits: int) -> np.ndarray:
+        """Indices of the set bits, lowest first"""
+        data = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        nonzero = np.flatnonzero(data)  # Only the bytes holding cells are unpacked
+        offsets = np.flatnonzero(np.unpackbits(data[nonzero], bitorder="little"))
+        return nonzero[offsets // 8] * 8 + offsets % 8
+
+    def indices(self, bits: int) -> np.ndarray:
+        """Grid indices (y * width + x) of the cells in bits, in row-major order"""
+        positions = self._bit_indices(bits)
+        return positions // self.stride * self.width + positions % self.stride
+
+    def positions(self, bits: int) -> List[Tuple[int, int]]:
+        """(x, y) of the cells in bits, in row-major order"""
+        if self._table is not None:
+            table, found = self._table, []
+            text = bin(bits)[:1:-1]  # Bit i is character i
+            i = text.find("1")
+            while i >= 0:
+                found.append(table[i])
+                i = text.find("1", i + 1)
+            return found
+        indices = self.indices(bits)
+        return list(zip((indices % self.width).tolist(), (indices // self.width).tolist()))
+
+    def count(self, bits: int) -> int:
+        return bin(bits).count("1")
+
+    def expand(self, bits: int) -> int:
+        """Open cells one move away from a cell of bits"""
+        stride = self.stride
+        return ((bits << 1) | (bits >> 1) | (bits << stride) | (bits >> stride)) & self.open
+
+    def distance_layers(self, sources: int, max_distance: Optional[int] = None) -> List[int]:
+        """Layer d holds the open cells exactly d moves from the nearest source"""
+        frontier = seen = sources & self.open
+        layers = []
+        while frontier and (max_distance is None or len(layers) <= max_distance):
+            layers.append(frontier)
+            frontier = self.expand(frontier) & ~seen
+            seen |= frontier
+        return layers
+
+    def reachable(self, sources: int, max_distance: Optional[int] = None) -> int:
+        """Open cells within max_distance moves (any distance by default) of a source"""
+        seen = frontier = sources & self.open
+        distance = 0
+        while frontier and (max_distance is None or distance < max_distance):
+            frontier = self.expand(frontier) & ~seen
+            seen |= frontier
+            distance += 1
+        return seen
+
+    def distance_field(self, sources: int) -> np.ndarray:
+        """Moves from the nearest source to every cell as a grid-indexed array, -1 where unreachable"""
+        field = np.full(self.width * self.height, -1, dtype=np.int32)
+        for distance, layer in enumerate(self.distance_layers(sources)):
+            field[self.indices(layer)] = distance
+        return field
+
+    def reachable_food(self, pos: Tuple[int, int]) -> int:
+        """Food cells a Pacman at pos can still get to"""
+        return self.reachable(self.bit(pos)) & self.food
+
+    def food_changed(self, pos: Tuple[int, int], present: bool):
+        if present:
+            self.food |= self.bit(pos)
+        else:
+            self.food &= ~self.bit(pos)
@@ -0,0 +1,203 @@
+# environment/corridor_graph.py
+from array import array
+from typing import List, Tuple, Dict, Optional
+import numpy as np
+
+class Edge:
+    """Corridor run between two nodes; cells lists the interior cells from a to b."""
+    __slots__ = ('a', 'b', 'cells', 'length', 'food')
+
+    def __init__(self, a: Tuple[int, int], b: Tuple[int, int], cells: List[Tuple[int, int]]):
+        self.a = a
+        self.b = b
+        self.cells = cells
+        self.length = len(cells) + 1
+        self.food = 0
+
+    def walk_from(self, node: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Cells visited when walking the edge from node to its other end (end node included)"""
+        if node == self.a:
+            return self.cells + [self.b]
+        return self.cells[::-1] + [self.a]
+
+
+class CorridorGraph:
+    """
+    Compressed maze graph: nodes are junctions and dead ends (any cell without
+    exactly two open neighbors), edges are the corridor runs joining them with
+    their length. A closed loop without junctions gets one arbitrary node.
+    Every corridor cell maps back to its edge and offset, and each edge keeps a
+    running count of the food lying on it.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.nodes: Dict[Tuple[int, int], List[int]] = {}  # node -> ids of incident edges
+        self.edges: List[Edge] = []
+        self.node_food: Dict[Tuple[int, int], bool] = {}
+        size = grid.width * grid.height
+        self._cell_edge = array('i', [-1]) * size
+        self._cell_offset = array('i', [-1]) * size
+        self._build()
+
+    @classmethod
+    def from_arrays(cls, grid, nodes, edges, cell_edge, cell_offset) -> 'CorridorGraph':
+        """
+        Rebuild a traced graph from the arrays stored in a map analysis artifact
+        (node coordinates, (a, b) node indices per edge, per-cell edge id and
+        offset) instead of walking the maze. Food counts come from the grid.
+        """
+        graph = cls.__new__(cls)
+        graph.grid = grid
+        node_list = [tuple(node) for node in nodes.tolist()]
+        graph.nodes = {node: [] for node in node_list}
+        graph._cell_edge = array('i', cell_edge.tobytes())
+        graph._cell_offset = array('i', cell_offset.tobytes())
+        # Corridor cells sorted by edge, then by offset along the edge
+        indices = np.flatnonzero(cell_edge >= 0)
+        indices = indices[np.lexsort((cell_offset[indices], cell_edge[indices]))]
+        bounds = np.cumsum(np.bincount(cell_edge[indices], minlength=len(edges))).tolist()
+        cells = list(zip((indices % grid.width).tolist(), (indices // grid.width).tolist()))
+        graph.edges = []
+        start = 0
+        for edge_id, ((a, b), end) in enumerate(zip(edges.tolist(), bounds)):
+            graph.edges.append(Edge(node_list[a], node_list[b], cells[start:end]))
+            graph.nodes[node_list[a]].append(edge_id)
+            if b != a:
+                graph.nodes[node_list[b]].append(edge_id)
+            start = end
+        # Food counts with one pass over the cell plane instead of per-cell lookups
+        from environment.grid import CELL_FOOD
+        is_food = np.frombuffer(bytes(grid.cells), dtype=np.uint8) == CELL_FOOD
+        edge_food = np.bincount(cell_edge[is_food & (cell_edge >= 0)], minlength=len(edges)).tolist()
+        for edge, food in zip(graph.edges, edge_food):
+            edge.food = food
+        graph.node_food = {node: bool(is_food[node[1] * grid.width + node[0]]) for node in node_list}
+        return graph
+
+    def _index(self, pos: Tuple[int, int]) -> int:
+        return pos[1] * self.grid.width + pos[0]
+
+    def _is_corridor(self, pos: Tuple[int, int]) -> bool:
+        return len(self.grid.get_valid_actions(pos)) == 2
+
+    def _build(self):
+        grid = self.grid
+        for y in range(grid.height):
+            for x in range(grid.width):
+                if grid.is_valid((x, y)) and not self._is_corridor((x, y)):
+                    self.nodes[(x, y)] = []
+        for node in list(self.nodes):
+            self._trace_edges(node)
+        # Loops made only of corridor cells have no junction: promote one cell to a node
+        for y in range(grid.height):
+            for x in range(grid.width):
+                pos = (x, y)
+                if grid.is_valid(pos) and pos not in self.nodes and self._cell_edge[self._index(pos)] == -1:
+                    self.nodes[pos] = []
+                    self._trace_edges(pos)
+        self._count_food()
+
+    def _count_food(self):
+        food = self.grid.get_food_positions()
+        for node in self.nodes:
+            self.node_food[node] = node in food
+        for edge in self.edges:
+            edge.food = sum(1 for cell in edge.cells if cell in food)
+
+    def _trace_edges(self, node: Tuple[int, int]):
+        """Walk every untraced corridor leaving node until the next node"""
+        for dx, dy in self.grid.get_valid_actions(node):
+            first = (node[0] + dx, node[1] + dy)
+            if first not in self.nodes and self._cell_edge[self._index(first)] != -1:
+                continue  # Corridor already traced from its other end
+            if first in self.nodes and any(
+                    self.edges[e].cells == [] and {self.edges[e].a, self.edges[e].b} == {node, first}
+                    for e in self.nodes[node]):
+                continue  # Direct link between adjacent nodes already recorded
+            cells, previous, current = [], node, first
+            while current not in self.nodes:
+                cells.append(current)
+                x, y = current
+                step = next((x + ddx, y + ddy) for ddx, ddy in self.grid.get_valid_actions(current)
+                            if (x + ddx, y + ddy) != previous)
+                previous, current = current, step
+            edge_id = len(self.edges)
+            self.edges.append(Edge(node, current, cells))
+            for offset, cell in enumerate(cells):
+                self._cell_edge[self._index(cell)] = edge_id
+                self._cell_offset[self._index(cell)] = offset
+            self.nodes[node].append(edge_id)
+            if current != node:
+                self.nodes[current].append(edge_id)
+
+    def locate(self, pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """(edge id, offset) of a corridor cell, None for nodes and walls"""
+        if pos in self.nodes or not self.grid.is_valid(pos):
+            return None
+        index = self._index(pos)
+        return (self._cell_edge[index], self._cell_offset[index])
+
+    def exits(self, pos: Tuple[int, int]) -> List[Tuple[Tuple[int, int], int, List[Tuple[int, int]]]]:
+        """
+        Ways out of pos onto the graph as (node, distance, cells walked to reach it).
+        A node is its own exit at distance 0.
+        """
+        if pos in self.nodes:
+            return [(pos, 0, [])]
+        located = self.locate(pos)
+        if located is None:
+            return []
+        edge_id, offset = located
+        edge = self.edges[edge_id]
+        return [
+            (edge.a, offset + 1, edge.cells[:offset][::-1] + [edge.a]),
+            (edge.b, len(edge.cells) - offset, edge.cells[offset + 1:] + [edge.b]),
+        ]
+
+    def neighbors(self, node: Tuple[int, int]) -> List[Tuple[Tuple[int, int], int, int]]:
+        """(neighbor node, corridor length, edge id) for every edge leaving node"""
+        result = []
+        for edge_id in self.nodes[node]:
+            edge = self.edges[edge_id]
+            if edge.a == node:
+                result.append((edge.b, edge.length, edge_id))
+            if edge.b == node:
+                result.append((edge.a, edge.length, edge_id))
+        return result
+
+    def food_changed(self, pos: Tuple[int, int], present: bool):
+        """Keep per-edge food counts in sync when food is eaten or placed"""
+        if pos in self.nodes:
+            self.node_food[pos] = present
+            return
+        located = self.locate(pos)
+        if located is not None:
+            self.edges[located[0]].food += 1 if present else -1
+
+    def follow(self, pos: Tuple[int, int], direction: Tuple[int, int], steps: int) -> List[Tuple[int, int]]:
+        """
+        Predict the cells a ghost moving along direction will occupy.
+        Corridors force the way (bends included), dead ends force a U-turn and
+        junctions are crossed straight ahead. Where going straight is impossible
+        the first turn in up/right/down/left order is assumed, so predictions
+        are deterministic.
+        """
+        path = []
+        x, y = pos
+        dx, dy = direction
+        for _ in range(steps):
+            actions = self.grid.get_valid_actions((x, y))
+            if (dx, dy) in actions:
+                pass
+            elif len(actions) == 2 and (-dx, -dy) in actions:
+                dx, dy = next(a for a in actions if a != (-dx, -dy))  # Bend of the corridor
+            elif len(actions) == 1:
+                dx, dy = actions[0]  # Dead end, turn around
+            elif actions:
+                dx, dy = next(a for a in actions if a != (-dx, -dy))  # Junction without a way straight on
+            else:
+                break
+            x, y = x + dx, y + dy
+            path.append((x, y))
+        return path
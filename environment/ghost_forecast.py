@@ -0,0 +1,130 @@
+# environment/ghost_forecast.py
+import threading
+from typing import List, Tuple
+import numpy as np
+
+_DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # up, right, down, left
+
+
+class GhostForecast:
+    """
+    Where random ghosts can be over the next few ticks, as exact probabilities.
+
+    A random ghost picks one of its legal moves uniformly (it stays put only
+    when it has none), so its position is a Markov chain over the open cells.
+    The transition matrix is built once per map in CSR form (indptr, indices,
+    data); each move of a ghost's distribution is one sparse vector-matrix
+    product over the few states it can have reached, so a forecast costs the
+    same on any map size. Ghosts move independently, so the probability that
+    a cell holds at least one ghost after t moves is 1 - prod(1 - p_g,t).
+    Forecasts are computed once per set of ghost positions and shared by
+    every Pacman deciding on that tick.
+    """
+
+    def __init__(self, grid, horizon: int = 3):
+        from environment.grid import CELL_WALL  # Lazy: grid builds its forecast on first use
+        self.grid = grid
+        self.horizon = horizon
+        width, height = grid.width, grid.height
+        open_cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(height, width) != CELL_WALL
+        self.cells = np.flatnonzero(open_cells)  # Grid index (y * width + x) of each state
+        self.cell_index = np.full(width * height, -1, dtype=np.int32)
+        self.cell_index[self.cells] = np.arange(len(self.cells), dtype=np.int32)
+
+        # Every legal move as a (source state, destination state) pair
+        xs, ys = self.cells % width, self.cells // width
+        sources, destinations = [], []
+        for dx, dy in _DIRECTIONS:
+            nx, ny = xs + dx, ys + dy
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            states = np.flatnonzero(inside)
+            targets = self.cell_index[ny[inside] * width + nx[inside]]
+            sources.append(states[targets >= 0])
+            destinations.append(targets[targets >= 0])
+        sources, destinations = np.concatenate(sources), np.concatenate(destinations)
+        stuck = np.flatnonzero(np.bincount(sources, minlength=len(self.cells)) == 0)  # Walled in: the ghost stays
+        sources = np.concatenate([sources, stuck])
+        destinations = np.concatenate([destinations, stuck])
+
+        # Row i of the matrix lists the states a ghost in i moves to, each with probability 1 / degree
+        order = np.argsort(sources, kind="stable")
+        self.degree = np.bincount(sources, minlength=len(self.cells))
+        self.indptr = np.concatenate([[0], np.cumsum(self.degree)])
+        self.indices = destinations[order]
+        self.data = 1.0 / self.degree[sources[order]]
+
+        self._key = None
+        self._risk = np.zeros((horizon + 1, len(self.cells)))  # Row t: P(a ghost is in the state after t moves)
+        self._peak = np.zeros((horizon, len(self.cells)))  # Row t - 1: highest risk over moves 1..t
+        self._support = np.empty(0, dtype=np.intp)  # States with a nonzero risk in the current forecast
+        self._lock = threading.Lock()  # Pacmen may decide concurrently (see AgentExecutor)
+
+    def step(self, states: np.ndarray, probabilities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        One move of a sparse distribution: the states it can reach and their
+        probabilities. States offset by multiples of the state count move
+        several ghosts' distributions in the same product.
+        """
+        size = len(self.cells)
+        offsets = states - states % size
+        states = states - offsets
+        counts = self.degree[states]
+        rows = np.repeat(np.arange(len(states)), counts)
+        entries = np.repeat(self.indptr[states] - np.cumsum(counts) + counts, counts) + np.arange(len(rows))
+        reached, slots = np.unique(offsets[rows] + self.indices[entries], return_inverse=True)
+        return reached, np.bincount(slots, weights=probabilities[rows] * self.data[entries])
+
+    def update(self, ghost_positions: List[Tuple[int, int]]):
+        """Forecast from these ghost positions, unless it is the current one"""
+        key = tuple(ghost_positions)
+        if key == self._key:
+            return
+        with self._lock:
+            if key == self._key:
+                return
+            width, height, size = self.grid.width, self.grid.height, len(self.cells)
+            states = [self.cell_index[y * width + x] if 0 <= x < width and 0 <= y < height else -1
+                      for x, y in ghost_positions]
+            states = np.array([state for state in states if state >= 0], dtype=np.intp)
+            walk = [(np.arange(len(states)) * size + states, np.ones(len(states)))]  # Ghost g at offset g * size
+            for _ in range(self.horizon):
+                walk.append(self.step(*walk[-1]))
+
+            # Combine the ghosts over the states any of them can reach
+            support = np.unique(np.concatenate([keys % size for keys, _ in walk]))
+            survive = np.ones((self.horizon + 1, len(support)))
+            for t, (keys, probabilities) in enumerate(walk):
+                np.multiply.at(survive[t], np.searchsorted(support, keys % size), 1.0 - probabilities)
+            risk = 1.0 - survive
+            self._risk[:, self._support] = 0.0  # Only the states of the last forecast need clearing
+            self._peak[:, self._support] = 0.0
+            self._risk[:, support] = risk
+            self._peak[:, support] = np.maximum.accumulate(risk[1:], axis=0)
+            self._support = support
+            self._key = key
+
+    def occupancy(self, step: int) -> np.ndarray:
+        """Probability that each state holds a ghost after step moves"""
+        return self._risk[step]
+
+    def risk(self, pos: Tuple[int, int], steps: int) -> float:
+        """Highest probability that pos holds a ghost within 1..steps moves of the current forecast"""
+        x, y = pos
+        if not (0 <= x < self.grid.width and 0 <= y < self.grid.height):
+            return 0.0
+        state = self.cell_index[y * self.grid.width + x]
+        if state < 0:
+            return 0.0
+        return float(self._peak[min(steps, self.horizon) - 1, state])
+
+    def risks(self, indices: np.ndarray, steps: int) -> np.ndarray:
+        """risk() of many cells at once, given by grid index (y * width + x)"""
+        states = self.cell_index[indices]
+        return np.where(states >= 0, self._peak[min(steps, self.horizon) - 1, states], 0.0)
+
+    def cells_at_risk(self, threshold: float, steps: int) -> List[Tuple[int, int]]:
+        """Open cells whose risk within steps moves reaches threshold"""
+        support = self._support
+        cells = self.cells[support[self._peak[min(steps, self.horizon) - 1, support] >= threshold]]
+        width = self.grid.width
+        return list(zip((cells % width).tolist(), (cells // width).tolist()))
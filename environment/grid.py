@@ -1,63 +1,215 @@
 import os
-from typing import List, Tuple
+from typing import List, Tuple, Iterator
+import numpy as np
+from environment.bitboard import Bitboard
+from environment.corridor_graph import CorridorGraph
+from environment.ghost_forecast import GhostForecast
+from environment.map_analysis import load_analysis
+from environment.zobrist import ZobristKeys
+
+# Cell types stored in Grid.cells, one byte per cell
+CELL_EMPTY = 0
+CELL_WALL = 1
+CELL_FOOD = 2
+
+# Map characters translated straight to cell types, everything else is empty
+_CELL_TABLE = bytes(CELL_WALL if c == ord('#') else CELL_FOOD if c == ord('.') else CELL_EMPTY for c in range(256))
+
+_DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # up, right, down, left
+_UNKNOWN_MASK = 0xFF
+# Legal moves for each 4-bit mask of open directions
+_ACTIONS_BY_MASK = [[d for bit, d in enumerate(_DIRECTIONS) if mask & (1 << bit)] for mask in range(16)]
+
+
+class CellPositions:
+    """
+    Read-only list-like view of every (x, y) position holding a given cell type.
+    Membership and len() are O(1), iteration scans the cell plane in row-major
+    order, which is the order the legacy position lists were built in.
+    """
+
+    def __init__(self, grid: 'Grid', cell_type: int):
+        self._grid = grid
+        self._cell_type = cell_type
+        self._count = grid.cells.count(cell_type)
+
+    def __contains__(self, pos) -> bool:
+        x, y = pos
+        grid = self._grid
+        return 0 <= x < grid.width and 0 <= y < grid.height and grid.cells[y * grid.width + x] == self._cell_type
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        cells, width, cell_type = self._grid.cells, self._grid.width, self._cell_type
+        index = cells.find(cell_type)
+        while index != -1:
+            yield (index % width, index // width)
+            index = cells.find(cell_type, index + 1)
+
+    def __getitem__(self, item):
+        return list(self)[item]
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def copy(self) -> List[Tuple[int, int]]:
+        return list(self)
+
+
+class FoodPositions(CellPositions):
+    """Food view that also supports the list mutations used on the legacy food list."""
+
+    def __init__(self, grid: 'Grid'):
+        super().__init__(grid, CELL_FOOD)
+
+    def remove(self, pos: Tuple[int, int]):
+        if pos not in self:
+            raise ValueError(f"{pos} has no food")
+        x, y = pos
+        self._grid.cells[y * self._grid.width + x] = CELL_EMPTY
+        self._count -= 1
+        self._grid._food_log.append((pos, False))
+        self._grid._food_changed(pos, False)
+
+    def append(self, pos: Tuple[int, int]):
+        x, y = pos
+        index = y * self._grid.width + x
+        if self._grid.cells[index] == CELL_EMPTY:
+            self._grid.cells[index] = CELL_FOOD
+            self._count += 1
+            self._grid._food_log.append((pos, True))
+            self._grid._food_changed(pos, True)
+
+    def clear(self):
+        for pos in list(self):
+            self.remove(pos)
+
+
+class _LegacyRow:
+    """One row of the legacy character grid: '#' for walls, agent symbols, ' ' otherwise."""
+
+    def __init__(self, grid: 'Grid', y: int):
+        self._grid = grid
+        self._offset = y * grid.width
+
+    def __getitem__(self, x: int) -> str:
+        if not 0 <= x < self._grid.width:
+            raise IndexError(x)
+        index = self._offset + x
+        symbol = self._grid._symbols.get(index)
+        if symbol is not None:
+            return symbol
+        return '#' if self._grid.cells[index] == CELL_WALL else ' '
+
+    def __setitem__(self, x: int, symbol: str):
+        if not 0 <= x < self._grid.width:
+            raise IndexError(x)
+        if symbol == ' ':
+            self._grid._symbols.pop(self._offset + x, None)
+        else:
+            self._grid._symbols[self._offset + x] = symbol
+
+    def __len__(self) -> int:
+        return self._grid.width
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[x] for x in range(self._grid.width))
+
+
+class _LegacyRows:
+    """List-of-rows view over the cell plane, built on access instead of stored."""
+
+    def __init__(self, grid: 'Grid'):
+        self._grid = grid
+
+    def __getitem__(self, y: int) -> _LegacyRow:
+        if not 0 <= y < self._grid.height:
+            raise IndexError(y)
+        return _LegacyRow(self._grid, y)
+
+    def __len__(self) -> int:
+        return self._grid.height
+
+    def __iter__(self) -> Iterator[_LegacyRow]:
+        return (_LegacyRow(self._grid, y) for y in range(self._grid.height))
+
 
 class Grid:
+    """
+    Maze loaded from a map file.
+
+    The whole layout is stored as a single bytearray `cells` of width * height
+    cell types (CELL_EMPTY, CELL_WALL, CELL_FOOD), indexed by y * width + x.
+    `walls`, `food_positions` and `grid` are lazy views over that plane that keep
+    the legacy list API, so a large map costs about one byte per cell.
+    """
+
     def __init__(self, map_path):
         self.map_path = map_path
-        self.grid = []
+        self.cells = bytearray()
+        self.width = 0
+        self.height = 0
         self.pacman_start_positions = []
         self.ghost_positions = []
-        self.food_positions = []
         self.flag_positions = []
-        self.walls = []
+        self._analysis = None  # Precomputed map analysis, opened on first use by get_analysis()
+        self._analysis_loaded = False
+        self._shared = None  # SharedGridView when the static layers live in shared memory
         self._load_map()
-        self.height = len(self.grid)
-        self.width = len(self.grid[0]) if self.grid else 0
         self._validate_counts()
 
     def _load_map(self):
         print(f"Loading map from {self.map_path}")
         with open(self.map_path, 'r') as f:
             lines = [line.rstrip('\n') for line in f if line.rstrip('\n')]
-        max_width = max(len(line) for line in lines)
+        self.height = len(lines)
+        self.width = max(len(line) for line in lines) if lines else 0
+        self.cells = bytearray(self.width * self.height)
+        self.pacman_start_positions = []
+        self.ghost_positions = []
+        self.flag_positions = []
         for y, line in enumerate(lines):
-            row = []
-            x = 0
-            print(f"Parsing line {y}: {line}")
-            while x < len(line):
-                if x + 1 < len(line) and line[x:x+2] in ['P1', 'P2', 'F1', 'F2']:
-                    token = line[x:x+2]
-                    print(f"Found token '{token}' at ({x}, {y})")
-                    if token.startswith('P'):
-                        self.pacman_start_positions.append((x, y))
-                    elif token.startswith('F'):
-                        self.flag_positions.append((x, y, token))
-                    row.append(' ')
-                    x += 2
+            # One byte per character keeps x aligned with the character index
+            row = line.encode('ascii', 'replace').translate(_CELL_TABLE)
+            self.cells[y * self.width:y * self.width + len(row)] = row
+            tokens = []
+            for token in ('P1', 'P2', 'F1', 'F2', 'G'):
+                x = line.find(token)
+                while x != -1:
+                    tokens.append((x, token))
+                    x = line.find(token, x + len(token))
+            for x, token in sorted(tokens):
+                if token == 'G':
+                    self.ghost_positions.append((x, y))
+                elif token.startswith('P'):
+                    self.pacman_start_positions.append((x, y))
                 else:
-                    char = line[x]
-                    print(f"Found char '{char}' at ({x}, {y})")
-                    if char == 'G':
-                        self.ghost_positions.append((x, y))
-                        row.append(' ')
-                    elif char == '.':
-                        self.food_positions.append((x, y))
-                        row.append(' ')
-                    elif char == '#':
-                        self.walls.append((x, y))
-                        row.append('#')  # Keep the wall character in the grid
-                    else:
-                        row.append(' ')
-                    x += 1
-            row.extend([' '] * (max_width - len(row)))
-            self.grid.append(row)
-        for row in self.grid:
-            row.extend([' '] * (max_width - len(row)))
+                    self.flag_positions.append((x, y, token))
+        self._init_views()
         print(f"Pacman positions: {self.pacman_start_positions}")
         print(f"Flag positions: {self.flag_positions}")
         print(f"Ghost positions: {self.ghost_positions}")
-        print(f"Food positions: {self.food_positions}")
-        print(f"Wall positions: {self.walls}")
+        print(f"Food count: {len(self.food_positions)}, wall count: {len(self.walls)}")
+
+    def _init_views(self, move_masks=None):
+        """Views and derived structures over a freshly loaded cell plane"""
+        self.walls = CellPositions(self, CELL_WALL)
+        self.food_positions = FoodPositions(self)
+        self.grid = _LegacyRows(self)
+        self._symbols = {}  # Agent symbols written through the legacy grid view
+        # Filled lazily by get_valid_actions, or a read-only shared table with every mask computed
+        self._move_masks = move_masks if move_masks is not None else bytearray([_UNKNOWN_MASK]) * len(self.cells)
+        self._corridor_graph = None  # Built on first use by get_corridor_graph()
+        self._zobrist = None  # Built on first use by get_zobrist()
+        self._ghost_forecast = None  # Built on first use by get_ghost_forecast()
+        self._bitboard = None  # Built on first use by get_bitboard()
+        self._influence_map = None  # Built on first use by get_influence_map()
+        self._food_log = []  # (pos, present) of every food change since loading, undone by reset()
 
     def _validate_counts(self):
         pacman_count = len(self.pacman_start_positions)
@@ -69,27 +221,96 @@ class Grid:
             )
 
     def is_wall(self, pos: Tuple[int, int]) -> bool:
-        """Check if position is a wall using the walls list for accuracy"""
-        return pos in self.walls
+        """Check if position is a wall (positions outside the map are not walls)"""
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] == CELL_WALL
 
     def is_valid(self, pos: Tuple[int, int]) -> bool:
         """Check if position is valid (within bounds and not a wall)"""
         x, y = pos
-        # First check bounds
-        if not (0 <= x < self.width and 0 <= y < self.height):
-            return False
-        # Then check if it's a wall
-        return not self.is_wall(pos)
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] != CELL_WALL
 
     def get_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
         x, y = pos
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-        neighbors = []
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if self.is_valid((nx, ny)):
-                neighbors.append((nx, ny))
-        return neighbors
+        return [(x + dx, y + dy) for dx, dy in self.get_valid_actions(pos)]
+
+    def get_valid_actions(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Legal (dx, dy) moves from pos, computed once per position and shared by all agents"""
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return [(dx, dy) for dx, dy in _DIRECTIONS if self.is_valid((x + dx, y + dy))]
+        index = y * self.width + x
+        mask = self._move_masks[index]
+        if mask == _UNKNOWN_MASK:
+            mask = 0
+            for bit, (dx, dy) in enumerate(_DIRECTIONS):
+                if self.is_valid((x + dx, y + dy)):
+                    mask |= 1 << bit
+            self._move_masks[index] = mask
+        return _ACTIONS_BY_MASK[mask]
+
+    def get_corridor_graph(self):
+        """Junction/corridor graph of the maze, built once and kept in sync with food changes"""
+        if self._corridor_graph is None:
+            analysis = self.get_analysis()
+            if analysis is not None:
+                self._corridor_graph = CorridorGraph.from_arrays(
+                    self, analysis.graph_nodes, analysis.graph_edges,
+                    analysis.graph_cell_edge, analysis.graph_cell_offset)
+            else:
+                self._corridor_graph = CorridorGraph(self)
+        return self._corridor_graph
+
+    def get_zobrist(self) -> ZobristKeys:
+        """Zobrist keys of the map, with the food hash kept in sync with food changes"""
+        if self._zobrist is None:
+            self._zobrist = ZobristKeys(self)
+        return self._zobrist
+
+    def get_ghost_forecast(self) -> GhostForecast:
+        """Random ghost occupancy forecast over the maze, built once and shared by all agents"""
+        if self._ghost_forecast is None:
+            self._ghost_forecast = GhostForecast(self)
+        return self._ghost_forecast
+
+    def get_influence_map(self, radius: int, weight: float):
+        """Ghost danger grid shared by all agents, built once with the radius and weight of its first user"""
+        if self._influence_map is None:
+            from environment.influence_map import InfluenceMap  # Lazy: influence_map imports this module
+            self._influence_map = InfluenceMap(self, radius, weight)
+        return self._influence_map
+
+    def get_bitboard(self) -> Bitboard:
+        """Open cells and food as bitboards for whole-map flood fills, with the food kept in sync"""
+        if self._bitboard is None:
+            self._bitboard = Bitboard(self)
+        return self._bitboard
+
+    def get_move_masks(self) -> np.ndarray:
+        """get_valid_actions' table of 4-bit open direction masks with every cell filled in, as a flat array"""
+        if isinstance(self._move_masks, bytearray) and _UNKNOWN_MASK in self._move_masks:  # Shared tables are complete
+            from environment.shared_grid import move_mask_plane  # Lazy: shared_grid imports this module
+            self._move_masks[:] = move_mask_plane(self).tobytes()
+        return np.frombuffer(self._move_masks, dtype=np.uint8)
+
+    def get_analysis(self):
+        """
+        MapAnalysis written next to the map by `python -m environment.map_analysis`,
+        memory-mapped on first call; None when there is none or it is stale.
+        """
+        if not self._analysis_loaded:
+            self._analysis = self._shared.analysis() if self._shared is not None else load_analysis(self.map_path)
+            self._analysis_loaded = True
+        return self._analysis
+
+    def _food_changed(self, pos: Tuple[int, int], present: bool):
+        """Propagate a food change to the structures derived from the cell plane"""
+        if self._corridor_graph is not None:
+            self._corridor_graph.food_changed(pos, present)
+        if self._zobrist is not None:
+            self._zobrist.food_changed(pos)
+        if self._bitboard is not None:
+            self._bitboard.food_changed(pos, present)
 
     def update_position(self, old_pos: Tuple[int, int], new_pos: Tuple[int, int], symbol: str):
         """Update position only if the new position is valid"""
@@ -129,26 +350,32 @@ class Grid:
         return self.ghost_positions
 
     def reset(self):
-        self.grid = []
-        self.pacman_start_positions = []
-        self.ghost_positions = []
-        self.food_positions = []
-        self.flag_positions = []
-        self.walls = []
-        self._load_map()
-        self._validate_counts()
+        """
+        Put the map back in its loaded state in place: food changes are undone
+        one by one, so move masks, the analysis, the corridor graph and every
+        other structure derived from the static layout survive the restart.
+        """
+        if self._shared is not None:
+            self._shared.restore_food(self)  # Attached grids may not start from the block's food
+        else:
+            for pos, present in reversed(self._food_log):
+                x, y = pos
+                self.cells[y * self.width + x] = CELL_EMPTY if present else CELL_FOOD
+                self.food_positions._count += -1 if present else 1
+                self._food_changed(pos, not present)
+        self._food_log.clear()
+        self._symbols.clear()
+
+    def __reduce_ex__(self, protocol):
+        """Grids attached to shared memory pickle as the block name plus their food"""
+        if self._shared is None:
+            return super().__reduce_ex__(protocol)
+        return self._shared.reduce(self)
 
     def print_grid(self):
         for row in self.grid:
             print(''.join(row))
 
     def get_legal_actions(self, position: Tuple[int, int]) -> List[str]:
-        actions = []
-        x, y = position
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # up, right, down, left
         direction_names = ['UP', 'RIGHT', 'DOWN', 'LEFT']
-        
-        for i, (dx, dy) in enumerate(directions):
-            if self.is_valid((x + dx, y + dy)):
-                actions.append(direction_names[i])
-        return actions
\ No newline at end of file
+        return [direction_names[_DIRECTIONS.index(action)] for action in self.get_valid_actions(position)]
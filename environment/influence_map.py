@@ -0,0 +1,75 @@
+# environment/influence_map.py
+import threading
+from typing import List, Tuple, Dict, Iterable
+import numpy as np
+from environment.grid import CELL_WALL
+
+class InfluenceMap:
+    """
+    Per-tick danger cost of the grid cells. Every ghost (and, at a lower
+    weight, every cell it is predicted to move through) stamps a diamond of
+    weight * (radius + 1 - distance) around itself; overlapping stamps keep
+    the highest value. All stamps are applied in one vectorized pass.
+    The grid keeps one map shared by all Pacmen (Grid.get_influence_map), built
+    once per tick: an update with the sources of the current one is free.
+    """
+
+    def __init__(self, grid, radius: int = 2, weight: float = 10.0, predicted_weight: float = 0.5):
+        self.grid = grid
+        self.radius = radius
+        self.weight = weight
+        self.predicted_weight = predicted_weight  # Scale of the stamps of predicted ghost cells
+        self.danger = np.zeros((grid.height, grid.width), dtype=np.float32)
+        self.penalties: Dict[Tuple[int, int], float] = {}  # Nonzero danger of open cells
+        dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        distance = np.abs(dx) + np.abs(dy)
+        inside = distance <= radius
+        self._offsets = np.stack([dx[inside], dy[inside]], axis=1)
+        self._kernel = (weight * (radius + 1 - distance[inside])).astype(np.float32)
+        self._flat = self.danger.reshape(-1)  # Flat view of danger, indexed y * width + x
+        self._stamped = np.empty(0, dtype=np.intp)
+        self._key = None  # Sources of the current danger grid
+        self._lock = threading.Lock()  # Pacmen may decide concurrently (see AgentExecutor)
+
+    def update(self, ghost_positions: List[Tuple[int, int]],
+               predicted_positions: Iterable[Tuple[int, int]] = ()) -> Dict[Tuple[int, int], float]:
+        """Rebuild the danger grid for this tick, unless it is the current one, and return its penalties"""
+        predicted = list(predicted_positions)
+        key = (tuple(ghost_positions), tuple(predicted))
+        if key == self._key:
+            return self.penalties
+        with self._lock:
+            if key != self._key:
+                self._stamp(ghost_positions, predicted)
+                self._key = key
+        return self.penalties
+
+    def _stamp(self, ghost_positions: List[Tuple[int, int]], predicted: List[Tuple[int, int]]):
+        self._flat[self._stamped] = 0  # Only the cells stamped last tick need clearing
+        sources = np.array(list(ghost_positions) + predicted, dtype=np.intp).reshape(-1, 2)
+        scale = np.ones(len(sources), dtype=np.float32)
+        scale[len(sources) - len(predicted):] = self.predicted_weight
+
+        width, height = self.grid.width, self.grid.height
+        cells = sources[:, None, :] + self._offsets[None, :, :]  # (sources, kernel cells, xy)
+        xs, ys = cells[..., 0].ravel(), cells[..., 1].ravel()
+        values = (scale[:, None] * self._kernel[None, :]).ravel()
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        indices = ys[inside] * width + xs[inside]
+        np.maximum.at(self._flat, indices, values[inside])
+
+        self._stamped = np.unique(indices)
+        open_cells = self._stamped[np.frombuffer(self.grid.cells, dtype=np.uint8)[self._stamped] != CELL_WALL]
+        positions = zip((open_cells % width).tolist(), (open_cells // width).tolist())
+        self.penalties = dict(zip(positions, self._flat[open_cells].tolist()))
+
+    def reset(self):
+        """Clear the danger of the last update"""
+        self._flat[self._stamped] = 0
+        self._stamped = self._stamped[:0]
+        self.penalties = {}
+        self._key = None
+
+    def cost(self, pos: Tuple[int, int]) -> float:
+        """Danger of entering pos (0 when no ghost is near)"""
+        return self.penalties.get(pos, 0.0)
@@ -0,0 +1,253 @@
+# environment/map_analysis.py
+import argparse
+import hashlib
+import os
+from collections import deque
+from typing import List, Tuple, Dict, Optional
+import numpy as np
+from environment.corridor_graph import CorridorGraph
+from environment import packed_arrays
+from algorithms import kernels
+
+MAGIC = b"PACMAP1\n"
+VERSION = 1
+
+def artifact_path(map_path: str) -> str:
+    """Where the analysis of a map file lives: next to it, with an .analysis extension"""
+    return os.path.splitext(map_path)[0] + ".analysis"
+
+def map_digest(map_path: str) -> str:
+    with open(map_path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _distance_field(grid, start: Tuple[int, int]) -> np.ndarray:
+    """BFS distance from start to every cell, -1 for walls and unreachable cells"""
+    accelerated = kernels.accelerated()
+    if accelerated is not None and grid.is_valid(start):
+        return accelerated.bfs(grid.get_move_masks(), grid.width, start[1] * grid.width + start[0])
+    bitboard = grid.get_bitboard()
+    return bitboard.distance_field(bitboard.bit(start))
+
+def _trap_depths(grid) -> np.ndarray:
+    """
+    Steps needed to leave the dead-end branch a cell lies in (0 outside dead
+    ends). Dead ends are found by repeatedly peeling cells with at most one
+    open neighbor; what remains are the cells on loops. In a component without
+    any loop, depths count from the last cells peeled (its center).
+    """
+    width, size = grid.width, grid.width * grid.height
+    cells = [(i % width, i // width) for i in range(size) if grid.is_valid((i % width, i // width))]
+    degree = {cell: len(grid.get_valid_actions(cell)) for cell in cells}
+    peel_layer: Dict[Tuple[int, int], int] = {}  # Round in which each dead-end cell was peeled
+    layer = [cell for cell in cells if degree[cell] <= 1]
+    round_number = 0
+    while layer:
+        for cell in layer:
+            peel_layer[cell] = round_number
+        next_layer = []
+        for cell in layer:
+            for neighbor in grid.get_neighbors(cell):
+                if neighbor not in peel_layer:
+                    degree[neighbor] -= 1
+                    if degree[neighbor] == 1:
+                        next_layer.append(neighbor)
+        layer = next_layer
+        round_number += 1
+
+    depths = np.zeros(size, dtype=np.uint16)
+
+    def spread(seeds: List[Tuple[int, int]], depth: int, seen: set):
+        queue = deque((cell, depth) for cell in seeds)
+        while queue:
+            (x, y), depth = queue.popleft()
+            if (x, y) in peel_layer:
+                depths[y * width + x] = depth
+            for neighbor in grid.get_neighbors((x, y)):
+                if neighbor in peel_layer and neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append((neighbor, depth + 1))
+
+    # Dead ends hanging off loops: distance from the loop cell they branch from
+    seen = {cell for cell in cells if cell not in peel_layer}
+    spread(list(seen), 0, seen)
+    # Loop-free components: every cell is a dead end, measured from the center
+    for cell in cells:
+        if cell in seen:
+            continue
+        component, queue = [cell], [cell]
+        seen.add(cell)
+        while queue:
+            for neighbor in grid.get_neighbors(queue.pop()):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    component.append(neighbor)
+                    queue.append(neighbor)
+        innermost = max(peel_layer[c] for c in component)
+        center = [c for c in component if peel_layer[c] == innermost]
+        spread(center, 1, set(center))
+    return depths
+
+def _articulation_points(grid) -> np.ndarray:
+    """Cells whose removal disconnects the maze (choke points), iterative Tarjan"""
+    width, size = grid.width, grid.width * grid.height
+    mask = np.zeros(size, dtype=np.uint8)
+    order, low = {}, {}
+    counter = 0
+    for root in ((i % width, i // width) for i in range(size)):
+        if root in order or not grid.is_valid(root):
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        root_children = 0
+        stack = [(root, None, iter(grid.get_neighbors(root)))]
+        while stack:
+            cell, parent, neighbors = stack[-1]
+            advanced = False
+            for neighbor in neighbors:
+                if neighbor == parent:
+                    continue
+                if neighbor in order:
+                    low[cell] = min(low[cell], order[neighbor])
+                else:
+                    order[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    if cell == root:
+                        root_children += 1
+                    stack.append((neighbor, cell, iter(grid.get_neighbors(neighbor))))
+                    advanced = True
+                    break
+            if advanced:
+                continue
+            stack.pop()
+            if parent is not None:
+                low[parent] = min(low[parent], low[cell])
+                if parent != root and low[cell] >= order[parent]:
+                    mask[parent[1] * width + parent[0]] = 1
+        if root_children > 1:
+            mask[root[1] * width + root[0]] = 1
+    return mask
+
+def key_points(grid) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """Names and positions of the starts, flags and ghost spawns, in map order"""
+    names, points = [], []
+    for i, pos in enumerate(grid.get_start_positions()):
+        names.append(f"P{i+1}")
+        points.append(pos)
+    for x, y, flag_id in grid.get_flag_positions():
+        names.append(flag_id)
+        points.append((x, y))
+    for i, pos in enumerate(grid.get_ghost_positions()):
+        names.append(f"G{i+1}")
+        points.append(pos)
+    return names, points
+
+def analyze(grid) -> Tuple[Dict[str, object], Dict[str, np.ndarray]]:
+    """Run every analysis on a loaded grid; returns (header metadata, arrays)"""
+    names, points = key_points(grid)
+    fields = np.stack([_distance_field(grid, pos) for pos in points]) if points else \
+        np.zeros((0, grid.width * grid.height), dtype=np.int32)
+    flat_points = [y * grid.width + x for x, y in points]
+    graph = CorridorGraph(grid)  # Traced from the maze, never from an existing artifact
+    node_list = list(graph.nodes)
+    node_ids = {node: i for i, node in enumerate(node_list)}
+    arrays = {
+        "key_points": np.array(points, dtype=np.int32).reshape(-1, 2),
+        "key_distances": fields[:, flat_points] if points else np.zeros((0, 0), dtype=np.int32),
+        "key_fields": fields.reshape(len(points), grid.height, grid.width),
+        "trap_depth": _trap_depths(grid).reshape(grid.height, grid.width),
+        "articulation": _articulation_points(grid).reshape(grid.height, grid.width),
+        "graph_nodes": np.array(node_list, dtype=np.int32).reshape(-1, 2),
+        "graph_edges": np.array([(node_ids[e.a], node_ids[e.b]) for e in graph.edges], dtype=np.int32).reshape(-1, 2),
+        "graph_cell_edge": np.frombuffer(graph._cell_edge, dtype=np.int32),
+        "graph_cell_offset": np.frombuffer(graph._cell_offset, dtype=np.int32),
+    }
+    header = {"version": VERSION, "map_sha1": map_digest(grid.map_path), "width": grid.width,
+              "height": grid.height, "key_names": names}
+    return header, arrays
+
+class MapAnalysis:
+    """
+    Precomputed structure of one map, read from its artifact. Arrays are
+    memory-mapped on first access, so opening is cheap whatever the map size.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self.header, self._data_start = packed_arrays.read_header(f, MAGIC)
+            except ValueError:
+                raise ValueError(f"{path} is not a map analysis file")
+        self.key_names: List[str] = self.header["key_names"]
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._key_index: Optional[Dict[Tuple[int, int], int]] = None
+
+    @classmethod
+    def from_arrays(cls, header: Dict[str, object], arrays: Dict[str, np.ndarray]) -> 'MapAnalysis':
+        """Analysis over arrays already in memory (e.g. a shared memory block)"""
+        analysis = cls.__new__(cls)
+        analysis.path = None
+        analysis.header = dict(header, arrays={name: None for name in arrays})
+        analysis.key_names = header["key_names"]
+        analysis._arrays = dict(arrays)
+        analysis._key_index = None
+        return analysis
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        arrays = self.__dict__.get("_arrays", {})
+        if name in arrays:
+            return arrays[name]
+        spec = self.__dict__.get("header", {}).get("arrays", {}).get(name)
+        if spec is None:
+            raise AttributeError(name)
+        if int(np.prod(spec["shape"])) == 0:
+            self._arrays[name] = np.zeros(spec["shape"], dtype=spec["dtype"])
+        else:
+            self._arrays[name] = np.memmap(self.path, dtype=spec["dtype"], mode="r", shape=tuple(spec["shape"]),
+                                           offset=self._data_start + spec["offset"])
+        return self._arrays[name]
+
+    def key_index(self, pos: Tuple[int, int]) -> Optional[int]:
+        """Index of pos among the key points, None if it is not one"""
+        if self._key_index is None:
+            self._key_index = {(x, y): i for i, (x, y) in enumerate(self.key_points.tolist())}
+        return self._key_index.get(pos)
+
+    def distance(self, key: int, pos: Tuple[int, int]) -> int:
+        """Maze distance from key point number key to pos, -1 if unreachable"""
+        return int(self.key_fields[key, pos[1], pos[0]])
+
+    def is_trap(self, pos: Tuple[int, int]) -> bool:
+        return self.trap_depth[pos[1], pos[0]] > 0
+
+    def is_articulation(self, pos: Tuple[int, int]) -> bool:
+        return bool(self.articulation[pos[1], pos[0]])
+
+
+def load_analysis(map_path: str) -> Optional[MapAnalysis]:
+    """Open the artifact of a map if it exists and was built from the current map file"""
+    path = artifact_path(map_path)
+    if not os.path.exists(path):
+        return None
+    analysis = MapAnalysis(path)
+    if analysis.header.get("version") != VERSION or analysis.header.get("map_sha1") != map_digest(map_path):
+        print(f"Ignoring stale map analysis {path}, rerun python -m environment.map_analysis {map_path}")
+        return None
+    return analysis
+
+def analyze_map(map_path: str) -> str:
+    """Analyze a map file and write its artifact next to it; returns the artifact path"""
+    from environment.grid import Grid
+    grid = Grid(map_path)
+    header, arrays = analyze(grid)
+    path = artifact_path(map_path)
+    packed_arrays.write(path, MAGIC, header, arrays)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute map structure next to map files")
+    parser.add_argument("maps", nargs="+", help="map files, e.g. data/maps/map1.txt")
+    for map_path in parser.parse_args().maps:
+        print(f"Wrote {analyze_map(map_path)}")
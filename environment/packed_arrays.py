@@ -0,0 +1,93 @@
+# environment/packed_arrays.py
+import json
+import struct
+import multiprocessing
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Tuple
+import numpy as np
+
+# Layout shared by the files and shared memory blocks holding precomputed arrays:
+# magic (8 bytes), data start (uint64), JSON header, then each array at an
+# offset aligned so memory maps and shared blocks start arrays on cache lines.
+_ALIGN = 64
+
+def _aligned(size: int) -> int:
+    return -(-size // _ALIGN) * _ALIGN
+
+def pack(magic: bytes, header: Dict[str, object], arrays: Dict[str, np.ndarray]) -> bytearray:
+    """Serialize a header and named arrays into one buffer"""
+    header = dict(header, arrays={})
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += _aligned(array.nbytes)
+    encoded = json.dumps(header).encode()
+    data_start = _aligned(len(magic) + 8 + len(encoded))
+    buffer = bytearray(data_start + offset)
+    buffer[:len(magic) + 8] = magic + struct.pack("<Q", data_start)
+    buffer[len(magic) + 8:len(magic) + 8 + len(encoded)] = encoded
+    for name, array in arrays.items():
+        start = data_start + header["arrays"][name]["offset"]
+        buffer[start:start + array.nbytes] = np.ascontiguousarray(array).tobytes()
+    return buffer
+
+def write(path: str, magic: bytes, header: Dict[str, object], arrays: Dict[str, np.ndarray]):
+    with open(path, "wb") as f:
+        f.write(pack(magic, header, arrays))
+
+def read_header(buffer, magic: bytes) -> Tuple[Dict[str, object], int]:
+    """(header, data start) of a packed buffer; buffer may be bytes, a memoryview or an open file"""
+    if hasattr(buffer, "read"):
+        prefix = buffer.read(len(magic) + 8)
+    else:
+        prefix = bytes(buffer[:len(magic) + 8])
+    if prefix[:len(magic)] != magic:
+        raise ValueError("Not a packed array buffer of the expected kind")
+    data_start, = struct.unpack("<Q", prefix[len(magic):])
+    if hasattr(buffer, "read"):
+        encoded = buffer.read(data_start - len(magic) - 8)
+    else:
+        encoded = bytes(buffer[len(magic) + 8:data_start])
+    return json.loads(encoded.rstrip(b"\0")), data_start
+
+def views(buffer, header: Dict[str, object], data_start: int) -> Dict[str, np.ndarray]:
+    """Zero-copy arrays over a packed buffer (read-only when the buffer is)"""
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                     offset=data_start + spec["offset"]).reshape(spec["shape"])
+    return arrays
+
+
+class SharedBlock(shared_memory.SharedMemory):
+    """
+    Shared memory block holding a packed buffer. close() leaves the mapping in
+    place while arrays still view it instead of raising; it goes at exit.
+    """
+
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            pass
+
+def share(data) -> SharedBlock:
+    """Copy a packed buffer into a new shared memory block; its creator unlinks it"""
+    block = SharedBlock(create=True, size=len(data))
+    block.buf[:len(data)] = data
+    return block
+
+def attach(name: str) -> SharedBlock:
+    """Map an existing block for reading, without taking ownership of it"""
+    if sys.version_info >= (3, 13):
+        return SharedBlock(name=name, track=False)
+    # Before Python 3.13 attaching registers the block with the resource tracker. Processes started by
+    # multiprocessing share their parent's tracker, where the creator's registration covers it (and its
+    # unlink unregisters it); any other process has a tracker of its own, which would unlink it at exit.
+    block = SharedBlock(name=name)
+    if multiprocessing.parent_process() is None:
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
@@ -0,0 +1,147 @@
+# environment/shared_grid.py
+from typing import Dict, Optional
+import numpy as np
+from environment import packed_arrays
+from environment.grid import Grid, FoodPositions, CELL_WALL, CELL_FOOD, CELL_EMPTY, _DIRECTIONS
+from environment.map_analysis import MapAnalysis, analyze
+
+MAGIC = b"PACGRID\n"
+_ANALYSIS_PREFIX = "analysis."
+
+def move_mask_plane(grid: Grid) -> np.ndarray:
+    """Every cell's 4-bit mask of open directions at once (what get_valid_actions fills lazily)"""
+    cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.height, grid.width)
+    open_cells = np.pad(cells != CELL_WALL, 1, constant_values=False)  # Outside the map is never open
+    masks = np.zeros((grid.height, grid.width), dtype=np.uint8)
+    for bit, (dx, dy) in enumerate(_DIRECTIONS):
+        masks |= open_cells[1 + dy:1 + dy + grid.height, 1 + dx:1 + dx + grid.width].astype(np.uint8) << bit
+    return masks.ravel()
+
+
+class SharedGrid:
+    """
+    Owner of a shared memory block with a grid's static layers: the initial
+    cell plane, the move mask of every cell and the map analysis (distance
+    fields from key points, trap and choke masks, corridor graph arrays).
+    Worker processes attach to it without copying anything but one byte per
+    cell for their own food; grids attached with attach() pickle as the block
+    name plus a food bitset, so handing one to a worker costs a few bytes.
+    Use as a context manager, the block is unlinked on exit.
+    """
+
+    def __init__(self, grid: Grid, with_analysis: bool = True):
+        arrays = {
+            "cells": np.frombuffer(bytes(grid.cells), dtype=np.uint8),
+            "move_masks": move_mask_plane(grid),
+        }
+        analysis_header = None
+        if with_analysis:
+            analysis = grid.get_analysis()
+            if analysis is not None:
+                analysis_header = analysis.header
+                analysis_arrays = {name: getattr(analysis, name) for name in analysis.header["arrays"]}
+            else:
+                analysis_header, analysis_arrays = analyze(grid)  # No artifact: computed once here for all workers
+            analysis_header = {key: value for key, value in analysis_header.items() if key != "arrays"}
+            arrays.update({_ANALYSIS_PREFIX + name: array for name, array in analysis_arrays.items()})
+        header = {
+            "map_path": grid.map_path,
+            "width": grid.width,
+            "height": grid.height,
+            "pacman_starts": grid.pacman_start_positions,
+            "ghosts": grid.ghost_positions,
+            "flags": grid.flag_positions,
+            "analysis": analysis_header,
+        }
+        data = packed_arrays.pack(MAGIC, header, arrays)
+        self.block = packed_arrays.share(data)
+        self.name = self.block.name
+        self.size = len(data)
+        _views[self.name] = SharedGridView(self.name, self.block)  # This process reads its own block
+
+    def attach(self) -> Grid:
+        return attach_grid(self.name)
+
+    def close(self):
+        """Unlink the block; grids attached in this process keep their mapping until they are gone"""
+        _views.pop(self.name, None)
+        self.block.close()
+        self.block.unlink()
+
+    def __enter__(self) -> 'SharedGrid':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedGridView:
+    """One process's read-only view of a SharedGrid block, kept by the grids attached to it"""
+
+    def __init__(self, name: str, block: Optional[packed_arrays.SharedBlock] = None):
+        self.name = name
+        self.block = block or packed_arrays.attach(name)
+        self.header, data_start = packed_arrays.read_header(self.block.buf, MAGIC)
+        self.arrays = packed_arrays.views(self.block.buf, self.header, data_start)
+        for array in self.arrays.values():
+            array.flags.writeable = False
+        self._analysis: Optional[MapAnalysis] = None
+
+    def restore(self, grid: Grid):
+        """Put grid back in its initial state from the shared layers"""
+        header = self.header
+        grid.width, grid.height = header["width"], header["height"]
+        grid.cells = bytearray(self.arrays["cells"])
+        grid.pacman_start_positions = [tuple(pos) for pos in header["pacman_starts"]]
+        grid.ghost_positions = [tuple(pos) for pos in header["ghosts"]]
+        grid.flag_positions = [(x, y, flag_id) for x, y, flag_id in header["flags"]]
+        grid._init_views(memoryview(self.arrays["move_masks"]))
+
+    def restore_food(self, grid: Grid):
+        """Put back the initial food of grid in place, updating only what changed"""
+        cells = np.frombuffer(grid.cells, dtype=np.uint8)
+        changed = np.flatnonzero(cells != self.arrays["cells"])
+        initial = self.arrays["cells"][changed]
+        cells[changed] = initial
+        grid.food_positions._count = grid.cells.count(CELL_FOOD)
+        for index, cell in zip(changed.tolist(), initial.tolist()):
+            grid._food_changed((index % grid.width, index // grid.width), cell == CELL_FOOD)
+
+    def analysis(self) -> Optional[MapAnalysis]:
+        if self._analysis is None and self.header["analysis"] is not None:
+            arrays = {name[len(_ANALYSIS_PREFIX):]: array for name, array in self.arrays.items()
+                      if name.startswith(_ANALYSIS_PREFIX)}
+            self._analysis = MapAnalysis.from_arrays(self.header["analysis"], arrays)
+        return self._analysis
+
+    def reduce(self, grid: Grid):
+        food = np.frombuffer(bytes(grid.cells), dtype=np.uint8) == CELL_FOOD
+        return attach_grid, (self.name, np.packbits(food).tobytes(), dict(grid._symbols))
+
+
+# Views of this process, one per block however many grids are attached
+_views: Dict[str, SharedGridView] = {}
+
+def attach_grid(name: str, food: Optional[bytes] = None, symbols: Optional[Dict[int, str]] = None) -> Grid:
+    """
+    Grid over the shared block called name, in its initial state or with the
+    given food bitset (one bit per cell, as pickled grids carry it).
+    """
+    view = _views.get(name)
+    if view is None:
+        view = _views[name] = SharedGridView(name)
+    grid = Grid.__new__(Grid)
+    grid.map_path = view.header["map_path"]
+    grid._analysis = None
+    grid._analysis_loaded = False
+    grid._shared = view
+    view.restore(grid)
+    if food is not None:
+        cells = np.frombuffer(grid.cells, dtype=np.uint8)
+        present = np.unpackbits(np.frombuffer(food, dtype=np.uint8), count=cells.size).astype(bool)
+        cells[(cells == CELL_FOOD) & ~present] = CELL_EMPTY
+        cells[present] = CELL_FOOD
+        grid.food_positions = FoodPositions(grid)  # Recount the food
+    if symbols:
+        grid._symbols.update(symbols)
+    return grid
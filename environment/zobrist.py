@@ -0,0 +1,40 @@
+# environment/zobrist.py
+from typing import List, Tuple
+import numpy as np
+
+_SEED = 0x5EED_CAFE  # Fixed, so keys agree between runs and processes sharing a persisted cache
+
+class ZobristKeys:
+    """
+    Random 64-bit keys per cell for Pacman, each ghost slot and food, so a
+    board state hashes to the XOR of the keys of what it contains. The hash of
+    the remaining food is kept up to date one XOR per food change, so hashing a
+    state never rescans the food.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        size = grid.width * grid.height
+        slots = 2 + len(grid.get_ghost_positions())  # Pacman, food, then one table per ghost
+        rng = np.random.default_rng(_SEED)
+        self.tables = np.frombuffer(rng.bytes(8 * slots * size), dtype=np.uint64).reshape(slots, size)
+        self.food_hash = 0
+        self.reset_food()
+
+    def reset_food(self):
+        """Recompute the food hash from the grid (after a reload)"""
+        width = self.grid.width
+        food = [y * width + x for x, y in self.grid.get_food_positions()]
+        self.food_hash = int(np.bitwise_xor.reduce(self.tables[1][food])) if food else 0
+
+    def food_changed(self, pos: Tuple[int, int]):
+        self.food_hash ^= int(self.tables[1][pos[1] * self.grid.width + pos[0]])
+
+    def board_hash(self, pacman: Tuple[int, int], ghosts: List[Tuple[int, int]]) -> int:
+        """Hash of one Pacman's cell, every ghost's cell and the remaining food"""
+        width, tables = self.grid.width, self.tables
+        key = self.food_hash ^ int(tables[0][pacman[1] * width + pacman[0]])
+        for slot, (x, y) in enumerate(ghosts, start=2):
+            if slot < len(tables):
+                key ^= int(tables[slot][y * width + x])
+        return key
@@ -0,0 +1,148 @@
+# logic/agent_executor.py
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import List, Tuple, Dict, Callable, Optional, Set
+
+class AgentStats:
+    """Latency record of one agent's decisions"""
+
+    def __init__(self, window: int = 256):
+        self.decisions = 0
+        self.misses = 0  # Decisions replaced by the fallback action
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.recent = deque(maxlen=window)  # Latest latencies, for percentiles
+
+    def record(self, elapsed: float):
+        self.decisions += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.recent.append(elapsed)
+
+    def mean_ms(self) -> float:
+        return self.total_time / self.decisions * 1000 if self.decisions else 0.0
+
+    def percentile_ms(self, percent: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))] * 1000
+
+
+class FallbackView:
+    """
+    What the fallbacks read of an agent, copied on the game thread before its
+    decision starts, so a fallback never reads state a late decision is writing
+    """
+
+    def __init__(self, agent):
+        self.grid = getattr(agent, "grid", None)
+        self.path = list(getattr(agent, "path", ()))
+
+
+def pacman_fallback(agent, position: Tuple[int, int]) -> Tuple[int, int]:
+    """Next step of the agent's current path, or stay if it has none"""
+    path = list(agent.path)
+    if len(path) > 1 and path[0] == position:
+        action = (path[1][0] - position[0], path[1][1] - position[1])
+        if abs(action[0]) + abs(action[1]) == 1:
+            return action
+    return (0, 0)
+
+
+def ghost_fallback(agent, position: Tuple[int, int]) -> Tuple[int, int]:
+    """Random legal move, as the original GhostAgent"""
+    legal_actions = agent.grid.get_valid_actions(position)
+    return random.choice(legal_actions) if legal_actions else (0, 0)
+
+
+def stay_fallback(agent, position: Tuple[int, int]) -> Tuple[int, int]:
+    return (0, 0)
+
+
+# Fallback actions selectable by name in settings
+FALLBACKS = {
+    "path": pacman_fallback,
+    "random": ghost_fallback,
+    "stay": stay_fallback,
+}
+
+
+class AgentExecutor:
+    """
+    Runs the choose_action calls of a group of agents concurrently on a thread
+    pool with a shared hard deadline. An agent that misses the deadline gets
+    its fallback action for this tick; its decision keeps running in the
+    background and the agent is given the fallback again until it finishes,
+    so a slow planner never blocks the tick or runs twice at once.
+
+    While a decision runs its thread owns the agent: the game must not update
+    or reset an agent named in busy(), and drain() waits for every decision
+    before a restart. Fallbacks only see a FallbackView of the agent.
+    """
+
+    def __init__(self, deadline_ms: float, max_workers: Optional[int] = None):
+        self.deadline = deadline_ms / 1000
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self.stats: Dict[str, AgentStats] = {}
+        self._running: Dict[str, object] = {}  # Agent name -> future still computing
+        self._views: Dict[str, FallbackView] = {}  # Agent name -> its state when its decision was submitted
+        self._lock = threading.Lock()
+
+    def _timed(self, name: str, agent, position: Tuple[int, int]) -> Tuple[int, int]:
+        started = time.perf_counter()
+        action = agent.choose_action(position)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.stats.setdefault(name, AgentStats()).record(elapsed)
+        return action
+
+    def busy(self) -> Set[str]:
+        """Names of the agents whose decision is still running"""
+        return {name for name, future in self._running.items() if not future.done()}
+
+    def drain(self):
+        """Wait for every running decision, before the agents are reset"""
+        wait(list(self._running.values()))
+        self._running.clear()
+        self._views.clear()
+
+    def decide(self, requests: List[Tuple[str, object, Tuple[int, int], Callable]],
+               busy: Optional[Set[str]] = None) -> List[Tuple[int, int]]:
+        """
+        Decide the actions of (name, agent, position, fallback) requests concurrently.
+        Returns one action per request, the fallback for those past the deadline.
+        Agents in busy (from busy() before the agents were updated this tick)
+        fall back even if their decision has finished since: they missed this
+        tick's update.
+        """
+        deadline_at = time.perf_counter() + self.deadline
+        busy = busy or set()
+        futures = []
+        for name, agent, position, _ in requests:
+            running = self._running.get(name)
+            if name in busy or (running is not None and not running.done()):
+                futures.append(None)  # Previous decision still in progress
+            else:
+                self._views[name] = FallbackView(agent)
+                future = self.pool.submit(self._timed, name, agent, position)
+                self._running[name] = future
+                futures.append(future)
+
+        actions = []
+        for (name, agent, position, fallback), future in zip(requests, futures):
+            try:
+                if future is None:
+                    raise FutureTimeout()
+                actions.append(future.result(timeout=max(0.0, deadline_at - time.perf_counter())))
+            except FutureTimeout:
+                with self._lock:
+                    self.stats.setdefault(name, AgentStats()).misses += 1
+                actions.append(fallback(self._views.get(name) or FallbackView(agent), position))
+        return actions
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,15 +1,22 @@
 # logic/game.py
 from environment.grid import Grid
-from visualization.pygame_display import PygameDisplay
+from visualization.display_factory import create_display
 from config import settings
-import pygame
 from agents.agent_factory import AgentFactory
-from typing import List, Tuple, Dict
+from agents.agent_params import AgentParams
+from agents.decision_cache import decision_cache_for
+from logic.agent_executor import AgentExecutor, AgentStats, FALLBACKS
+from logic.metrics_store import MetricsWriter
+from logic.sim_clock import SimulationClock
+from logic.scoring import ScoreCard
+from typing import List, Tuple, Dict, Optional, Set
 import time
 import math
 
 class Game:
-    def __init__(self, map_path: str):
+    def __init__(self, map_path: str, pacman_strategy: Optional[str] = None, display_backend: Optional[str] = None,
+                 pacman_params: Optional[AgentParams] = None):
+        """pacman_strategy, display_backend and pacman_params default to the settings of the same names"""
         self.grid = Grid(map_path)
         self.colors = [
             (255, 255, 0),    # Yellow
@@ -22,80 +29,93 @@ class Game:
         self.flag_colors: Dict[str, Tuple[int, int, int]] = {}
         self.pacman_agents = []
         self.ghost_agents = []
-        self.scores: Dict[str, dict] = {}  # {flag_id: {"traditional": int, "intelligence": float, "time": float, "path_eff": float}}
+        self.scores: Dict[str, ScoreCard] = {}  # {flag_id: ScoreCard}, read like {"traditional": int, "intelligence": float, ...}
         self.high_scores: Dict[str, int] = {}
         self.game_over = False
         self.game_result = ""
         self.protected_pacmans = set()
         self.protected_ghosts = set()  # Track protected ghost indices
         self.move_count = 0
-        self.start_time = time.time()
+        # Scores run on simulated time, so they don't depend on FPS or machine speed
+        self.clock = SimulationClock(settings.SIM_SECONDS_PER_TICK)
         
+        # Decisions shared by every game of this process on the same map, None when disabled
+        self.decision_cache = decision_cache_for(map_path, pacman_params)
+
         # Initialize agents
-        agent_factory = AgentFactory(self.grid, self.colors)
+        agent_factory = AgentFactory(self.grid, self.colors, self.decision_cache, pacman_params)
         for i, pos in enumerate(self.pacman_positions):
             flag_id = f'F{i+1}'
             self.flag_colors[flag_id] = self.colors[i % len(self.colors)]
-            agent = agent_factory.create_pacman_agent(flag_id)
+            agent = agent_factory.create_pacman_agent(flag_id, pacman_strategy)
             self.pacman_agents.append(agent)
-            self.scores[flag_id] = {
-                "traditional": 0,
-                "intelligence": 0.0,
-                "time": 0.0,
-                "path_eff": 0.0,
-                "food_collected": 0,
-                "flags_reached": 0
-            }
+            self.scores[flag_id] = ScoreCard(agent, self.clock, settings.SCORING_PROFILE)
             self.high_scores[flag_id] = 0
         
         for _ in self.ghost_positions:
             agent = agent_factory.create_ghost_agent()
             self.ghost_agents.append(agent)
+        self.ghost_field = agent_factory.ghost_field
         
-        self.display = PygameDisplay(self.grid, self.flag_colors, self.scores, self.high_scores)
+        self.display = create_display(self.grid, self.flag_colors, self.scores, self.high_scores, display_backend)
         self.running = True
+        # Concurrent decisions with per-move deadlines, None keeps the sequential calls
+        self.executor = None
+        if settings.AGENT_EXECUTOR == "thread":
+            self.executor = AgentExecutor(settings.AGENT_DEADLINE_MS)
+        # Episode results streamed to the metrics database, None records nothing
+        self.map_path = map_path
+        self.metrics = None
+        self.decision_stats: Dict[str, AgentStats] = {}  # Sequential decision timings, kept only with metrics
+        if settings.METRICS_DB:
+            self.metrics = MetricsWriter(settings.METRICS_DB)
+            self.metrics.new_episode()
+            self.high_scores.update(self.metrics.high_scores)
 
-    def calculate_intelligence_score(self, agent, flag_id: str) -> float:
-        """Calculate composite intelligence score considering multiple factors"""
-        time_score = max(0, 1 - (time.time() - self.start_time) / 300)  # Time efficiency (0-1)
-        path_score = agent.get_path_efficiency()  # Path efficiency (0-1)
-        decision_score = agent.get_decision_quality()  # Decision quality (0-1)
-        safety_score = agent.get_safety_score()  # Safety (0-1)
-        
-        # Weighted average
-        intelligence_score = (
-            0.3 * time_score +
-            0.4 * path_score +
-            0.2 * decision_score +
-            0.1 * safety_score
-        ) * 10  # Scale to 0-10
-        
-        self.scores[flag_id]["intelligence"] = intelligence_score
-        self.scores[flag_id]["time"] = time_score * 10
-        self.scores[flag_id]["path_eff"] = path_score * 10
-        return intelligence_score
+    def decide_actions(self, agents, positions, prefix: str, fallback: str, busy: Set[str] = None):
+        """
+        Decide all actions of a group of agents at once through the executor.
+        Returns None in sequential mode, where each agent decides just before it moves.
+        """
+        if self.executor is None:
+            return None
+        requests = [(f"{prefix}{i+1}", agent, pos, FALLBACKS[fallback])
+                    for i, (pos, agent) in enumerate(zip(positions, agents))]
+        return self.executor.decide(requests, busy)
+
+    def choose_action(self, name: str, agent, position: Tuple[int, int]) -> Tuple[int, int]:
+        """Sequential decision, timed only when metrics are recorded"""
+        if self.metrics is None:
+            return agent.choose_action(position)
+        started = time.perf_counter()
+        action = agent.choose_action(position)
+        self.decision_stats.setdefault(name, AgentStats()).record(time.perf_counter() - started)
+        return action
 
     def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        for command in self.display.poll_events():
+            if command == "quit":
                 self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and self.game_over:
-                    if pygame.key.get_mods() & pygame.KMOD_SHIFT:
-                        self.reset()
-                elif event.key == pygame.K_h:  # Toggle help
-                    self.display.show_help = not self.display.show_help
+            elif command == "restart" and self.game_over:
+                self.reset()
+            elif command == "help":  # Toggle help
+                self.display.show_help = not self.display.show_help
 
     def update(self):
         if self.game_over:
             return
 
         self.move_count += 1
+        self.clock.tick()
         
+        # Share this tick's Pacman distance fields between all ghosts
+        self.ghost_field.update(self.pacman_positions, self.ghost_positions)
+
         # Update ghost positions
+        ghost_actions = self.decide_actions(self.ghost_agents, self.ghost_positions, "G", settings.GHOST_FALLBACK)
         new_ghost_positions = []
         for i, (pos, agent) in enumerate(zip(self.ghost_positions, self.ghost_agents)):
-            action = agent.choose_action(pos)
+            action = ghost_actions[i] if ghost_actions else self.choose_action(f"G{i+1}", agent, pos)
             new_pos = (pos[0] + action[0], pos[1] + action[1])
             
             if self.grid.is_valid(new_pos):
@@ -110,40 +130,47 @@ class Game:
         
         self.ghost_positions = new_ghost_positions
 
-        # Update Pacman agents with current ghost positions
-        for agent in self.pacman_agents:
-            agent.update_ghost_positions(self.ghost_positions)
+        # Update Pacman agents with current ghost positions, except those a late decision still owns
+        busy = self.executor.busy() if self.executor is not None else set()
+        for i, agent in enumerate(self.pacman_agents):
+            if f"P{i+1}" not in busy:
+                agent.update_ghost_positions(self.ghost_positions)
 
         # Update Pacman positions and scores
+        pacman_actions = self.decide_actions(self.pacman_agents, self.pacman_positions, "P",
+                                             settings.PACMAN_FALLBACK, busy)
         new_pacman_positions = []
         for i, (pos, agent) in enumerate(zip(self.pacman_positions, self.pacman_agents)):
             flag_id = agent.flag_id
-            action = agent.choose_action(pos)
+            action = pacman_actions[i] if pacman_actions else self.choose_action(f"P{i+1}", agent, pos)
             speed = 2 if agent.protected else 1
             new_pos = (pos[0] + action[0] * speed, pos[1] + action[1] * speed)
             
             if self.grid.is_valid(new_pos) and not agent.protected:
+                # Check for food before update_position eats it
+                found_food = new_pos in self.grid.food_positions
                 if self.grid.update_position(pos, new_pos, 'P'):
                     new_pacman_positions.append(new_pos)
                     
+                    score = self.scores[flag_id]
                     # Traditional scoring: Food
-                    if new_pos in self.grid.food_positions:
-                        self.scores[flag_id]["traditional"] += 10
-                        self.scores[flag_id]["food_collected"] += 1
+                    if found_food:
+                        score.traditional += 10
+                        score.food_collected += 1
                         self.display.add_score_popup("+10 Food", new_pos[0], new_pos[1])
-                        print(f"Pacman {flag_id} ate food at {new_pos}! Points: {self.scores[flag_id]['traditional']}")
+                        print(f"Pacman {flag_id} ate food at {new_pos}! Points: {score.traditional}")
                     
                     # Traditional scoring: Flag (only if no food remains)
                     if not self.grid.food_positions and self.grid.is_goal(new_pos, flag_id):
-                        self.scores[flag_id]["traditional"] += 100
-                        self.scores[flag_id]["flags_reached"] += 1
+                        score.traditional += 100
+                        score.flags_reached += 1
                         agent.protected = True
                         self.protected_pacmans.add(flag_id)
                         self.display.add_score_popup("+100 Flag", new_pos[0], new_pos[1])
-                        print(f"Pacman {flag_id} reached flag at {new_pos}! Points: {self.scores[flag_id]['traditional']}")
+                        print(f"Pacman {flag_id} reached flag at {new_pos}! Points: {score.traditional}")
                     
-                    # Intelligence scoring
-                    self.calculate_intelligence_score(agent, flag_id)
+                    # Intelligence scoring: derived scores are computed when read, as of this move
+                    score.moved()
                 else:
                     new_pacman_positions.append(pos)
             else:
@@ -152,6 +179,10 @@ class Game:
                     new_pacman_positions[-1] = new_pos
         
         self.pacman_positions = new_pacman_positions
+        if self.metrics is not None and settings.METRICS_TICKS:
+            for pos, agent in zip(self.pacman_positions, self.pacman_agents):
+                score = self.scores[agent.flag_id]
+                self.metrics.tick(self.move_count, agent.flag_id, pos, score.traditional, score.food_collected)
 
         # Check collisions: only non-protected ghosts can cause game over
         for i, pacman_pos in enumerate(self.pacman_positions):
@@ -171,17 +202,49 @@ class Game:
         self.game_over = True
         
         # Final score calculations
-        for flag_id in self.scores:
+        for flag_id, score in self.scores.items():
             self.high_scores[flag_id] = max(
                 self.high_scores[flag_id], 
-                self.scores[flag_id]["traditional"]
+                score.traditional
             )
             
-            # Final intelligence score adjustment
-            time_penalty = max(0, (time.time() - self.start_time) / 60)  # 1 point per minute
-            self.scores[flag_id]["intelligence"] = max(0, self.scores[flag_id]["intelligence"] - time_penalty)
+            # Final intelligence score adjustment (time penalty), applied when read
+            score.finish()
         
         self.game_result = "VICTORY!" if victory else "GAME OVER!"
+        if self.metrics is not None:
+            self.record_episode(victory)
+
+    def record_episode(self, victory: bool):
+        """Queue this episode's results and the high scores for the metrics database"""
+        stats = self.executor.stats if self.executor is not None else self.decision_stats
+        agents = []
+        for i, agent in enumerate(self.pacman_agents):
+            score = self.scores[agent.flag_id]
+            timing = stats.get(f"P{i+1}", AgentStats())
+            agents.append({
+                "flag_id": agent.flag_id,
+                "traditional": score.traditional,
+                "intelligence": score["intelligence"],
+                "food_collected": score.food_collected,
+                "flags_reached": score.flags_reached,
+                "decisions": agent.total_decisions,
+                "good_decisions": agent.good_decisions,
+                "ghost_encounters": agent.ghost_encounters,
+                "decide_mean_ms": timing.mean_ms(),
+                "decide_p95_ms": timing.percentile_ms(95),
+            })
+        self.metrics.end_episode({
+            "started": self.clock.wall_start,
+            "map": self.map_path,
+            "strategy": settings.PACMAN_STRATEGY,
+            "ghosts": ",".join(settings.GHOST_POLICIES),
+            "victory": int(victory),
+            "moves": self.move_count,
+            "sim_time": self.clock.time,
+            "wall_time": self.clock.wall_elapsed(),
+        }, agents)
+        self.metrics.save_high_scores(self.high_scores)
 
     def render(self):
         pacman_data = []
@@ -202,40 +265,34 @@ class Game:
             self.display.render_game_over(self.game_result, "VICTORY" in self.game_result)
 
     def reset(self):
+        """
+        Restart on the same map without allocating: the grid undoes its food
+        changes in place and agents, score cards and display are reused, so
+        everything built from the static map (move masks, search structures,
+        distance fields, fonts and window) carries over to the next episode.
+        """
         self.grid.reset()
         self.pacman_positions = self.grid.get_start_positions()
         self.ghost_positions = self.grid.get_ghost_positions()
-        self.flag_colors.clear()
-        self.pacman_agents = []
-        self.ghost_agents = []
-        self.scores.clear()
         self.game_over = False
         self.game_result = ""
         self.protected_pacmans.clear()
         self.protected_ghosts.clear()
         self.move_count = 0
-        self.start_time = time.time()
-        
-        agent_factory = AgentFactory(self.grid, self.colors)
-        for i, pos in enumerate(self.pacman_positions):
-            flag_id = f'F{i+1}'
-            self.flag_colors[flag_id] = self.colors[i % len(self.colors)]
-            agent = agent_factory.create_pacman_agent(flag_id)
-            self.pacman_agents.append(agent)
-            self.scores[flag_id] = {
-                "traditional": 0,
-                "intelligence": 0.0,
-                "time": 0.0,
-                "path_eff": 0.0,
-                "food_collected": 0,
-                "flags_reached": 0
-            }
-        
-        for _ in self.ghost_positions:
-            agent = agent_factory.create_ghost_agent()
-            self.ghost_agents.append(agent)
-        
-        self.display = PygameDisplay(self.grid, self.flag_colors, self.scores, self.high_scores)
+        self.clock.reset()
+        self.decision_stats.clear()
+        if self.metrics is not None:
+            self.metrics.new_episode()
+        if self.executor is not None:
+            self.executor.drain()  # No late decision may run into the reset agents
+
+        for agent in self.pacman_agents:
+            agent.reset()
+            self.scores[agent.flag_id].reset()
+        for agent in self.ghost_agents:
+            agent.reset()
+        self.ghost_field.reset()
+        self.display.reset()
 
     def run(self):
         while self.running:
@@ -243,9 +300,18 @@ class Game:
             self.update()
             self.render()
             
-            if self.game_over:
-                pygame.time.wait(100)
-            else:
-                self.display.clock.tick(settings.FPS)
+            if self.game_over and not self.display.interactive:
+                break  # Nobody can restart a headless game
+            self.display.wait(self.game_over)
         
-        self.display.close()
\ No newline at end of file
+        if self.executor is not None:
+            self.executor.shutdown()
+        if self.metrics is not None:
+            self.metrics.close()
+        if self.decision_cache is not None:
+            stats = self.decision_cache.stats()
+            print(f"Decision cache: {stats['hits']}/{stats['lookups']} hits ({stats['hit_rate']:.0%}), "
+                  f"{stats['book_hits']} from the book, {stats['entries']} entries")
+            if settings.DECISION_CACHE_PATH:
+                self.decision_cache.save(settings.DECISION_CACHE_PATH)
+        self.display.close()
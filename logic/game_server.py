@@ -0,0 +1,435 @@
+# logic/game_server.py
+"""
+Headless games for remote Pacman agents, many sessions in one asyncio process.
+
+Clients connect over TCP or a Unix socket and speak a line protocol (ASCII,
+one message per line, fields separated by spaces):
+
+  client -> server
+    JOIN <map>             start a game on one of the server's maps (again after END: a new game)
+    ACT <tick> <moves>     actions for the state of <tick>, one letter per Pacman: U R D L or S (stay)
+    QUIT                   leave
+
+  server -> client
+    WELCOME <session> <map> <width> <height> <pacmen> <ghosts> <deadline_ms>
+    FLAGS <x>,<y> ...      flag of each Pacman, in Pacman order
+    ROW <cells>            <height> lines of the map: '#' wall, '.' food, ' ' empty
+    TICK <tick> <changes>  state after <tick> moves; only what changed since the last TICK:
+                           P<i>:<x>,<y> Pacman moved, G<i>:<x>,<y> ghost moved,
+                           F:<x>,<y> food eaten, S<i>:<score> Pacman score
+    END <tick> <result> <changes>   final state instead of a TICK, with every S<i>;
+                           result is VICTORY, GAME_OVER or LIMIT
+    ERR <message>
+
+Games advance in lockstep with their client: a tick is played as soon as the
+ACT for it arrives, or with every Pacman staying once the deadline passes.
+Each tick's messages go out in a single write, and a client that stops
+reading only holds up its own session until its buffer drains.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import os
+import random
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from config import settings
+from logic.agent_executor import AgentStats
+from logic.game import Game
+
+# Move letters of ACT lines
+MOVES = {"U": (0, -1), "R": (1, 0), "D": (0, 1), "L": (-1, 0), "S": (0, 0)}
+LINE_LIMIT = 4096  # Longest line a client may send
+WRITE_HIGH_WATER = 64 * 1024  # Bytes queued for a client before its session waits for it to read
+_ROW_TABLE = bytes.maketrans(b"\x00\x01\x02", b" #.")  # Cell types to ROW characters
+_RESULTS = {"VICTORY!": "VICTORY", "GAME OVER!": "GAME_OVER"}  # Game.game_result to END results
+
+
+class SessionStats:
+    """Counters of one client connection"""
+
+    def __init__(self):
+        self.games = 0
+        self.ticks = 0
+        self.misses = 0  # Ticks played without the client's actions
+        self.late = 0  # Actions received for an earlier tick
+        self.invalid = 0  # Lines that could not be used
+        self.stalls = 0  # Writes that had to wait for the client to read
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.response = AgentStats()  # Time from sending a TICK to receiving its ACT
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "games": self.games, "ticks": self.ticks, "misses": self.misses, "late": self.late,
+            "invalid": self.invalid, "stalls": self.stalls, "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out, "response_mean_ms": self.response.mean_ms(),
+            "response_p95_ms": self.response.percentile_ms(95),
+        }
+
+
+class _Disconnect(Exception):
+    """The client left or broke the protocol"""
+
+
+class Session:
+    """One client connection and the game it plays"""
+
+    def __init__(self, server: 'GameServer', session_id: int, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        self.server = server
+        self.id = session_id
+        self.reader = reader
+        self.writer = writer
+        self.stats = SessionStats()
+        self.game: Optional[Game] = None
+        self.map_name: Optional[str] = None
+        self._out: List[str] = []
+        self._sent_pacmen: List[Tuple[int, int]] = []
+        self._sent_ghosts: List[Tuple[int, int]] = []
+        self._sent_scores: List[Tuple[int, int]] = []  # (traditional, food_collected) per Pacman
+
+    async def run(self):
+        try:
+            while True:
+                line = await self.read_line(self.server.idle_timeout)
+                command, _, argument = line.partition(" ")
+                if command == "QUIT":
+                    break
+                if command == "JOIN" and self.join(argument.strip()):
+                    await self.play()
+                elif command != "JOIN":
+                    self.stats.invalid += 1
+                    self.send(f"ERR expected JOIN <map> or QUIT, got {command[:16]}")
+                await self.flush()
+        except (_Disconnect, ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.close()
+
+    async def read_line(self, timeout: float) -> str:
+        try:
+            data = await asyncio.wait_for(self.reader.readline(), timeout)
+        except ValueError:  # Longer than LINE_LIMIT
+            self.send("ERR line too long")
+            await self.flush()
+            raise _Disconnect()
+        if not data:
+            raise _Disconnect()
+        self.stats.bytes_in += len(data)
+        return data.decode("ascii", "replace").strip()
+
+    def join(self, map_name: str) -> bool:
+        """Start a game, reusing the current one when the map is the same"""
+        path = self.server.maps.get(map_name)
+        if path is None:
+            self.stats.invalid += 1
+            self.send(f"ERR unknown map {map_name[:32]}, expected one of {' '.join(sorted(self.server.maps))}")
+            return False
+        with self.server.quiet():
+            if self.game is not None and map_name == self.map_name:
+                self.game.reset()
+            else:
+                self.close_game()
+                self.game = Game(path, pacman_strategy="remote", display_backend="null")
+                self.map_name = map_name
+        self.stats.games += 1
+        game, grid = self.game, self.game.grid
+        self.send(f"WELCOME {self.id} {map_name} {grid.width} {grid.height} {len(game.pacman_agents)} "
+                  f"{len(game.ghost_agents)} {self.server.deadline_ms:g}")
+        flags = {flag_id: (x, y) for x, y, flag_id in grid.get_flag_positions()}
+        self.send("FLAGS " + " ".join("%d,%d" % flags[agent.flag_id] for agent in game.pacman_agents))
+        cells = bytes(grid.cells).translate(_ROW_TABLE).decode("ascii")
+        for y in range(grid.height):
+            self.send("ROW " + cells[y * grid.width:(y + 1) * grid.width])
+        self._sent_pacmen, self._sent_ghosts, self._sent_scores = [], [], []
+        self.send_tick()
+        return True
+
+    async def play(self):
+        game, server = self.game, self.server
+        await self.flush()  # The initial state
+        while not game.game_over:
+            tick = game.move_count
+            moves = await self.receive_actions(tick)
+            for agent, move in zip(game.pacman_agents, moves or ()):
+                agent.next_action = MOVES[move]
+            with server.quiet():
+                game.update()
+                if not game.game_over and game.move_count >= server.max_ticks:
+                    game.end_game(victory=False)
+                    game.game_result = "LIMIT"
+            self.stats.ticks += 1
+            self.send_tick()
+            await self.flush()
+
+    async def receive_actions(self, tick: int) -> Optional[str]:
+        """Move letters the client sent for tick, None once the deadline has passed"""
+        loop = asyncio.get_running_loop()
+        sent_at = loop.time()
+        deadline_at = sent_at + self.server.deadline_ms / 1000
+        pacmen = len(self.game.pacman_agents)
+        while True:
+            try:
+                line = await self.read_line(max(0.0, deadline_at - loop.time()))
+            except asyncio.TimeoutError:
+                self.stats.misses += 1
+                return None
+            fields = line.split()
+            if fields == ["QUIT"]:
+                raise _Disconnect()
+            if len(fields) == 3 and fields[0] == "ACT" and fields[1].isdigit():
+                if int(fields[1]) < tick:
+                    self.stats.late += 1
+                    continue
+                moves = fields[2].upper()
+                if int(fields[1]) == tick and len(moves) == pacmen and all(move in MOVES for move in moves):
+                    self.stats.response.record(loop.time() - sent_at)
+                    return moves
+            self.stats.invalid += 1
+            self.send(f"ERR expected ACT {tick} <{pacmen} moves>")
+
+    def send_tick(self):
+        """Queue a TICK (END once the game is over) line with what changed since the last one"""
+        game = self.game
+        changes = []
+        for i, pos in enumerate(game.pacman_positions):
+            if i >= len(self._sent_pacmen) or pos != self._sent_pacmen[i]:
+                changes.append(f"P{i}:{pos[0]},{pos[1]}")
+        for i, pos in enumerate(game.ghost_positions):
+            if i >= len(self._sent_ghosts) or pos != self._sent_ghosts[i]:
+                changes.append(f"G{i}:{pos[0]},{pos[1]}")
+        scores = []
+        for i, agent in enumerate(game.pacman_agents):
+            score = game.scores[agent.flag_id]
+            scores.append((score.traditional, score.food_collected))
+            if i < len(self._sent_scores):
+                if score.food_collected != self._sent_scores[i][1]:
+                    x, y = game.pacman_positions[i]
+                    changes.append(f"F:{x},{y}")
+            if game.game_over or (i < len(self._sent_scores) and score.traditional != self._sent_scores[i][0]):
+                changes.append(f"S{i}:{score.traditional}")
+        self._sent_pacmen, self._sent_ghosts = list(game.pacman_positions), list(game.ghost_positions)
+        self._sent_scores = scores
+        if game.game_over:
+            result = _RESULTS.get(game.game_result, game.game_result)
+            self.send(" ".join(["END", str(game.move_count), result] + changes))
+        else:
+            self.send(" ".join(["TICK", str(game.move_count)] + changes))
+
+    def send(self, line: str):
+        self._out.append(line)
+
+    async def flush(self):
+        """Write every queued line at once; wait only when the client is not keeping up"""
+        if not self._out:
+            return
+        data = ("\n".join(self._out) + "\n").encode("ascii")
+        self._out.clear()
+        self.writer.write(data)
+        self.stats.bytes_out += len(data)
+        if self.writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+            self.stats.stalls += 1
+            await asyncio.wait_for(self.writer.drain(), self.server.stall_timeout)
+
+    def close_game(self):
+        if self.game is not None:
+            if self.game.executor is not None:
+                self.game.executor.shutdown()
+            if self.game.metrics is not None:
+                self.game.metrics.close()
+            self.game = None
+
+    def close(self):
+        self.close_game()
+        self.writer.close()
+        self.server.session_closed(self)
+
+
+class GameServer:
+    """
+    Hosts one headless Game per connected client (see the module docstring for
+    the protocol). Maps are the .txt files of maps_dir, joined by file name
+    without extension; other arguments default to the SERVER_* settings.
+    """
+
+    def __init__(self, maps_dir: Optional[str] = None, deadline_ms: Optional[float] = None,
+                 max_ticks: Optional[int] = None, max_sessions: Optional[int] = None,
+                 idle_timeout: float = 60.0, stall_timeout: float = 10.0):
+        maps_dir = maps_dir or settings.SERVER_MAPS_DIR
+        self.maps = {name[:-4]: os.path.join(maps_dir, name) for name in os.listdir(maps_dir) if name.endswith(".txt")}
+        self.deadline_ms = deadline_ms if deadline_ms is not None else settings.SERVER_DEADLINE_MS
+        self.max_ticks = max_ticks or settings.SERVER_MAX_TICKS
+        self.max_sessions = max_sessions or settings.SERVER_MAX_SESSIONS
+        self.idle_timeout = idle_timeout  # Seconds a client may stay silent outside a game
+        self.stall_timeout = stall_timeout  # Seconds a client may leave its buffer full before being dropped
+        self.sessions: Dict[int, Session] = {}
+        self.closed: deque = deque(maxlen=1024)  # (session id, stats) of the latest closed sessions
+        self._ids = itertools.count(1)
+        self._devnull = open(os.devnull, "w")
+
+    def quiet(self):
+        """Context silencing the games' console output"""
+        return contextlib.redirect_stdout(self._devnull)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None) -> asyncio.AbstractServer:
+        """Listen on a Unix socket when path is given, otherwise on TCP (port 0 picks a free one)"""
+        backlog = min(self.max_sessions, 4096)  # Connections arriving together all get queued
+        if path is not None:
+            return await asyncio.start_unix_server(self._accept, path, limit=LINE_LIMIT, backlog=backlog)
+        return await asyncio.start_server(self._accept, host, port, limit=LINE_LIMIT, backlog=backlog)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self.sessions) >= self.max_sessions:
+            writer.write(b"ERR server full\n")
+            writer.close()
+            return
+        writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        session = Session(self, next(self._ids), reader, writer)
+        self.sessions[session.id] = session
+        await session.run()
+
+    def session_closed(self, session: Session):
+        if self.sessions.pop(session.id, None) is not None:
+            self.closed.append((session.id, session.stats))
+
+    def close(self):
+        """Disconnect every client; call after closing the listening server"""
+        for session in list(self.sessions.values()):
+            session.close()
+        self._devnull.close()
+
+    def stats(self) -> Dict[int, Dict[str, float]]:
+        """Counters of the open sessions and the latest closed ones, by session id"""
+        stats = {session_id: session_stats.as_dict() for session_id, session_stats in self.closed}
+        stats.update({session_id: session.stats.as_dict() for session_id, session in self.sessions.items()})
+        return stats
+
+
+class StubClient:
+    """
+    Minimal client, for tests and as a starting point for bots: it keeps the
+    game state up to date from the server's messages and answers each TICK
+    with policy(client), a string of move letters (random legal moves by default).
+    """
+
+    def __init__(self, policy: Optional[Callable[['StubClient'], str]] = None, seed: Optional[int] = None):
+        self.policy = policy or StubClient.random_moves
+        self.rng = random.Random(seed)
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.session = 0
+        self.walls = set()
+        self.food = set()
+        self.flags: List[Tuple[int, int]] = []
+        self.pacmen: List[Tuple[int, int]] = []
+        self.ghosts: List[Tuple[int, int]] = []
+        self.scores: List[int] = []
+        self.tick = 0
+
+    async def connect(self, host: str = "127.0.0.1", port: Optional[int] = None, path: Optional[str] = None):
+        if path is not None:
+            self.reader, self.writer = await asyncio.open_unix_connection(path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def send(self, line: str):
+        self.writer.write((line + "\n").encode("ascii"))
+        await self.writer.drain()
+
+    async def receive(self) -> List[str]:
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return line.decode("ascii").rstrip("\n").split(" ")
+
+    async def join(self, map_name: str):
+        """Join a game and read its initial state"""
+        await self.send(f"JOIN {map_name}")
+        fields = await self.receive()
+        if fields[0] != "WELCOME":
+            raise ConnectionError(" ".join(fields))
+        self.session, height = int(fields[1]), int(fields[4])
+        self.pacmen, self.ghosts = [(0, 0)] * int(fields[5]), [(0, 0)] * int(fields[6])
+        self.scores = [0] * int(fields[5])
+        self.flags = [_point(field) for field in (await self.receive())[1:]]
+        self.walls, self.food = set(), set()
+        for y in range(height):
+            line = (await self.reader.readline()).decode("ascii").rstrip("\n")
+            for x, char in enumerate(line[4:]):
+                if char == "#":
+                    self.walls.add((x, y))
+                elif char == ".":
+                    self.food.add((x, y))
+        fields = await self.receive()
+        self.apply(fields[1], fields[2:])
+
+    def apply(self, tick: str, changes: List[str]):
+        """Update the state from the changes of a TICK or END line"""
+        self.tick = int(tick)
+        for change in changes:
+            kind, _, value = change.partition(":")
+            if kind == "F":
+                self.food.discard(_point(value))
+            elif kind[0] == "P":
+                self.pacmen[int(kind[1:])] = _point(value)
+            elif kind[0] == "G":
+                self.ghosts[int(kind[1:])] = _point(value)
+            elif kind[0] == "S":
+                self.scores[int(kind[1:])] = int(value)
+
+    async def play(self) -> str:
+        """Answer every tick until the game ends; returns its result"""
+        while True:
+            await self.send(f"ACT {self.tick} {self.policy(self)}")
+            fields = await self.receive()
+            while fields[0] not in ("TICK", "END"):  # ERR lines only explain a rejected ACT
+                fields = await self.receive()
+            if fields[0] == "END":
+                self.apply(fields[1], fields[3:])
+                return fields[2]
+            self.apply(fields[1], fields[2:])
+
+    def random_moves(self) -> str:
+        moves = ""
+        for x, y in self.pacmen:
+            legal = [letter for letter, (dx, dy) in MOVES.items() if letter != "S" and (x + dx, y + dy) not in self.walls]
+            moves += self.rng.choice(legal) if legal else "S"
+        return moves
+
+    async def close(self):
+        if self.writer is not None:
+            with contextlib.suppress(ConnectionError):
+                await self.send("QUIT")
+            self.writer.close()
+            with contextlib.suppress(ConnectionError):
+                await self.writer.wait_closed()
+
+
+def _point(text: str) -> Tuple[int, int]:
+    x, y = text.split(",")
+    return int(x), int(y)
+
+
+async def serve(host: str, port: int, path: Optional[str], maps_dir: Optional[str], deadline_ms: Optional[float]):
+    server = GameServer(maps_dir, deadline_ms)
+    listener = await server.start(host, port, path)
+    where = path or ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"Serving maps {', '.join(sorted(server.maps))} on {where}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host headless games for remote Pacman agents")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--maps", help=f"directory of the maps clients can join (default {settings.SERVER_MAPS_DIR})")
+    parser.add_argument("--deadline-ms", type=float, help="time clients get to answer a tick")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.unix, args.maps, args.deadline_ms))
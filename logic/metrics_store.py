@@ -0,0 +1,223 @@
+# logic/metrics_store.py
+import queue
+import sqlite3
+import threading
+import uuid
+from typing import List, Tuple, Dict, Iterable
+import numpy as np
+
+# Columns of each table, in insert order. Queries only accept these names.
+EPISODE_COLUMNS = ("run", "episode", "started", "map", "strategy", "ghosts",
+                   "victory", "moves", "sim_time", "wall_time")
+AGENT_COLUMNS = ("run", "episode", "flag_id", "traditional", "intelligence", "food_collected",
+                 "flags_reached", "decisions", "good_decisions", "ghost_encounters",
+                 "decide_mean_ms", "decide_p95_ms")
+TICK_COLUMNS = ("run", "episode", "tick", "flag_id", "x", "y", "traditional", "food_collected")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    run TEXT, episode INTEGER, started REAL, map TEXT, strategy TEXT, ghosts TEXT,
+    victory INTEGER, moves INTEGER, sim_time REAL, wall_time REAL, PRIMARY KEY (run, episode));
+CREATE TABLE IF NOT EXISTS agents (
+    run TEXT, episode INTEGER, flag_id TEXT, traditional INTEGER, intelligence REAL,
+    food_collected INTEGER, flags_reached INTEGER, decisions INTEGER, good_decisions INTEGER,
+    ghost_encounters INTEGER, decide_mean_ms REAL, decide_p95_ms REAL);
+CREATE TABLE IF NOT EXISTS ticks (
+    run TEXT, episode INTEGER, tick INTEGER, flag_id TEXT, x INTEGER, y INTEGER,
+    traditional INTEGER, food_collected INTEGER);
+CREATE TABLE IF NOT EXISTS high_scores (flag_id TEXT PRIMARY KEY, score INTEGER);
+CREATE INDEX IF NOT EXISTS agents_episode ON agents (run, episode);
+"""
+# PRAGMA user_version of a database with the schema above. Databases of older
+# versions are migrated when opened: CREATE TABLE IF NOT EXISTS leaves them as they are.
+# 1: episodes.sim_time
+SCHEMA_VERSION = 1
+
+class MetricsStore:
+    """
+    Append-only SQLite store of game results: one row per episode, one per
+    Pacman per episode and optionally one per Pacman per tick, plus the
+    persistent high scores. Query helpers aggregate across every stored run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Bring a database made by an older version up to SCHEMA_VERSION"""
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        self.connection.execute("BEGIN IMMEDIATE")  # One process migrates, the others wait and find it done
+        try:
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                columns = {row[1] for row in self.connection.execute("PRAGMA table_info(episodes)")}
+                if "sim_time" not in columns:  # Databases created before sim_time (new ones have it)
+                    self.connection.execute("ALTER TABLE episodes ADD COLUMN sim_time REAL")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+
+    def insert(self, table: str, rows: List[tuple]):
+        """Append rows in one transaction"""
+        columns = {"episodes": EPISODE_COLUMNS, "agents": AGENT_COLUMNS, "ticks": TICK_COLUMNS}[table]
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows)
+
+    def load_high_scores(self) -> Dict[str, int]:
+        return dict(self.connection.execute("SELECT flag_id, score FROM high_scores"))
+
+    def save_high_scores(self, high_scores: Dict[str, int]):
+        """Keep the best score ever seen for each flag"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO high_scores VALUES (?, ?) ON CONFLICT(flag_id) "
+                "DO UPDATE SET score = MAX(score, excluded.score)", high_scores.items())
+
+    def _where(self, filters: Dict[str, object]) -> Tuple[str, list]:
+        for column in filters:
+            if column not in EPISODE_COLUMNS:
+                raise ValueError(f"Unknown episode column '{column}', expected one of {EPISODE_COLUMNS}")
+        if not filters:
+            return "", []
+        return " WHERE " + " AND ".join(f"e.{column} = ?" for column in filters), list(filters.values())
+
+    def values(self, column: str, **filters) -> np.ndarray:
+        """All stored values of an episode or agent column, for episodes matching filters"""
+        where, params = self._where(filters)
+        if column in EPISODE_COLUMNS:
+            query = f"SELECT e.{column} FROM episodes e{where}"
+        elif column in AGENT_COLUMNS:
+            query = f"SELECT a.{column} FROM agents a JOIN episodes e USING (run, episode){where}"
+        else:
+            raise ValueError(f"Unknown metric '{column}'")
+        return np.array([row[0] for row in self.connection.execute(query, params)], dtype=float)
+
+    def count(self, **filters) -> int:
+        where, params = self._where(filters)
+        return self.connection.execute(f"SELECT COUNT(*) FROM episodes e{where}", params).fetchone()[0]
+
+    def win_rate(self, **filters) -> float:
+        """Fraction of matching episodes won (0 when there are none)"""
+        victories = self.values("victory", **filters)
+        return float(victories.mean()) if len(victories) else 0.0
+
+    def percentiles(self, column: str, percents: Iterable[float] = (50, 90, 99), **filters) -> Dict[float, float]:
+        """Percentiles of a metric over matching episodes, e.g. percentiles("moves", strategy="route")"""
+        data = self.values(column, **filters)
+        percents = list(percents)
+        if not len(data):
+            return {p: float('nan') for p in percents}
+        return dict(zip(percents, np.percentile(data, percents).tolist()))
+
+    def summary(self, group_by: str = "strategy") -> Dict[object, Dict[str, float]]:
+        """Episodes, win rate and mean moves for each value of an episode column"""
+        if group_by not in EPISODE_COLUMNS:
+            raise ValueError(f"Unknown episode column '{group_by}', expected one of {EPISODE_COLUMNS}")
+        rows = self.connection.execute(
+            f"SELECT {group_by}, COUNT(*), AVG(victory), AVG(moves) FROM episodes GROUP BY {group_by}")
+        return {key: {"episodes": n, "win_rate": wins, "mean_moves": moves} for key, n, wins, moves in rows}
+
+    def close(self):
+        self.connection.close()
+
+
+class MetricsWriter:
+    """
+    Streams game records into a MetricsStore from a background thread.
+    Recording only puts a tuple on a queue; the writer thread groups queued
+    rows into batched inserts. Episodes are numbered within a run id unique
+    to this writer, so several processes can append to the same database.
+    A failed write never stops the thread: the first error is kept and
+    raised by the next flush() or close().
+    """
+
+    def __init__(self, path: str, batch_size: int = 512):
+        self.path = path
+        self.batch_size = batch_size
+        self.run = uuid.uuid4().hex
+        self.episode = 0
+        store = MetricsStore(path)  # Create the schema and read high scores up front
+        self.high_scores = store.load_high_scores()
+        store.close()
+        self.error = None  # First write error not yet raised
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_loop, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def new_episode(self):
+        self.episode += 1
+
+    def tick(self, tick: int, flag_id: str, position: Tuple[int, int], traditional: int, food_collected: int):
+        self._queue.put(("ticks", (self.run, self.episode, tick, flag_id, position[0], position[1],
+                                   traditional, food_collected)))
+
+    def end_episode(self, episode: Dict[str, object], agents: List[Dict[str, object]]):
+        """Record a finished episode; dict keys are EPISODE_COLUMNS / AGENT_COLUMNS without run and episode"""
+        ids = {"run": self.run, "episode": self.episode}
+        self._queue.put(("episodes", tuple({**episode, **ids}[c] for c in EPISODE_COLUMNS)))
+        for agent in agents:
+            self._queue.put(("agents", tuple({**agent, **ids}[c] for c in AGENT_COLUMNS)))
+
+    def save_high_scores(self, high_scores: Dict[str, int]):
+        self._queue.put(("high_scores", dict(high_scores)))
+
+    def flush(self):
+        """Block until everything recorded so far is written, raising the first write error since the last call"""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        while not done.wait(0.5) and self._thread.is_alive():
+            pass
+        self._raise_error()
+
+    def close(self):
+        self._queue.put(("close", None))
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def _write_loop(self):
+        try:
+            store = MetricsStore(self.path)  # SQLite connections belong to the thread that made them
+        except Exception as error:
+            store, self.error = None, error  # Records are dropped, flush() and close() report why
+        while True:
+            pending: Dict[str, List[tuple]] = {}
+            kind, item = self._queue.get()
+            # Drain whatever else is queued into the same batch
+            while kind in ("episodes", "agents", "ticks"):
+                pending.setdefault(kind, []).append(item)
+                if sum(len(rows) for rows in pending.values()) >= self.batch_size:
+                    kind = None
+                    break
+                try:
+                    kind, item = self._queue.get_nowait()
+                except queue.Empty:
+                    kind = None
+            try:
+                if store is not None:
+                    for table in ("episodes", "agents", "ticks"):
+                        if table in pending:
+                            store.insert(table, pending[table])
+                    if kind == "high_scores":
+                        store.save_high_scores(item)
+            except Exception as error:
+                if self.error is None:
+                    self.error = error  # Later batches are still tried
+            finally:
+                if kind == "flush":
+                    item.set()  # Even after an error, nobody waits on this thread forever
+            if kind == "close":
+                if store is not None:
+                    store.close()
+                return
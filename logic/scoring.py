@@ -0,0 +1,137 @@
+# logic/scoring.py
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+def time_efficiency(sim_time: float) -> float:
+    """Time efficiency (0-1): full at the start, none after 5 simulated minutes"""
+    return max(0, 1 - sim_time / 300)
+
+def game_intelligence(agent, sim_time: float) -> float:
+    """Game formula (0-10): time 30%, path efficiency 40%, decision quality 20%, safety 10%"""
+    return (
+        0.3 * time_efficiency(sim_time) +
+        0.4 * agent.get_path_efficiency() +
+        0.2 * agent.get_decision_quality() +
+        0.1 * agent.get_safety_score()
+    ) * 10
+
+def agent_intelligence(agent, sim_time: float = 0.0) -> float:
+    """PacmanAgent formula (0-10): decision quality 50%, safety 30%, path efficiency 20%"""
+    if agent.total_decisions == 0:
+        return 0.0
+    intelligence_score = (
+        agent.get_decision_quality() * 0.5 +
+        agent.get_safety_score() * 0.3 +
+        agent.get_path_efficiency() * 0.2
+    ) * 10
+    return max(0, min(10, intelligence_score))
+
+# Intelligence formulas selectable by name in settings
+SCORING_PROFILES = {
+    "game": game_intelligence,
+    "agent": agent_intelligence,
+}
+
+
+class DecisionCounters:
+    """
+    A Pacman's decision counters as of one move, with the ratios of
+    PacmanAgent read by the intelligence formulas, so scores computed later
+    still see the agent as it was then
+    """
+    __slots__ = ("total_decisions", "good_decisions", "ghost_encounters", "total_path_efficiency")
+
+    def __init__(self, agent):
+        self.total_decisions = agent.total_decisions
+        self.good_decisions = agent.good_decisions
+        self.ghost_encounters = agent.ghost_encounters
+        self.total_path_efficiency = agent.total_path_efficiency
+
+    def get_path_efficiency(self) -> float:
+        return self.total_path_efficiency / self.total_decisions if self.total_decisions else 0.0
+
+    def get_decision_quality(self) -> float:
+        return self.good_decisions / self.total_decisions if self.total_decisions else 0.0
+
+    def get_safety_score(self) -> float:
+        return 1.0 - self.ghost_encounters / self.total_decisions if self.total_decisions else 1.0
+
+
+class ScoreCard(Mapping):
+    """
+    Scores of one Pacman, read like the former score dict. The game loop only
+    bumps raw counters and, on each successful move, copies the agent's
+    decision counters; intelligence, time and path efficiency are computed
+    from that copy when first read and memoized until the next move or the
+    end of the game, so they match the scores of the last move and runs
+    that never read them never pay for them.
+    """
+    RAW = ("traditional", "food_collected", "flags_reached")
+    DERIVED = ("intelligence", "time", "path_eff")
+
+    def __init__(self, agent, clock, profile: str = "game"):
+        if profile not in SCORING_PROFILES:
+            raise ValueError(f"Unknown scoring profile '{profile}', expected one of {sorted(SCORING_PROFILES)}")
+        self.agent = agent
+        self.clock = clock
+        self.profile = SCORING_PROFILES[profile]
+        self.traditional = 0
+        self.food_collected = 0
+        self.flags_reached = 0
+        self.scored_tick: Optional[int] = None  # Tick of the last successful move; derived scores are as of then
+        self.counters: Optional[DecisionCounters] = None  # The agent's counters at that move
+        self.final_tick: Optional[int] = None  # Tick the game ended, for the end-of-game time penalty
+        self._memo_key = None
+        self._derived: Dict[str, float] = {}
+
+    def reset(self):
+        """Zero the counters for a new episode"""
+        self.traditional = 0
+        self.food_collected = 0
+        self.flags_reached = 0
+        self.scored_tick = None
+        self.counters = None
+        self.final_tick = None
+        self._memo_key = None
+
+    def moved(self):
+        self.scored_tick = self.clock.ticks
+        self.counters = DecisionCounters(self.agent)
+
+    def finish(self):
+        self.final_tick = self.clock.ticks
+
+    def derived(self) -> Dict[str, float]:
+        key = (self.scored_tick, self.final_tick)
+        if key != self._memo_key:
+            self._memo_key = key
+            self._derived = self._compute()
+        return self._derived
+
+    def _compute(self) -> Dict[str, float]:
+        derived = {"intelligence": 0.0, "time": 0.0, "path_eff": 0.0}
+        if self.scored_tick is not None:
+            sim_time = self.scored_tick * self.clock.seconds_per_tick
+            derived["intelligence"] = self.profile(self.counters, sim_time)
+            derived["time"] = time_efficiency(sim_time) * 10
+            derived["path_eff"] = self.counters.get_path_efficiency() * 10
+        if self.final_tick is not None:
+            time_penalty = self.final_tick * self.clock.seconds_per_tick / 60  # 1 point per simulated minute
+            derived["intelligence"] = max(0, derived["intelligence"] - time_penalty)
+        return derived
+
+    def __getitem__(self, key: str):
+        if key in self.RAW:
+            return getattr(self, key)
+        if key in self.DERIVED:
+            return self.derived()[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.RAW[:1] + self.DERIVED + self.RAW[1:])
+
+    def __len__(self) -> int:
+        return len(self.RAW) + len(self.DERIVED)
+
+    def copy(self) -> Dict[str, object]:
+        return dict(self)
@@ -0,0 +1,30 @@
+# logic/sim_clock.py
+import time
+
+class SimulationClock:
+    """
+    Game time counted in ticks. Virtual time advances a fixed step per tick, so
+    anything scored against it is the same at 8 FPS or flat out headless.
+    Wall time is kept apart, for performance reporting only.
+    """
+
+    def __init__(self, seconds_per_tick: float):
+        self.seconds_per_tick = seconds_per_tick
+        self.reset()
+
+    def reset(self):
+        self.ticks = 0
+        self.wall_start = time.time()
+        self._perf_start = time.perf_counter()
+
+    def tick(self):
+        self.ticks += 1
+
+    @property
+    def time(self) -> float:
+        """Virtual seconds elapsed since the start of the game"""
+        return self.ticks * self.seconds_per_tick
+
+    def wall_elapsed(self) -> float:
+        """Real seconds elapsed since the start of the game"""
+        return time.perf_counter() - self._perf_start
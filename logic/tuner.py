@@ -0,0 +1,253 @@
+# logic/tuner.py
+"""
+Parallel tuning of PacmanAgent's heuristic constants (agents/agent_params.py).
+
+Candidates are the current parameters plus random samples of the parameter
+space, compared by successive halving: every survivor plays a few seeded
+headless games per map, the better 1/eta of them go on to eta times more
+seeds, and so on. Bad candidates stop after the cheapest rung, so most of
+the CPU time goes to telling good ones apart. Games run in a process pool
+over all cores and every finished game is stored in a SQLite result cache
+keyed by (parameters, map contents, seed, game settings), so rungs, reruns
+and later searches never replay a game.
+
+    python -m logic.tuner data/maps/map1.txt data/maps/map3.txt --candidates 16 --cache data/tuning.db
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from config import settings
+from agents.agent_params import AgentParams
+from environment.map_analysis import map_digest
+
+# Settings a game's outcome depends on besides the Pacman parameters: copied to the
+# worker processes and part of the key of every cached result
+GAME_SETTINGS = ("PACMAN_STRATEGY", "PATH_SEARCH", "INFLUENCE_RADIUS", "INFLUENCE_WEIGHT", "GHOST_PREDICTION",
+                 "CAPTURE_RISK", "GHOST_POLICIES", "ROUTE_IMPROVE_BUDGET")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    params TEXT, map TEXT, seed INTEGER, config TEXT, victory INTEGER, moves INTEGER, cpu_seconds REAL,
+    PRIMARY KEY (params, map, seed, config));
+"""
+
+class ResultCache:
+    """Finished tuning games, in a SQLite file or in memory"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.executescript(SCHEMA)
+
+    def get(self, params: str, map_key: str, config: str, seeds: List[int]) -> Dict[int, Tuple[bool, int, float]]:
+        """{seed: (victory, moves, cpu_seconds)} of the games already played among seeds"""
+        rows = self.connection.execute(
+            "SELECT seed, victory, moves, cpu_seconds FROM results WHERE params = ? AND map = ? AND config = ?",
+            (params, map_key, config))
+        wanted = set(seeds)
+        return {seed: (bool(victory), moves, cpu) for seed, victory, moves, cpu in rows if seed in wanted}
+
+    def put(self, params: str, map_key: str, config: str, results: Dict[int, Tuple[bool, int, float]]):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(params, map_key, seed, config, int(victory), moves, cpu)
+                 for seed, (victory, moves, cpu) in results.items()])
+
+    def close(self):
+        self.connection.close()
+
+
+class Evaluation:
+    """Games of one candidate so far, over every map"""
+
+    def __init__(self, params: AgentParams):
+        self.params = params
+        self.games = 0
+        self.wins = 0
+        self.moves = 0
+        self.cpu_seconds = 0.0
+        self.rung = 0  # Last successive halving rung the candidate played
+
+    def add(self, victory: bool, moves: int, cpu_seconds: float):
+        self.games += 1
+        self.wins += victory
+        self.moves += moves
+        self.cpu_seconds += cpu_seconds
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    def score(self) -> Tuple[float, float]:
+        """Ranking key: win rate first, then fewer moves per game"""
+        return self.win_rate, -self.moves / max(1, self.games)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"params": self.params.as_dict(), "games": self.games, "win_rate": self.win_rate,
+                "mean_moves": self.moves / max(1, self.games), "rung": self.rung}
+
+
+# Game reused by a worker for the next seeds of the same map and parameters, restarted in place
+_games: Dict[str, Tuple[str, object]] = {}
+
+def _init_worker(config: Dict[str, object]):
+    for name, value in config.items():
+        setattr(settings, name, value)
+    settings.AGENT_EXECUTOR = "sync"  # Deterministic for a seed
+    settings.METRICS_DB = None
+
+@contextlib.contextmanager
+def _worker_settings(config: Dict[str, object]):
+    """The settings of a worker process, for games played in this one, restored afterwards"""
+    saved = {name: getattr(settings, name) for name in GAME_SETTINGS + ("AGENT_EXECUTOR", "METRICS_DB")}
+    _init_worker(config)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+        _games.clear()  # Built under the worker settings
+
+def play_games(map_path: str, vector: List[float], seeds: List[int], max_moves: int) -> Dict[int, Tuple[bool, int, float]]:
+    """Play one headless game per seed: {seed: (victory, moves, cpu_seconds)}"""
+    from logic.game import Game  # Not needed by the parent process
+    params = AgentParams.from_vector(vector)
+    results = {}
+    for seed in seeds:
+        started = time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            key, game = _games.get(map_path, (None, None))
+            if key == params.key():
+                game.reset()
+            else:
+                game = Game(map_path, display_backend="null", pacman_params=params)
+                _games[map_path] = (params.key(), game)
+            random.seed(seed)
+            while not game.game_over and game.move_count < max_moves:
+                game.update()
+        results[seed] = ("VICTORY" in game.game_result, game.move_count, time.process_time() - started)
+    return results
+
+
+class Tuner:
+    """
+    Successive halving over candidate parameters on a set of maps. workers is
+    the number of game processes (default: every core); with 1 the games run
+    in this process. Use as a context manager to shut the pool down.
+    """
+
+    def __init__(self, map_paths: List[str], cache: Optional[ResultCache] = None, workers: Optional[int] = None,
+                 max_moves: int = 500):
+        self.map_paths = map_paths
+        self.map_keys = {path: map_digest(path) for path in map_paths}
+        self.cache = cache or ResultCache()
+        self.max_moves = max_moves
+        self.config = {name: getattr(settings, name) for name in GAME_SETTINGS}
+        self.config_key = repr(sorted(self.config.items())) + f":{max_moves}"
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.config,))
+        self.games_played = 0
+        self.cpu_seconds = 0.0  # Spent on the games played by this tuner, not those found in the cache
+
+    def evaluate(self, evaluations: List[Evaluation], seeds: List[int]):
+        """Add the results of every candidate on every map and seed, playing only uncached games"""
+        tasks, cached = [], []
+        for evaluation in evaluations:
+            params_key = evaluation.params.key()
+            for path in self.map_paths:
+                known = self.cache.get(params_key, self.map_keys[path], self.config_key, seeds)
+                cached.append((evaluation, known))
+                missing = [seed for seed in seeds if seed not in known]
+                if missing:
+                    tasks.append((evaluation, path, missing))
+
+        if self.pool is not None:
+            futures = [self.pool.submit(play_games, path, evaluation.params.vector(), missing, self.max_moves)
+                       for evaluation, path, missing in tasks]
+            played = [future.result() for future in futures]
+        else:
+            with _worker_settings(self.config):
+                played = [play_games(path, evaluation.params.vector(), missing, self.max_moves)
+                          for evaluation, path, missing in tasks]
+
+        for (evaluation, path, _), results in zip(tasks, played):
+            self.cache.put(evaluation.params.key(), self.map_keys[path], self.config_key, results)
+            self.games_played += len(results)
+            self.cpu_seconds += sum(cpu for _, _, cpu in results.values())
+            cached.append((evaluation, results))
+        for evaluation, results in cached:
+            for victory, moves, cpu in results.values():
+                evaluation.add(victory, moves, cpu)
+
+    def successive_halving(self, candidates: List[AgentParams], min_seeds: int = 4, eta: int = 2,
+                           rungs: int = 3) -> List[Evaluation]:
+        """
+        Evaluate candidates on min_seeds, min_seeds * eta, ... seeds per map,
+        keeping the best 1/eta after each rung. Returns every candidate, best
+        first: the ones that went furthest, ranked by their last rung.
+        """
+        evaluations = [Evaluation(params) for params in dict.fromkeys(candidates)]  # Duplicates dropped
+        survivors = evaluations
+        for rung in range(rungs):
+            seeds = list(range(min_seeds * eta ** rung))
+            for evaluation in survivors:  # Every rung replays the seeds of the previous ones from the cache
+                evaluation.games = evaluation.wins = evaluation.moves = 0
+                evaluation.cpu_seconds = 0.0
+                evaluation.rung = rung
+            self.evaluate(survivors, seeds)
+            survivors.sort(key=Evaluation.score, reverse=True)
+            if rung < rungs - 1:
+                survivors = survivors[:max(1, math.ceil(len(survivors) / eta))]
+        return sorted(evaluations, key=lambda evaluation: (evaluation.rung, evaluation.score()), reverse=True)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self) -> 'Tuner':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def random_candidates(count: int, seed: int = 0) -> List[AgentParams]:
+    """The current parameters plus count - 1 random ones"""
+    rng = random.Random(seed)
+    return [AgentParams.from_settings()] + [AgentParams.sample(rng) for _ in range(count - 1)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune PacmanAgent parameters by successive halving")
+    parser.add_argument("maps", nargs="+", help="Map files every candidate plays")
+    parser.add_argument("--candidates", type=int, default=16, help="Random candidates, the current parameters included")
+    parser.add_argument("--min-seeds", type=int, default=4, help="Games per map in the first rung")
+    parser.add_argument("--eta", type=int, default=2, help="Survivors are divided and seeds multiplied by eta per rung")
+    parser.add_argument("--rungs", type=int, default=3)
+    parser.add_argument("--max-moves", type=int, default=500, help="Moves after which a game counts as lost")
+    parser.add_argument("--workers", type=int, default=0, help="Game processes, 0 for one per core")
+    parser.add_argument("--cache", default=":memory:", help="SQLite file of played games, kept across runs")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random candidates")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with Tuner(args.maps, ResultCache(args.cache), args.workers or None, args.max_moves) as tuner:
+        ranking = tuner.successive_halving(random_candidates(args.candidates, args.seed),
+                                           args.min_seeds, args.eta, args.rungs)
+    for evaluation in ranking[:5]:
+        print(f"rung {evaluation.rung}  win rate {evaluation.win_rate:.3f} over {evaluation.games} games  "
+              f"{evaluation.moves / max(1, evaluation.games):.0f} moves  {evaluation.params}")
+    full = len(ranking) * len(args.maps) * args.min_seeds * args.eta ** (args.rungs - 1)
+    print(f"{tuner.games_played} games played ({full} without early stopping), "
+          f"{tuner.cpu_seconds / 3600:.4f} CPU-hours, {time.perf_counter() - started:.1f}s on {tuner.workers} workers")
+    print(f"settings.PACMAN_PARAMS = {ranking[0].params.as_dict()}")
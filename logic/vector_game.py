@@ -0,0 +1,168 @@
+# logic/vector_game.py
+from typing import Optional, Tuple
+import numpy as np
+from environment.grid import Grid, CELL_WALL, CELL_FOOD
+
+# Action indices shared by Pacmans and ghosts: up, right, down, left, stay
+ACTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0), (0, 0)]
+STAY = 4
+
+def action_index(action: Tuple[int, int]) -> int:
+    """Convert a (dx, dy) move into its index in ACTIONS"""
+    return ACTIONS.index(action)
+
+class VectorGame:
+    """
+    B independent games on the same map advanced in lockstep with NumPy.
+
+    Each step applies the Game.update rules to every running game at once:
+    ghosts move first (uniformly random legal moves drawn as one batch unless
+    explicit actions are given) and become protected on any flag, then
+    Pacmans move in order, eating food for +10 and reaching their own flag
+    for +100 once no food is left, which protects them. A non-protected
+    Pacman sharing a cell with a ghost loses the game unless the first ghost
+    on that cell is protected. The game is won once every Pacman is protected.
+    Finished games are frozen until reset().
+
+    Positions are flat cell indices (y * width + x).
+    """
+
+    def __init__(self, grid: Grid, batch_size: int, seed: Optional[int] = None):
+        self.grid = grid
+        self.batch_size = batch_size
+        self.width, self.height = grid.width, grid.height
+        self.rng = np.random.default_rng(seed)
+
+        cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8)
+        n = cells.size
+        index = np.arange(n)
+        xs, ys = index % self.width, index // self.width
+
+        # Cell reached by each action, the cell itself when the move is blocked
+        self.moves = np.empty((n, len(ACTIONS)), dtype=np.int32)
+        for a, (dx, dy) in enumerate(ACTIONS):
+            nx, ny = xs + dx, ys + dy
+            inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+            target = np.where(inside, ny * self.width + nx, index)
+            self.moves[:, a] = np.where(inside & (cells[target] != CELL_WALL), target, index)
+
+        # Legal ghost actions per cell, packed first so a random slot can be drawn
+        legal = self.moves[:, :4] != index[:, None]
+        self.legal_count = legal.sum(axis=1)
+        self.legal_actions = np.argsort(~legal, axis=1, kind='stable').astype(np.int32)
+
+        food_cells = np.flatnonzero(cells == CELL_FOOD)
+        self.food_index = np.full(n, -1, dtype=np.int32)
+        self.food_index[food_cells] = np.arange(food_cells.size)
+        self.num_food = food_cells.size
+
+        self.is_flag = np.zeros(n, dtype=bool)
+        for fx, fy, _ in grid.get_flag_positions():
+            self.is_flag[fy * self.width + fx] = True
+
+        self.pacman_starts = np.array([y * self.width + x for x, y in grid.get_start_positions()], dtype=np.int32)
+        self.ghost_starts = np.array([y * self.width + x for x, y in grid.get_ghost_positions()], dtype=np.int32)
+        self.num_pacmans = self.pacman_starts.size
+        self.num_ghosts = self.ghost_starts.size
+        # Flag cell of Pacman i is the flag token F{i+1}, -1 if the map has none
+        flags = {fid: y * self.width + x for x, y, fid in grid.get_flag_positions()}
+        self.goal_cells = np.array([flags.get(f'F{i+1}', -1) for i in range(self.num_pacmans)], dtype=np.int32)
+
+        b, p, g = batch_size, self.num_pacmans, self.num_ghosts
+        self.pacman_positions = np.empty((b, p), dtype=np.int32)
+        self.ghost_positions = np.empty((b, g), dtype=np.int32)
+        self.food = np.empty((b, self.num_food), dtype=bool)
+        self.food_left = np.empty(b, dtype=np.int32)
+        self.pacman_protected = np.empty((b, p), dtype=bool)
+        self.ghost_protected = np.empty((b, g), dtype=bool)
+        self.scores = np.empty((b, p), dtype=np.int32)
+        self.food_collected = np.empty((b, p), dtype=np.int32)
+        self.flags_reached = np.empty((b, p), dtype=np.int32)
+        self.move_count = np.empty(b, dtype=np.int32)
+        self.done = np.empty(b, dtype=bool)
+        self.victory = np.empty(b, dtype=bool)
+        self._rows = np.arange(b)
+        self.reset()
+
+    def reset(self, games: Optional[np.ndarray] = None):
+        """Restore the start state of all games, or only of the given indices / boolean mask"""
+        games = slice(None) if games is None else games
+        self.pacman_positions[games] = self.pacman_starts
+        self.ghost_positions[games] = self.ghost_starts
+        self.food[games] = True
+        self.food_left[games] = self.num_food
+        self.pacman_protected[games] = False
+        self.ghost_protected[games] = False
+        self.scores[games] = 0
+        self.food_collected[games] = 0
+        self.flags_reached[games] = 0
+        self.move_count[games] = 0
+        self.done[games] = False
+        self.victory[games] = False
+
+    def random_ghost_actions(self) -> np.ndarray:
+        """Draw one uniformly random legal action per ghost for every game"""
+        counts = self.legal_count[self.ghost_positions]
+        slots = (self.rng.random(counts.shape) * counts).astype(np.int32)
+        actions = self.legal_actions[self.ghost_positions, np.minimum(slots, 3)]
+        return np.where(counts > 0, actions, STAY)
+
+    def step(self, pacman_actions: np.ndarray, ghost_actions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Advance every running game by one tick.
+        pacman_actions and ghost_actions are (B, P) and (B, G) arrays of ACTIONS indices,
+        ghosts move randomly when ghost_actions is None.
+        Returns the (B, P) score gained by each Pacman during this tick.
+        """
+        active = ~self.done
+        rows = self._rows
+        self.move_count += active
+        start_scores = self.scores.copy()
+
+        # Ghosts move first and become protected on any flag
+        if ghost_actions is None:
+            ghost_actions = self.random_ghost_actions()
+        moved = self.moves[self.ghost_positions, ghost_actions]
+        self.ghost_positions = np.where(active[:, None], moved, self.ghost_positions)
+        self.ghost_protected |= self.is_flag[self.ghost_positions] & active[:, None]
+
+        # Pacmans move one after another so food goes to the first one to reach it
+        pacman_actions = np.asarray(pacman_actions)
+        for i in range(self.num_pacmans):
+            free = active & ~self.pacman_protected[:, i]
+            actions = np.where(free, pacman_actions[:, i], STAY)
+            position = self.moves[self.pacman_positions[:, i], actions]
+            self.pacman_positions[:, i] = position
+
+            food_slot = self.food_index[position]
+            eats = free & (food_slot >= 0)
+            eats &= self.food[rows, np.maximum(food_slot, 0)]
+            self.food[rows[eats], food_slot[eats]] = False
+            self.food_left -= eats
+            self.scores[:, i] += 10 * eats
+            self.food_collected[:, i] += eats
+
+            reached = free & (self.food_left == 0) & (position == self.goal_cells[i])
+            self.scores[:, i] += 100 * reached
+            self.flags_reached[:, i] += reached
+            self.pacman_protected[:, i] |= reached
+
+        # Collisions: the first ghost on a Pacman's cell decides, as in Game.update
+        lost = np.zeros(self.batch_size, dtype=bool)
+        if self.num_ghosts:
+            for i in range(self.num_pacmans):
+                same_cell = self.ghost_positions == self.pacman_positions[:, i, None]
+                first_ghost = same_cell.argmax(axis=1)
+                lost |= (active & same_cell.any(axis=1) & ~self.pacman_protected[:, i]
+                         & ~self.ghost_protected[rows, first_ghost])
+
+        won = active & ~lost & self.pacman_protected.all(axis=1)
+        self.done |= lost | won
+        self.victory |= won
+        return self.scores - start_scores
+
+    def positions(self, game: int) -> Tuple[list, list]:
+        """(x, y) Pacman and ghost positions of one game, for comparison with Game"""
+        to_xy = lambda cell: (int(cell) % self.width, int(cell) // self.width)
+        return ([to_xy(c) for c in self.pacman_positions[game]],
+                [to_xy(c) for c in self.ghost_positions[game]])
@@ -0,0 +1,71 @@
+# tests/random_maps.py
+"""
+Maps for the tests: seeded random maps, the small fixed maps most tests play
+on, and TempMapTestCase, which writes them to a temp dir removed after each test
+and keeps the display's asset cache in it too.
+"""
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from typing import List
+from config import settings
+
+# One Pacman and one ghost, the flag in the right wall
+SOLO = ["##########", "#P1.....G#", "#.##.##..#", "#.......F1", "##########"]
+# Two Pacmen, each with its flag across the map, and two ghosts
+DUEL = ["############", "#P1.....G.F2", "#.##.##.#..#", "#..........#",
+        "#.#.##.##..#", "#P2.G....F1#", "############"]
+
+def random_map(width: int, height: int, seed: int, agents: int = 1, wall_density: float = 0.3) -> List[str]:
+    """
+    Rows of a bordered map with random walls and food everywhere else, and
+    agents (1 or 2) Pacmen with their flags and ghosts at fixed places.
+    """
+    rng = random.Random(seed)
+    rows = [["#"] * width]
+    for _ in range(height - 2):
+        rows.append(["#"] + ["#" if rng.random() < wall_density else "." for _ in range(width - 2)] + ["#"])
+    rows.append(["#"] * width)
+    rows[1][1:3] = ["P", "1"]
+    rows[height - 2][width - 3:width - 1] = ["F", "1"]
+    rows[height // 2][width // 2] = "G"
+    if agents > 1:
+        rows[height - 2][1:3] = ["P", "2"]
+        rows[1][width - 3:width - 1] = ["F", "2"]
+        rows[height // 2][width // 2 - 2] = "G"
+    return ["".join(row) for row in rows]
+
+def write_map(directory: str, name: str, rows: List[str]) -> str:
+    """Write rows to directory/name.txt and return the path"""
+    path = os.path.join(directory, f"{name}.txt")
+    with open(path, "w") as f:
+        f.write("\n".join(rows))
+    return path
+
+def quiet():
+    """Context swallowing the loading and game messages printed to stdout"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+class TempMapTestCase(unittest.TestCase):
+    """
+    Test case with a temp dir (self.tmp) for its maps, removed after each
+    test. Fonts and sprite atlases the displays cache go there as well.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(setattr, settings, "ASSET_CACHE_DIR", settings.ASSET_CACHE_DIR)
+        settings.ASSET_CACHE_DIR = os.path.join(self.tmp.name, "cache")
+
+    def write_map(self, rows: List[str], name: str = "map") -> str:
+        return write_map(self.tmp.name, name, rows)
+
+    def load_grid(self, rows: List[str], name: str = "map"):
+        """Grid of rows, loaded quietly"""
+        from environment.grid import Grid  # Lazy: the random maps need no game code
+        with quiet():
+            return Grid(self.write_map(rows, name))
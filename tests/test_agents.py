@@ -3,24 +3,26 @@
 
 
 # tests/test_agents.py
+import time
 import unittest
 from environment.grid import Grid
 from agents.pacman_agent import PacmanAgent
 from agents.ghost_agent import GhostAgent
+from agents.ghost_policies import GhostField
+from agents.agent_factory import AgentFactory
+from logic.agent_executor import AgentExecutor, pacman_fallback
 from logic.game import Game
+from tests.random_maps import TempMapTestCase
 
-class TestAgents(unittest.TestCase):
+# Pacman, its flag and a ghost around one wall
+SMALL = ["P1 .", ".#F1", "G . "]
+
+class TestAgents(TempMapTestCase):
     def setUp(self):
-        # Create a simple 3x3 grid with P1, F1, G
-        map_content = [
-            "P1 .",
-            ".#F1",
-            "G . "
-        ]
-        with open("test_map.txt", "w") as f:
-            f.write("\n".join(map_content))
-        self.grid = Grid("test_map.txt")
-        self.game = Game("test_map.txt")
+        super().setUp()
+        path = self.write_map(SMALL)
+        self.grid = Grid(path)
+        self.game = Game(path)
 
     def test_ghost_agent_action(self):
         ghost_agent = GhostAgent(self.grid, (255, 0, 0))
@@ -30,19 +32,140 @@ class TestAgents(unittest.TestCase):
         legal_actions = [a for a in legal_actions if self.grid.is_valid((position[0] + a[0], position[1] + a[1]))]
         self.assertIn(action, legal_actions)
 
+    def step(self, pacman_action, ghost_action=(0, 0)):
+        """One update with the agents' moves fixed, the ghost waiting by default"""
+        self.game.pacman_agents[0].choose_action = lambda position: pacman_action
+        self.game.ghost_agents[0].choose_action = lambda position: ghost_action
+        self.game.update()
+
     def test_pacman_ghost_collision(self):
-        self.game.pacman_positions = [(0, 2)]  # Move Pacman to ghost position
+        self.game.pacman_positions = [(0, 1)]  # Just above the ghost
         self.game.ghost_positions = [(0, 2)]
-        self.game.update()
+        self.step((0, 1))
+        self.assertEqual(self.game.pacman_positions, [(0, 2)])
         self.assertTrue(self.game.game_over)
-        self.assertIn("caught by ghost", self.game.game_result)
+        self.assertEqual(self.game.game_result, "GAME OVER!")
 
     def test_pacman_reach_flag(self):
-        self.game.pacman_positions = [(2, 1)]  # Move Pacman to flag position
+        self.game.pacman_positions = [(2, 0)]  # Just above the flag
         self.game.ghost_positions = [(0, 2)]
-        self.game.update()
+        self.step((0, 1))
+        self.assertFalse(self.game.game_over)  # Food is left: the flag does not count yet
+        self.game.grid.food_positions.clear()
+        self.step((0, -1))
+        self.step((0, 1))
         self.assertTrue(self.game.game_over)
-        self.assertIn("Victory", self.game.game_result)
+        self.assertEqual(self.game.game_result, "VICTORY!")
+        self.assertEqual(self.game.scores["F1"].flags_reached, 1)
+
+class TestGhostPolicies(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.grid = self.load_grid([
+            "##########",
+            "#P1.....G#",
+            "#.######.#",
+            "#......F1#",
+            "##########",
+        ], "ghosts")
+        self.factory = AgentFactory(self.grid, [(255, 255, 0)])
+
+    def test_chase_ghost_closes_distance(self):
+        ghost = self.factory.create_ghost_agent("chase")
+        field = self.factory.ghost_field
+        position = (8, 1)
+        for _ in range(5):
+            field.update([(1, 1)], [position])
+            before = field.distance_to_pacman(position, 0)
+            action = ghost.choose_action(position)
+            position = (position[0] + action[0], position[1] + action[1])
+            self.assertEqual(field.distance_to_pacman(position, 0), before - 1)
+
+    def test_distance_field_shared_between_ghosts(self):
+        ghosts = [self.factory.create_ghost_agent("chase") for _ in range(50)]
+        field = self.factory.ghost_field
+        calls = []
+        original = field.bfs.distance_map
+        field.bfs.distance_map = lambda pos: calls.append(pos) or original(pos)
+        field.update([(1, 1)], [(8, 1)] * 50)
+        for ghost in ghosts:
+            self.assertIn(ghost.choose_action((8, 1)), self.grid.get_valid_actions((8, 1)))
+        self.assertEqual(calls, [(1, 1)])
+
+    def test_every_policy_returns_legal_moves(self):
+        for policy in ["random", "chase", "ambush", "scatter", "classic"]:
+            ghost = self.factory.create_ghost_agent(policy)
+            self.factory.ghost_field.update([(3, 3)], [(8, 2)])
+            self.assertIn(ghost.choose_action((8, 2)), self.grid.get_valid_actions((8, 2)))
+        with self.assertRaises(ValueError):
+            self.factory.create_ghost_agent("teleport")
+
+class SlowAgent:
+    def __init__(self, delay, action):
+        self.delay = delay
+        self.action = action
+        self.path = [(1, 1), (2, 1)]
+
+    def choose_action(self, position):
+        time.sleep(self.delay)
+        return self.action
+
+class TestAgentExecutor(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.executor = AgentExecutor(deadline_ms=30)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_missed_deadline_uses_fallback(self):
+        fast, slow = SlowAgent(0, (0, 1)), SlowAgent(0.3, (0, -1))
+        requests = [("fast", fast, (1, 1), pacman_fallback), ("slow", slow, (1, 1), pacman_fallback)]
+        started = time.perf_counter()
+        self.assertEqual(self.executor.decide(requests), [(0, 1), (1, 0)])
+        self.assertLess(time.perf_counter() - started, 0.2)
+        # The slow decision is still running: it is not restarted and falls back again
+        self.assertEqual(self.executor.decide(requests)[1], (1, 0))
+        self.assertEqual(self.executor.stats["slow"].misses, 2)
+        self.assertEqual(self.executor.stats["fast"].decisions, 2)
+        time.sleep(0.35)
+        self.assertEqual(self.executor.stats["slow"].decisions, 1)
+        self.assertGreaterEqual(self.executor.stats["slow"].max_time, 0.3)
+
+    def test_game_runs_with_concurrent_agents(self):
+        game = Game(self.write_map(SMALL, "executor"))
+        game.executor = self.executor
+        for _ in range(5):
+            game.update()
+        self.assertIn("P1", self.executor.stats)
+        self.assertIn("G1", self.executor.stats)
+
+    def test_late_decision_owns_its_agent(self):
+        game = Game(self.write_map(SMALL, "executor"))
+        game.executor = self.executor
+        agent = game.pacman_agents[0]
+        deciding, overlaps = [], []
+        choose_action, update, reset = agent.choose_action, agent.update_ghost_positions, agent.reset
+
+        def slow_choose(position):
+            deciding.append(True)
+            time.sleep(0.1)
+            deciding.pop()
+            return choose_action(position)
+
+        def check(method):
+            def checked(*args):
+                overlaps.extend(deciding)  # Called while a decision of the agent runs
+                return method(*args)
+            return checked
+        agent.choose_action = slow_choose
+        agent.update_ghost_positions, agent.reset = check(update), check(reset)
+        for _ in range(4):
+            game.update()
+        self.assertGreater(self.executor.stats["P1"].misses, 0)
+        game.reset()
+        self.assertEqual(overlaps, [])
+        self.assertEqual(self.executor.busy(), set())
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,281 @@
+# tests/test_algorithms.py
+import random
+import unittest
+from collections import deque
+from environment.grid import Grid
+from algorithms.bfs import BFS
+from algorithms.astar import AStar
+from algorithms.route_planner import RoutePlanner
+from algorithms.hierarchical_astar import HierarchicalAStar
+from algorithms.dstar_lite import DStarLite
+from algorithms.ucs import UCS
+from tests.random_maps import TempMapTestCase, random_map
+
+def maze_lines(cells, seed):
+    """Perfect maze of cells x cells rooms (recursive backtracker) with a few loops"""
+    rng = random.Random(seed)
+    size = 2 * cells + 1
+    rows = [['#'] * size for _ in range(size)]
+    stack, seen = [(0, 0)], {(0, 0)}
+    rows[1][1] = '.'
+    while stack:
+        cx, cy = stack[-1]
+        options = [(cx + dx, cy + dy) for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)]
+                   if 0 <= cx + dx < cells and 0 <= cy + dy < cells and (cx + dx, cy + dy) not in seen]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = rng.choice(options)
+        rows[cy + ny + 1][cx + nx + 1] = '.'
+        rows[2 * ny + 1][2 * nx + 1] = '.'
+        seen.add((nx, ny))
+        stack.append((nx, ny))
+    for _ in range(cells):
+        x, y = rng.randrange(1, size - 1), rng.randrange(1, size - 1)
+        if (x + y) % 2 == 1:
+            rows[y][x] = '.'
+    lines = [''.join(row) for row in rows]
+    lines[1] = '#P1' + lines[1][3:]
+    lines[3] = '#G' + lines[3][2:]
+    lines[-2] = lines[-2][:-3] + 'F1#'
+    return lines
+
+class TestAStarReference(TempMapTestCase):
+    """A* on random maps, open and cut into pieces, against a plain BFS over the map text"""
+
+    def reference_distances(self, rows, start):
+        distances, queue = {start: 0}, deque([start])
+        while queue:
+            x, y = queue.popleft()
+            for nx, ny in [(x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)]:
+                if rows[ny][nx] != '#' and (nx, ny) not in distances:
+                    distances[(nx, ny)] = distances[(x, y)] + 1
+                    queue.append((nx, ny))
+        return distances
+
+    def test_paths_are_valid_and_shortest(self):
+        rng = random.Random(8)
+        for seed, (width, height, density) in enumerate([(15, 9, 0.15), (33, 21, 0.3), (41, 41, 0.45)]):
+            rows = random_map(width, height, seed, wall_density=density)
+            grid = self.load_grid(rows, f"random{seed}")
+            astar = AStar(grid)
+            cells = [(x, y) for y in range(height) for x in range(width) if rows[y][x] != '#']
+            for start in rng.sample(cells, 6):
+                distances = self.reference_distances(rows, start)
+                for goal in rng.sample(cells, 15):
+                    path = astar.find_path(start, goal)
+                    if goal not in distances:
+                        self.assertIsNone(path, (start, goal))
+                        continue
+                    self.assertEqual(len(path) - 1, distances[goal], (start, goal))
+                    self.assertEqual((path[0], path[-1]), (start, goal))
+                    for (x, y), (nx, ny) in zip(path, path[1:]):
+                        self.assertEqual(abs(nx - x) + abs(ny - y), 1)
+                        self.assertNotEqual(rows[ny][nx], '#')
+
+
+class TestRoutePlanner(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.grid = Grid(self.write_map([
+            "##########",
+            "#P1.#...G#",
+            "#.#.#.##.#",
+            "#...  ..F1",
+            "##########",
+        ]))
+        self.flag = (8, 3)
+
+    def test_bfs_matches_astar_length(self):
+        bfs, astar = BFS(self.grid), AStar(self.grid)
+        for goal in self.grid.get_food_positions():
+            self.assertEqual(len(bfs.find_path((1, 1), goal)), len(astar.find_path((1, 1), goal)))
+            self.assertEqual(bfs.distance_map((1, 1))[goal], len(astar.find_path((1, 1), goal)) - 1)
+
+    def test_route_covers_food_and_improves(self):
+        planner = RoutePlanner(self.grid, self.flag, improve_budget=0)
+        planner.build((1, 1))
+        self.assertEqual(sorted(planner.route), sorted(self.grid.get_food_positions()))
+        before = planner.route_length((1, 1))
+        while not planner.converged:
+            planner.improve(3)
+        self.assertLessEqual(planner.route_length((1, 1)), before)
+        self.assertEqual(sorted(planner.route), sorted(self.grid.get_food_positions()))
+
+    def test_eaten_food_restarts_improvement(self):
+        planner = RoutePlanner(self.grid, self.flag, improve_budget=0)
+        planner.build((1, 1))
+        while not planner.converged:
+            planner.improve(3)
+        self.grid.food_positions.remove(planner.route[2])
+        planner.sync()
+        self.assertFalse(planner.converged)
+        self.assertGreater(planner.improve(1000), 0)  # A new pass over the shorter route
+        self.assertTrue(planner.converged)
+
+    def test_route_drops_eaten_food_and_ends_at_flag(self):
+        planner = RoutePlanner(self.grid, self.flag)
+        first = planner.next_target((1, 1))
+        self.grid.food_positions.remove(first)
+        self.assertNotEqual(planner.next_target(first), first)
+        self.assertNotIn(first, planner.route)
+        self.grid.food_positions.clear()
+        self.assertEqual(planner.next_target(first), self.flag)
+
+class TestCorridorGraph(TempMapTestCase):
+    def test_graph_compresses_corridors(self):
+        grid = Grid(self.write_map([
+            "#######",
+            "#P1...#",
+            "#.#.#.#",
+            "#.#G..#",
+            "#.#####",
+            "#....F1",
+            "#######",
+        ]))
+        graph = grid.get_corridor_graph()
+        # One junction with a loop back to itself and a corridor to the dead end
+        self.assertEqual(sorted(graph.nodes), [(3, 1), (6, 5)])
+        self.assertEqual(sorted(e.length for e in graph.edges), [8, 11])
+        self.assertEqual(graph.neighbors((6, 5)), [((3, 1), 11, graph.nodes[(6, 5)][0])])
+        self.assertEqual(graph.follow((1, 2), (0, -1), 3), [(1, 1), (2, 1), (3, 1)])
+        total_food = sum(e.food for e in graph.edges) + sum(graph.node_food.values())
+        self.assertEqual(total_food, len(grid.food_positions))
+        grid.update_position((1, 1), (4, 1), 'P')
+        self.assertEqual(sum(e.food for e in graph.edges) + sum(graph.node_food.values()), total_food - 1)
+
+    def test_hierarchical_paths_are_shortest(self):
+        grid = Grid(self.write_map(maze_lines(8, seed=1)))
+        bfs, search = BFS(grid), HierarchicalAStar(grid)
+        cells = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_valid((x, y))]
+        rng = random.Random(2)
+        for _ in range(200):
+            start, goal = rng.choice(cells), rng.choice(cells)
+            path = search.find_path(start, goal)
+            self.assertEqual(len(path) - 1, bfs.distance_map(start)[goal])
+            self.assertEqual((path[0], path[-1]), (start, goal))
+            for a, b in zip(path, path[1:]):
+                self.assertIn(b, grid.get_neighbors(a))
+
+    def test_long_queries_expand_far_fewer_nodes(self):
+        grid = Grid(self.write_map(maze_lines(40, seed=3)))
+        astar, search = AStar(grid), HierarchicalAStar(grid)
+        start, goal = (1, 1), (grid.width - 2, grid.height - 2)
+        self.assertEqual(len(search.find_path(start, goal)), len(astar.find_path(start, goal)))
+        self.assertLess(search.nodes_expanded * 10, astar.nodes_expanded)
+
+def reference_costs(grid, goals, penalties):
+    """Cost to the nearest goal from every cell (multi-source Dijkstra on the reversed graph)"""
+    from heapq import heappush, heappop
+    costs, queue = {}, [(0, goal) for goal in goals]
+    while queue:
+        cost, v = heappop(queue)
+        if v in costs:
+            continue
+        costs[v] = cost
+        for u in grid.get_neighbors(v):
+            if u not in costs:
+                heappush(queue, (cost + 1 + penalties.get(v, 0), u))
+    return costs
+
+class TestWeightedSearch(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.grid = Grid(self.write_map(maze_lines(10, seed=6)))
+        self.cells = [(x, y) for y in range(self.grid.height) for x in range(self.grid.width)
+                      if self.grid.is_valid((x, y))]
+
+    def test_weighted_paths_are_cheapest(self):
+        rng = random.Random(7)
+        astar, ucs = AStar(self.grid), UCS(self.grid)
+        for _ in range(30):
+            penalties = {cell: rng.randint(1, 30) for cell in rng.sample(self.cells, 40)}
+            start, goal = rng.choice(self.cells), rng.choice(self.cells)
+            cheapest = ucs.cost_map(start, penalties)[goal]
+            for path in (astar.find_path(start, goal, penalties), ucs.find_path(start, goal, penalties)):
+                self.assertEqual((path[0], path[-1]), (start, goal))
+                self.assertEqual(sum(1 + penalties.get(cell, 0) for cell in path[1:]), cheapest)
+            self.assertEqual(cheapest, reference_costs(self.grid, {goal}, penalties)[start])
+        self.assertEqual(ucs.cost_map(start), BFS(self.grid).distance_map(start))
+
+    def test_detours_around_danger(self):
+        grid = Grid(self.write_map([
+            "#######",
+            "#P1...#",
+            "#.#.#.#",
+            "#....G#",
+            "#####F1",
+        ]))
+        # Danger on the direct route makes the loop through the bottom row cheaper
+        path = AStar(grid).find_path((1, 1), (5, 1), {(3, 1): 20, (4, 1): 10})
+        self.assertNotIn((3, 1), path)
+        self.assertEqual(len(path) - 1, 8)
+
+class TestDStarLite(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.grid = Grid(self.write_map(maze_lines(12, seed=4)))
+        self.cells = [(x, y) for y in range(self.grid.height) for x in range(self.grid.width)
+                      if self.grid.is_valid((x, y))]
+
+    def test_repairs_match_full_search(self):
+        rng = random.Random(5)
+        planner = DStarLite(self.grid)
+        start, goals = (1, 1), set(rng.sample(self.cells, 6))
+        planner.reset(start, goals)
+        for _ in range(60):
+            # Walk one step, move the penalties and occasionally eat or drop a goal
+            start = rng.choice(self.grid.get_neighbors(start))
+            penalties = {cell: rng.randint(1, 10) for cell in rng.sample(self.cells, 5)}
+            if rng.random() < 0.3 and len(goals) > 1:
+                goals = goals - {rng.choice(sorted(goals))}
+            if rng.random() < 0.2:
+                goals = goals | {rng.choice(self.cells)}
+            planner.move_start(start)
+            planner.set_goals(goals)
+            planner.set_penalties(penalties)
+            planner.compute()
+            expected = reference_costs(self.grid, goals, penalties)[start]
+            self.assertEqual(planner.path_cost(), expected)
+            path = planner.extract_path()
+            self.assertIn(path[-1], goals)
+            self.assertEqual(sum(1 + penalties.get(cell, 0) for cell in path[1:]), expected)
+
+    def test_small_changes_expand_few_cells(self):
+        goal = (self.grid.width - 2, self.grid.height - 2)
+        planner = DStarLite(self.grid)
+        planner.reset((1, 1), {goal})
+        planner.compute()
+        initial, path = planner.nodes_expanded, planner.extract_path()
+        planner.move_start(path[1])
+        planner.compute()
+        self.assertEqual(planner.nodes_expanded, 0)  # Walking the plan needs no repair
+
+        # A ghost showing up beside the path only repairs the cells it affects
+        repairs = []
+        for cell in self.cells[::7]:
+            if cell in path:
+                continue
+            planner.reset((1, 1), {goal})
+            planner.compute()
+            planner.move_start(path[1])
+            planner.set_penalties({cell: 10})
+            planner.compute()
+            self.assertEqual(planner.path_cost(), len(path) - 2)
+            repairs.append(planner.nodes_expanded)
+        self.assertLess(sum(repairs) / len(repairs) * 3, initial)
+
+    def test_eaten_goal_leads_to_next_goal(self):
+        planner = DStarLite(self.grid)
+        near, far = self.cells[5], self.cells[-5]
+        planner.reset((1, 1), {near, far})
+        planner.compute()
+        self.assertEqual(planner.extract_path()[-1], near)
+        planner.move_start(near)
+        planner.set_goals({far})
+        planner.compute()
+        self.assertEqual(planner.extract_path()[-1], far)
+        self.assertEqual(planner.path_cost(), BFS(self.grid).distance_map(near)[far])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# tests/test_decision_cache.py
+import os
+import random
+import subprocess
+import sys
+import unittest
+from config import settings
+from logic.game import Game
+from agents import decision_cache
+from agents.decision_cache import DecisionBook, DecisionCache
+from tests.random_maps import DUEL, TempMapTestCase, quiet
+
+class TestDecisionCache(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.map_path = self.write_map(DUEL)
+        self.book_path = os.path.join(self.tmp.name, "map.book")
+        self.saved = (settings.DISPLAY_BACKEND, settings.DECISION_CACHE_SIZE, settings.DECISION_CACHE_PATH,
+                      settings.DECISION_BOOK_SHM)
+        settings.DISPLAY_BACKEND = "null"
+        decision_cache._caches.clear()
+
+    def tearDown(self):
+        (settings.DISPLAY_BACKEND, settings.DECISION_CACHE_SIZE, settings.DECISION_CACHE_PATH,
+         settings.DECISION_BOOK_SHM) = self.saved
+        decision_cache._caches.clear()
+
+    def play(self, seeds):
+        results = []
+        for seed in seeds:
+            random.seed(seed)
+            with quiet():
+                game = Game(self.map_path)
+                game.run()
+            results.append((game.game_result, game.move_count,
+                            [(s.traditional, s["intelligence"]) for s in game.scores.values()]))
+        return results, game.decision_cache
+
+    def test_cached_games_replay_uncached_games(self):
+        settings.DECISION_CACHE_SIZE = 0
+        uncached, cache = self.play(range(6))
+        self.assertIsNone(cache)
+        settings.DECISION_CACHE_SIZE = 10000
+        cold, cache = self.play(range(6))
+        entries, hits = len(cache.entries), cache.hits
+        warm, cache = self.play(range(6))
+        self.assertEqual(cold, uncached)
+        self.assertEqual(warm, uncached)
+        # Replays hit for every cacheable decision, only random ones are recomputed
+        self.assertEqual(len(cache.entries), entries)
+        self.assertGreater(cache.hits - hits, entries // 2)
+        self.assertGreater(cache.stats()["hit_rate"], 0.3)
+
+    def test_entries_are_bounded(self):
+        cache = DecisionCache(self.map_path, "test", max_entries=3)
+        for key in range(5):
+            cache.store(key, ((0, 1), 1, 1, 0, 1.0, ()))
+        cache.lookup(2)
+        cache.store(5, ((0, 1), 1, 1, 0, 1.0, ()))
+        self.assertEqual(list(cache.entries), [4, 2, 5])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_book_persists_and_is_shared(self):
+        settings.DECISION_CACHE_SIZE, settings.DECISION_CACHE_PATH = 10000, self.book_path
+        first, cache = self.play(range(3))
+        self.assertTrue(os.path.exists(self.book_path))
+        entries = len(cache.entries)
+
+        decision_cache._caches.clear()  # A new run of the program
+        replay, cache = self.play(range(3))
+        self.assertEqual(replay, first)
+        self.assertEqual(len(cache.book), entries)
+        self.assertEqual(len(cache.entries), 0)  # Every cacheable decision came from the book
+        self.assertGreater(cache.book_hits, entries // 2)
+        self.assertEqual(cache.book_hits, cache.hits)
+
+        # Worker processes attach to one read-only copy in shared memory
+        block = cache.share()
+        try:
+            script = ("import sys; from agents.decision_cache import DecisionBook; "
+                      "book = DecisionBook.attach(sys.argv[1]); key = int(sys.argv[2]); "
+                      "print(len(book), *book.get(key)[0]); book.close()")
+            key, decision = next(cache.book.items())
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            output = subprocess.run([sys.executable, "-c", script, block.name, str(key)], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout
+            self.assertEqual(output.split(), [str(entries), *map(str, decision[0])])
+        finally:
+            block.close()
+            block.unlink()
+
+        # Books of another agent configuration are ignored
+        with quiet():
+            other = DecisionCache(self.map_path, "route:weighted:2:10", book=DecisionBook.load(self.book_path))
+        self.assertIsNone(other.book)
+
+if __name__ == '__main__':
+    unittest.main()
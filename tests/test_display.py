@@ -0,0 +1,329 @@
+# tests/test_display.py
+import os
+import random
+import subprocess
+import sys
+import unittest
+import pygame
+from config import settings
+from logic.game import Game
+from visualization import assets
+from visualization.animation import ALPHA_STEP, GlyphCache, PopupPool
+from visualization.assets import SpriteAtlas, draw_sprite
+from visualization.display_factory import create_display
+from visualization.viewport import Camera
+from tests.random_maps import SOLO, TempMapTestCase, quiet
+
+try:
+    import PIL
+except ImportError:
+    PIL = None
+
+CORRIDOR = ["#######", "#P1.GF1#", "#######"]
+
+class TestDisplayBackends(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.map_path = self.write_map(SOLO)
+        self.saved = settings.DISPLAY_BACKEND, settings.FRAME_EXPORT_FORMAT, settings.FRAME_EXPORT_PATH
+
+    def tearDown(self):
+        settings.DISPLAY_BACKEND, settings.FRAME_EXPORT_FORMAT, settings.FRAME_EXPORT_PATH = self.saved
+
+    def record(self, fmt):
+        settings.DISPLAY_BACKEND, settings.FRAME_EXPORT_FORMAT = "frames", fmt
+        settings.FRAME_EXPORT_PATH = os.path.join(self.tmp.name, "recording")
+        random.seed(2)
+        with quiet():
+            game = Game(self.map_path)
+            encoder = game.display.encoder
+            game.run()  # Headless: returns once the game is over
+        self.assertTrue(game.game_over)
+        return game, encoder
+
+    def test_headless_game_does_not_load_pygame(self):
+        script = ("import sys; from config import settings; settings.DISPLAY_BACKEND = 'null'; "
+                  "from logic.game import Game; game = Game(sys.argv[1]); game.run(); "
+                  "print(game.game_over, 'pygame' in sys.modules)")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", script, self.map_path], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip().splitlines()[-1], "True False")
+
+    def test_frames_exported_as_arrays(self):
+        game, encoder = self.record("array")
+        self.assertEqual(encoder.written, game.move_count + 1)  # One frame per tick plus the game over screen
+        first, last = encoder.frames[0], encoder.frames[-1]
+        self.assertEqual(first.shape, (game.display.height, game.display.width, 3))
+        self.assertGreater(int(first.std()), 0)
+        self.assertFalse((first == last).all())
+
+    def test_frames_exported_as_png(self):
+        game, encoder = self.record("png")
+        files = sorted(os.listdir(encoder.path))
+        self.assertEqual(len(files), game.move_count + 1)
+        image = pygame.image.load(os.path.join(encoder.path, files[0]))
+        self.assertEqual(image.get_size(), (game.display.width, game.display.height))
+
+    @unittest.skipUnless(PIL, "GIF export needs Pillow")
+    def test_frames_exported_as_gif(self):
+        from PIL import Image
+        game, encoder = self.record("gif")
+        with Image.open(encoder.path) as gif:
+            self.assertEqual(gif.n_frames, game.move_count + 1)
+
+    def test_close_leaves_pygame_as_it_found_it(self):
+        driver = os.environ.pop("SDL_VIDEODRIVER", None)
+        if driver is not None:
+            self.addCleanup(os.environ.__setitem__, "SDL_VIDEODRIVER", driver)
+        settings.FRAME_EXPORT_FORMAT = "array"
+        settings.FRAME_EXPORT_PATH = os.path.join(self.tmp.name, "recording")
+        with quiet():
+            display = create_display(self.load_grid(CORRIDOR), {"F1": (255, 255, 0)}, {}, {}, backend="frames")
+        self.assertEqual(os.environ.get("SDL_VIDEODRIVER"), "dummy")
+        display.encoder.close()
+
+        def fail():
+            raise OSError("disk full")
+        display.encoder.close = fail  # A failing encoder still shuts pygame down
+        with self.assertRaises(OSError):
+            display.close()
+        self.assertFalse(pygame.get_init())
+        self.assertNotIn("SDL_VIDEODRIVER", os.environ)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_display(None, {}, {}, {}, backend="hologram")
+
+class TestViewport(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(5)
+        rows = [["#"] * 120] + [["#"] + ["#" if rng.random() < 0.2 else "." for _ in range(118)] + ["#"]
+                                for _ in range(78)] + [["#"] * 120]
+        rows[40][60:62], rows[70][100:102], rows[41][60] = ["P", "1"], ["F", "1"], "G"
+        self.grid = self.load_grid(["".join(row) for row in rows], "big")
+        self.saved = settings.FRAME_EXPORT_FORMAT, settings.FRAME_EXPORT_PATH
+        settings.FRAME_EXPORT_FORMAT = "array"
+        settings.FRAME_EXPORT_PATH = os.path.join(self.tmp.name, "recording")
+        self.display = create_display(self.grid, {"F1": (255, 255, 0)}, {}, {}, backend="frames")
+
+    def tearDown(self):
+        self.display.encoder.close()
+        settings.FRAME_EXPORT_FORMAT, settings.FRAME_EXPORT_PATH = self.saved
+
+    def render(self):
+        self.display.render([((60, 40), (255, 255, 0))], [(60, 41)], {})
+
+    def test_camera_clamps_and_centers(self):
+        camera = Camera(100, 50, 320, 160, 32)
+        self.assertTrue(camera.scrolls)
+        camera.center_on((0, 0))
+        self.assertEqual((camera.x, camera.y), (0, 0))
+        camera.center_on((99, 49))
+        self.assertEqual((camera.x, camera.y), (100 * 32 - 320, 50 * 32 - 160))
+        self.assertEqual(camera.visible_cells(), (90, 45, 100, 50))
+        camera.center_on((20, 10))
+        self.assertEqual(camera.visible_cells(), (15, 8, 26, 13))  # Partly visible cells included
+        camera.zoom(2)  # The whole map fits: centered, nothing scrolls
+        self.assertFalse(camera.scrolls)
+        self.assertEqual((camera.x, camera.y), (-60, -30))
+        self.assertEqual(camera.visible_cells(), (0, 0, 100, 50))
+        self.assertEqual(camera.to_view(0, 0), (-camera.x, -camera.y))
+
+    def test_only_visible_chunks_are_drawn(self):
+        display = self.display
+        self.assertLessEqual(display.view_width, settings.VIEW_MAX_WIDTH)
+        self.assertLessEqual(display.view_height, settings.VIEW_MAX_HEIGHT)
+        self.render()
+        self.assertTrue(display.camera.is_visible((60, 40)))  # Following the Pacman
+        x0, y0, x1, y1 = display.camera.visible_cells()
+        cells = settings.VIEW_CHUNK_CELLS
+        in_view = (-(-x1 // cells) - x0 // cells) * (-(-y1 // cells) - y0 // cells)
+        self.assertEqual(display.chunks.built, in_view)
+        self.render()
+        self.assertEqual(display.chunks.built, in_view)  # Cached
+
+        display.follow = None
+        for _ in range(40):
+            display.handle_camera_key(pygame.K_RIGHT)
+            self.render()
+        self.assertEqual(display.camera.x, 120 * display.cell_size - display.view_width)
+        self.assertLessEqual(len(display.chunks.chunks), settings.VIEW_CHUNK_CACHE)
+
+    def test_food_changes_update_cached_layers(self):
+        display = self.display
+        self.render()
+        food = next(pos for pos in self.grid.food_positions if display.camera.is_visible(pos))
+        self.grid.food_positions.remove(food)
+        self.render()
+        cells = settings.VIEW_CHUNK_CELLS
+        key = (food[0] // cells, food[1] // cells)
+        patched = pygame.image.tobytes(display.chunks.chunks[key], "RGB")
+        minimap = pygame.image.tobytes(display.minimap.surface, "RGB")
+        display.chunks.invalidate()
+        display.minimap.refresh()
+        self.assertEqual(pygame.image.tobytes(display.chunks.get(*key), "RGB"), patched)
+        self.assertEqual(pygame.image.tobytes(display.minimap.surface, "RGB"), minimap)
+
+    def test_zoom_steps_through_levels(self):
+        display = self.display
+        display.zoom(-1)
+        self.assertEqual(display.cell_size, 24)
+        self.render()
+        self.assertTrue(all(chunk.get_width() == 24 * settings.VIEW_CHUNK_CELLS
+                            for chunk in display.chunks.chunks.values()))
+        display.zoom(-10)
+        self.assertEqual(display.cell_size, min(settings.ZOOM_LEVELS))
+
+
+class TestAssets(TempMapTestCase):
+    COLORS = [(255, 255, 0), (0, 255, 0)]
+
+    def setUp(self):
+        super().setUp()
+        pygame.init()
+        self.cache = settings.ASSET_CACHE_DIR
+
+    def drawn(self, draw, size):
+        """Pixels of a cell drawn by draw(surface, x, y) with room around it"""
+        surface = pygame.Surface((size * 3, size * 3))
+        surface.fill((0, 0, 40))
+        draw(surface, size, size)
+        return pygame.image.tobytes(surface, "RGB")
+
+    def assert_same_sprites(self, atlas):
+        size = atlas.cell_size
+        for shape, color in atlas.keys:
+            self.assertEqual(self.drawn(lambda s, x, y: atlas.blit(s, shape, color, x, y), size),
+                             self.drawn(lambda s, x, y: draw_sprite(s, shape, color, pygame.Rect(x, y, size, size)),
+                                        size), (shape, color, size))
+
+    def test_atlas_matches_sprites_drawn_in_place(self):
+        for size in (12, 32):
+            atlas = SpriteAtlas(size, self.COLORS, self.cache)
+            self.assertFalse(atlas.loaded)
+            self.assert_same_sprites(atlas)
+            # The next launch loads the saved atlas instead of drawing it
+            again = SpriteAtlas(size, self.COLORS, self.cache)
+            self.assertTrue(again.loaded)
+            self.assert_same_sprites(again)
+        self.assertFalse(SpriteAtlas(32, self.COLORS[:1], self.cache).loaded)  # Other colors, other atlas
+
+    def test_default_cache_is_in_the_project(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", "from config import settings; print(settings.ASSET_CACHE_DIR)"],
+                                cwd=self.tmp.name, env={**os.environ, "PYTHONPATH": root},
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), os.path.join(root, "data", "cache"))  # Not under the working directory
+
+    def test_font_lookup_is_cached(self):
+        calls = []
+        match_font = pygame.font.match_font
+
+        def counted(name, *args, **kwargs):
+            calls.append(name)
+            return match_font(name, *args, **kwargs)
+        saved = dict(assets._font_paths)
+        pygame.font.match_font = counted
+        try:
+            assets._font_paths.clear()
+            first = assets.font_path("Arial", self.cache)
+            assets._font_paths.clear()  # A new launch only has the cache file
+            self.assertEqual(assets.font_path("Arial", self.cache), first)
+        finally:
+            pygame.font.match_font = match_font
+            assets._font_paths.clear()
+            assets._font_paths.update(saved)
+        self.assertEqual(calls, ["Arial"])
+
+    def test_help_is_rendered_when_first_shown(self):
+        saved = settings.FRAME_EXPORT_FORMAT, settings.FRAME_EXPORT_PATH
+        settings.FRAME_EXPORT_FORMAT = "array"
+        settings.FRAME_EXPORT_PATH = os.path.join(self.tmp.name, "recording")
+        try:
+            with quiet():
+                display = create_display(self.load_grid(CORRIDOR), {"F1": (255, 255, 0)}, {}, {}, backend="frames")
+            self.assertIsNone(display.help_surface)
+            display.show_help = True
+            display.render([((1, 1), (255, 255, 0))], [(4, 1)], {})
+            self.assertIsNotNone(display.help_surface)
+            self.assertLessEqual(display.help_surface.get_height(), display.height - 40)
+            self.assertLessEqual(display.help_surface.get_width(), display.width)
+            display.encoder.close()
+        finally:
+            settings.FRAME_EXPORT_FORMAT, settings.FRAME_EXPORT_PATH = saved
+
+
+class TestPopups(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        pygame.init()
+        self.glyphs = GlyphCache(pygame.font.Font(None, 18))
+        self.bounds = pygame.Rect(0, 0, 320, 320)
+
+    def frame(self, pool, now):
+        surface = pygame.Surface((320, 320))
+        pool.draw(surface, now, (0, 0), 32, self.bounds)
+        return pygame.image.tobytes(surface, "RGB")
+
+    def test_animation_follows_time_not_frames(self):
+        pool = PopupPool(self.glyphs, 16, 4.0, 64)
+        pool.add("+10 Food", (255, 255, 0), 4, 6, 0.0)
+        at_once = self.frame(pool, 1.5)
+        pool.add("+10 Food", (255, 255, 0), 4, 6, 0.0)  # The same popup drawn at many frames on the way
+        pool._drop(1)
+        for step in range(15):
+            self.frame(pool, step * 0.1)
+        self.assertEqual(self.frame(pool, 1.5), at_once)
+        self.assertNotEqual(self.frame(pool, 3.0), at_once)  # Risen and faded further
+        self.frame(pool, 4.01)
+        self.assertEqual(len(pool), 0)
+
+    def test_pool_keeps_newest_and_shares_glyphs(self):
+        pool = PopupPool(self.glyphs, 100, 4.0, 64)
+        for i in range(250):
+            pool.add("+10 Food" if i % 2 else "+100 Flag", (255, 255, 0), i % 10, i // 10 % 10, i * 0.01)
+        self.assertEqual(len(pool), 100)
+        self.assertEqual(pool.start[pool.slots()[0]], 1.5)  # The 150 oldest gave way
+        self.assertEqual(len(self.glyphs.levels), 2)
+        pool.expire(1.5 + 4.0 + 0.495)
+        self.assertEqual(len(pool), 50)  # Across the end of the ring
+        self.assertEqual(pool.start[pool.slots()].tolist(), [i * 0.01 for i in range(200, 250)])
+        # Fading draws copies, never the glyph every popup shares
+        alphas = [copy.get_alpha() for copy in self.glyphs.levels[0]]
+        self.frame(pool, 3.0)
+        self.assertEqual([copy.get_alpha() for copy in self.glyphs.levels[0]], alphas)
+
+    def test_culling_keeps_tall_glyphs_showing(self):
+        tall = pygame.Surface((4, 60))
+        tall.fill((255, 255, 255))
+        self.glyphs.ids[("tall", (255, 255, 255))] = len(self.glyphs.levels)
+        self.glyphs.levels.append([tall] * (256 // ALPHA_STEP))
+        self.glyphs.get("+10 Food", (255, 255, 0))  # Wider, but shorter
+        pool = PopupPool(self.glyphs, 4, 4.0, 0)
+        pool.add("tall", (255, 255, 255), 2, 0, 0.0)
+        surface = pygame.Surface((320, 320))
+        pool.draw(surface, 1.0, (0, -40), 32, self.bounds)  # Its top 40 pixels above the view
+        self.assertEqual(surface.get_at((65, 10))[:3], (255, 255, 255))
+
+    def test_recorded_popups_last_the_same_number_of_frames(self):
+        saved = settings.FRAME_EXPORT_FORMAT, settings.FRAME_EXPORT_PATH
+        settings.FRAME_EXPORT_FORMAT = "array"
+        settings.FRAME_EXPORT_PATH = os.path.join(self.tmp.name, "recording")
+        try:
+            with quiet():
+                display = create_display(self.load_grid(CORRIDOR), {"F1": (255, 255, 0)}, {}, {}, backend="frames")
+            display.add_score_popup("+10 Food", 2, 1)
+            frames = 0  # Frames the popup was drawn in, its last one at exactly POPUP_SECONDS
+            display.render([((1, 1), (255, 255, 0))], [(4, 1)], {})
+            while len(display.score_popups):
+                frames += 1
+                display.render([((1, 1), (255, 255, 0))], [(4, 1)], {})
+            self.assertEqual(frames, int(settings.POPUP_SECONDS * settings.FPS) + 1)
+            display.encoder.close()
+        finally:
+            settings.FRAME_EXPORT_FORMAT, settings.FRAME_EXPORT_PATH = saved
+
+if __name__ == '__main__':
+    unittest.main()
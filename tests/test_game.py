@@ -0,0 +1,246 @@
+# tests/test_game.py
+import random
+import time
+import unittest
+from config import settings
+from environment.grid import Grid
+from logic.game import Game
+from logic.scoring import ScoreCard, game_intelligence
+from logic.sim_clock import SimulationClock
+from tests.random_maps import DUEL, SOLO, TempMapTestCase, quiet, random_map
+
+class TestSimulationClock(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.map_path = self.write_map(SOLO)
+
+    def play(self, seed, delay):
+        random.seed(seed)
+        with quiet():
+            game = Game(self.map_path)
+            while not game.game_over and game.move_count < 60:
+                game.update()
+                time.sleep(delay)  # Stand-in for a slow frame rate
+            if not game.game_over:
+                game.end_game(victory=False)
+        return game, game.clock.wall_elapsed()
+
+    def test_scores_do_not_depend_on_frame_rate(self):
+        (fast, fast_wall), (slow, slow_wall) = self.play(3, 0), self.play(3, 0.01)
+        self.assertEqual(fast.move_count, slow.move_count)
+        self.assertEqual(fast.scores, slow.scores)
+        self.assertEqual(fast.clock.time, fast.move_count * fast.clock.seconds_per_tick)
+        self.assertGreater(slow_wall, fast_wall)  # Only wall time sees the slower frames
+
+class TestScoreCard(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        with quiet():
+            game = Game(self.write_map(["#######", "#P1..G#", "#....F1", "#######"]))
+        self.agent = game.pacman_agents[0]
+        self.agent.total_decisions, self.agent.good_decisions = 10, 8
+        self.agent.ghost_encounters, self.agent.total_path_efficiency = 2, 9.0
+        self.clock = SimulationClock(0.5)
+
+    def test_derived_scores_are_lazy_and_as_of_the_last_move(self):
+        calls = []
+        card = ScoreCard(self.agent, self.clock)
+        card.profile = lambda agent, sim_time: calls.append(sim_time) or game_intelligence(agent, sim_time)
+        for _ in range(40):
+            self.clock.tick()
+            card.moved()
+            card.traditional += 10
+        self.assertEqual(calls, [])  # Counters only on the hot path
+        self.assertEqual(card["traditional"], 400)
+        self.assertAlmostEqual(card["intelligence"], game_intelligence(self.agent, 20.0))
+        self.assertAlmostEqual(card["time"], (1 - 20.0 / 300) * 10)
+        self.assertAlmostEqual(card["path_eff"], 9.0)
+        card.copy()
+        self.assertEqual(calls, [20.0])  # Computed once for this tick
+
+        # Ticks without a successful move change nothing, even when the agent decided on them
+        expected = card["intelligence"]
+        self.clock.tick()
+        self.agent.total_decisions += 5
+        self.agent.ghost_encounters += 5
+        self.assertEqual(card["intelligence"], expected)
+        self.assertEqual(len(calls), 1)
+
+        card.finish()
+        self.assertAlmostEqual(card["intelligence"], expected - 20.5 / 60)
+        self.assertEqual(len(calls), 2)
+
+    def test_profiles(self):
+        card = ScoreCard(self.agent, self.clock, profile="agent")
+        self.clock.tick()
+        card.moved()
+        self.assertAlmostEqual(card["intelligence"], self.agent.get_intelligence_score())
+        self.assertAlmostEqual(card["intelligence"], (0.8 * 0.5 + 0.8 * 0.3 + 0.9 * 0.2) * 10)
+        with self.assertRaises(ValueError):
+            ScoreCard(self.agent, self.clock, profile="unknown")
+
+class RuleModel:
+    """The movement, food, flag and collision rules of Game.update over plain sets"""
+
+    def __init__(self, rows, pacmen, ghosts, flags):
+        cells = [((x, y), c) for y, row in enumerate(rows) for x, c in enumerate(row)]
+        self.open = {pos for pos, c in cells if c != '#'}
+        self.food = {pos for pos, c in cells if c == '.'}
+        self.flags = {flag_id: (x, y) for x, y, flag_id in flags}
+        self.pacmen, self.ghosts = list(pacmen), list(ghosts)
+        self.safe_pacmen, self.safe_ghosts = set(), set()
+        self.scores = {flag_id: [0, 0, 0] for flag_id in self.flags}  # Points, food, flags
+        self.result = ""
+
+    def step(self, ghost_actions, pacman_actions):
+        for i, (pos, (dx, dy)) in enumerate(zip(self.ghosts, ghost_actions)):
+            new = (pos[0] + dx, pos[1] + dy)
+            if new in self.open:
+                self.ghosts[i] = new
+                if new in self.flags.values():
+                    self.safe_ghosts.add(i)
+        for i, (pos, (dx, dy)) in enumerate(zip(self.pacmen, pacman_actions)):
+            flag_id = f"F{i + 1}"
+            safe = flag_id in self.safe_pacmen
+            new = (pos[0] + dx * (2 if safe else 1), pos[1] + dy * (2 if safe else 1))
+            if new not in self.open:
+                continue
+            self.pacmen[i] = new
+            if safe:
+                continue
+            score = self.scores[flag_id]
+            if new in self.food:
+                self.food.remove(new)
+                score[0] += 10
+                score[1] += 1
+            if not self.food and new == self.flags[flag_id]:
+                score[0] += 100
+                score[2] += 1
+                self.safe_pacmen.add(flag_id)
+        for i, pos in enumerate(self.pacmen):
+            # The first ghost on the cell decides, a protected one is harmless
+            if pos in self.ghosts and f"F{i + 1}" not in self.safe_pacmen and self.ghosts.index(pos) not in self.safe_ghosts:
+                self.result = "GAME OVER!"
+                return
+        if len(self.safe_pacmen) == len(self.pacmen):
+            self.result = "VICTORY!"
+
+
+class TestGameReference(TempMapTestCase):
+    """Game.update replayed move for move on RuleModel, with the actions its agents chose"""
+
+    def setUp(self):
+        super().setUp()
+        self.saved = (settings.DISPLAY_BACKEND, settings.GHOST_POLICIES)
+        settings.DISPLAY_BACKEND = "null"
+
+    def tearDown(self):
+        settings.DISPLAY_BACKEND, settings.GHOST_POLICIES = self.saved
+
+    def record(self, agents, log):
+        """Make every agent append the action it chooses to log"""
+        for agent in agents:
+            def recorded(position, choose=agent.choose_action):
+                action = choose(position)
+                log.append(action)
+                return action
+            agent.choose_action = recorded
+
+    def test_collisions_and_scores_follow_the_rules(self):
+        results, protected_ghosts = set(), 0
+        for seed in range(12):
+            rows = random_map(10 + seed % 4 * 3, 7 + seed % 3, seed, agents=1 + seed % 2, wall_density=0.15)
+            if seed % 4 == 3:  # A ghost beside the flag, which it protects itself by stepping on
+                rows = [row.replace("G", ".", 1) for row in rows]
+                rows[-2] = rows[-2][:-4] + "G" + rows[-2][-3:]
+            settings.GHOST_POLICIES = [["random"], ["chase"], ["random", "ambush"]][seed % 3]
+            random.seed(seed)
+            with quiet():
+                game = Game(self.write_map(rows, f"random{seed}"))
+            model = RuleModel(rows, game.pacman_positions, game.ghost_positions, game.grid.get_flag_positions())
+            ghost_actions, pacman_actions = [], []
+            self.record(game.ghost_agents, ghost_actions)
+            self.record(game.pacman_agents, pacman_actions)
+            while not game.game_over and game.move_count < 150:
+                del ghost_actions[:], pacman_actions[:]
+                with quiet():
+                    game.update()
+                model.step(ghost_actions, pacman_actions)
+                state = (seed, game.move_count)
+                self.assertEqual(game.ghost_positions, model.ghosts, state)
+                self.assertEqual(game.pacman_positions, model.pacmen, state)
+                self.assertEqual(set(game.grid.food_positions), model.food, state)
+                self.assertEqual({flag_id: [score.traditional, score.food_collected, score.flags_reached]
+                                  for flag_id, score in game.scores.items()}, model.scores, state)
+                self.assertEqual(game.game_result, model.result, state)
+            results.add(game.game_result)
+            protected_ghosts += len(game.protected_ghosts)
+        self.assertLessEqual({"VICTORY!", "GAME OVER!"}, results)  # Both endings were checked
+        self.assertGreater(protected_ghosts, 0)
+
+    def test_protected_ghost_is_harmless(self):
+        rows = ["########", "#P1G.F1#", "########"]
+        path = self.write_map(rows, "corridor")
+        for protected, result in [(False, "GAME OVER!"), (True, "VICTORY!")]:
+            with quiet():
+                game = Game(path)
+            game.ghost_agents[0].choose_action = lambda position: (0, 0)  # The ghost waits,
+            game.pacman_agents[0].choose_action = lambda position: (1, 0)  # Pacman walks into it
+            model = RuleModel(rows, game.pacman_positions, game.ghost_positions, game.grid.get_flag_positions())
+            if protected:
+                game.protected_ghosts.add(0)
+                model.safe_ghosts.add(0)
+            while not game.game_over:
+                with quiet():
+                    game.update()
+                model.step([(0, 0)], [(1, 0)])
+                self.assertEqual((game.pacman_positions, game.game_result), (model.pacmen, model.result))
+            self.assertEqual(game.game_result, result)
+
+
+class TestReset(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.map_path = self.write_map(DUEL)
+        self.saved = (settings.DISPLAY_BACKEND, settings.PACMAN_STRATEGY, settings.PATH_SEARCH)
+        settings.DISPLAY_BACKEND = "null"
+
+    def tearDown(self):
+        settings.DISPLAY_BACKEND, settings.PACMAN_STRATEGY, settings.PATH_SEARCH = self.saved
+
+    def play(self, game, seed):
+        random.seed(seed)
+        with quiet():
+            while not game.game_over and game.move_count < 200:
+                game.update()
+        return (game.game_result, game.move_count, game.pacman_positions, game.ghost_positions,
+                [score.copy() for score in game.scores.values()])
+
+    def test_reset_replays_fresh_games_in_place(self):
+        for strategy, search in [("greedy", "shortest"), ("route", "weighted"), ("incremental", "shortest")]:
+            settings.PACMAN_STRATEGY, settings.PATH_SEARCH = strategy, search
+            with quiet():
+                game = Game(self.map_path)
+            grid, display, agents = game.grid, game.display, list(game.pacman_agents)
+            masks, graph = grid._move_masks, grid.get_corridor_graph()
+            for seed in range(4):
+                with quiet():
+                    fresh = Game(self.map_path)
+                expected = self.play(fresh, seed)
+                if seed:
+                    game.reset()
+                self.assertEqual(self.play(game, seed), expected, (strategy, seed))
+            # The restart kept everything built from the static map
+            self.assertIs(game.grid, grid)
+            self.assertIs(game.display, display)
+            self.assertEqual(game.pacman_agents, agents)
+            self.assertIs(grid._move_masks, masks)
+            self.assertIs(grid.get_corridor_graph(), graph)
+            game.reset()
+            with quiet():
+                loaded = Grid(self.map_path)
+            self.assertEqual(bytes(grid.cells), bytes(loaded.cells))
+            self.assertEqual([e.food for e in graph.edges], [e.food for e in loaded.get_corridor_graph().edges])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# tests/test_game_server.py
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from logic.game_server import GameServer, StubClient
+from tests.random_maps import DUEL, SOLO, write_map
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        write_map(self.tmp.name, "duel", DUEL)
+        write_map(self.tmp.name, "solo", SOLO)
+        self.path = os.path.join(self.tmp.name, "server.sock")
+        self.server = GameServer(self.tmp.name, deadline_ms=2000, max_ticks=100, max_sessions=64)
+        self.listener = await self.server.start(path=self.path)
+
+    async def asyncTearDown(self):
+        self.listener.close()
+        self.server.close()
+        await self.listener.wait_closed()
+        self.tmp.cleanup()
+
+    async def play(self, seed: int):
+        client = StubClient(seed=seed)
+        await client.connect(path=self.path)
+        await client.join("duel" if seed % 2 else "solo")
+        result = await client.play()
+        game = self.server.sessions[client.session].game
+        # The deltas rebuilt the server's state exactly
+        self.assertEqual(client.tick, game.move_count)
+        self.assertEqual(client.pacmen, game.pacman_positions)
+        self.assertEqual(client.ghosts, game.ghost_positions)
+        self.assertEqual(client.food, set(game.grid.get_food_positions()))
+        self.assertEqual(client.scores, [game.scores[agent.flag_id].traditional for agent in game.pacman_agents])
+        return client, game, result
+
+    async def test_concurrent_sessions_track_their_games(self):
+        results = await asyncio.gather(*(self.play(seed) for seed in range(16)))
+        self.assertEqual(len(self.server.sessions), 16)
+        for client, game, result in results:
+            self.assertIn(result, ("VICTORY", "GAME_OVER", "LIMIT"))
+            stats = self.server.sessions[client.session].stats
+            self.assertEqual(stats.ticks, game.move_count)
+            self.assertEqual((stats.misses, stats.invalid, stats.late), (0, 0, 0))
+            self.assertEqual(stats.response.decisions, game.move_count)
+
+        # Joining the same map again restarts the game in place
+        client, game, _ = results[1]
+        await client.join("duel")
+        self.assertEqual(client.tick, 0)
+        self.assertEqual(len(client.food), len(game.grid.get_food_positions()))
+        await client.play()
+        self.assertIs(self.server.sessions[client.session].game, game)
+        self.assertEqual(self.server.sessions[client.session].stats.games, 2)
+
+        for client, _, _ in results:
+            await client.close()
+        for _ in range(100):
+            if not self.server.sessions:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(len(self.server.stats()), 16)  # Closed sessions keep their counters
+
+    async def test_deadlines_and_protocol_errors(self):
+        self.server.deadline_ms = 30
+        reader, writer = await asyncio.open_unix_connection(self.path)
+
+        async def lines_until(prefix):
+            while True:
+                line = (await reader.readline()).decode().rstrip("\n")
+                if line.startswith(prefix):
+                    return line
+
+        writer.write(b"JOIN nowhere\n")
+        self.assertIn("unknown map", await lines_until("ERR"))
+        writer.write(b"JOIN solo\n")
+        self.assertTrue((await lines_until("WELCOME")).endswith(" 1 1 30"))
+        self.assertEqual((await lines_until("TICK")).split()[:4], ["TICK", "0", "P0:1,1", "G0:8,1"])
+        # No answer in time: Pacman stays, only the ghost may have moved
+        tick = (await lines_until("TICK")).split()
+        self.assertEqual(tick[1], "1")
+        self.assertFalse(any(change.startswith("P") for change in tick[2:]))
+        writer.write(b"ACT 0 R\nACT 1 RR\nACT 1 R\n")  # Late, wrong Pacman count, then valid
+        self.assertIn("expected ACT 1", await lines_until("ERR"))
+        self.assertIn("P0:2,1", (await lines_until("TICK")).split())
+        writer.write(b"QUIT\n")
+        await writer.drain()
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+
+        stats = list(self.server.stats().values())[0]
+        self.assertEqual((stats["misses"], stats["late"], stats["invalid"], stats["ticks"]), (1, 1, 2, 2))
+
+    async def test_full_server_refuses_connections(self):
+        self.server.max_sessions = 1
+        first = StubClient()
+        await first.connect(path=self.path)
+        await first.join("solo")
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        self.assertEqual(await reader.readline(), b"ERR server full\n")
+        writer.close()
+        await first.close()
+
+    async def test_default_maps_are_the_projects(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = "from logic.game_server import GameServer; print(*sorted(GameServer().maps))"
+        output = subprocess.run([sys.executable, "-c", script], cwd=self.tmp.name,
+                                env={**os.environ, "PYTHONPATH": root}, capture_output=True, text=True,
+                                check=True).stdout
+        maps = sorted(name[:-4] for name in os.listdir(os.path.join(root, "data", "maps")) if name.endswith(".txt"))
+        self.assertEqual(output.split(), maps)  # Found from any working directory
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,392 @@
+# tests/test_grid.py
+import gc
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tracemalloc
+import unittest
+from collections import deque
+from config import settings
+from agents.pacman_agent import PacmanAgent
+from environment.grid import Grid
+from environment.influence_map import InfluenceMap
+from environment.corridor_graph import CorridorGraph
+from environment.ghost_forecast import GhostForecast
+from environment.map_analysis import analyze_map, artifact_path
+from environment.shared_grid import SharedGrid
+from algorithms.bfs import BFS
+from algorithms.route_planner import RoutePlanner
+from tests.random_maps import SOLO, TempMapTestCase, random_map
+
+class TestGrid(TempMapTestCase):
+    def test_parses_tokens_in_character_coordinates(self):
+        grid = Grid(self.write_map([
+            "#####",
+            "#P1.G#",
+            "#.#F1",
+        ]))
+        self.assertEqual((grid.width, grid.height), (6, 3))
+        self.assertEqual(grid.get_start_positions(), [(1, 1)])
+        self.assertEqual(grid.get_ghost_positions(), [(4, 1)])
+        self.assertEqual(grid.get_flag_positions(), [(3, 2, 'F1')])
+        self.assertEqual(list(grid.get_food_positions()), [(3, 1), (1, 2)])
+        self.assertEqual(list(grid.walls)[:5], [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)])
+        self.assertTrue(grid.is_wall((2, 2)))
+        self.assertTrue(grid.is_valid((5, 0)))  # Short rows are padded with empty cells
+        self.assertFalse(grid.is_valid((-1, 1)) or grid.is_valid((6, 1)) or grid.is_valid((5, 1)))
+        self.assertEqual(grid.get_legal_actions((1, 1)), ['RIGHT', 'DOWN'])
+
+    def test_food_view_and_legacy_grid(self):
+        grid = Grid(self.write_map(["P1..", "#.F1", "G..."]))
+        food = grid.get_food_positions()
+        self.assertEqual(len(food), 6)
+        self.assertTrue(grid.update_position((0, 0), (2, 0), 'P'))
+        self.assertNotIn((2, 0), food)
+        self.assertEqual(len(food), 5)
+        self.assertEqual(''.join(grid.get_grid()[0]), '  P ')
+        self.assertEqual(''.join(grid.get_grid()[1]), '#   ')
+        self.assertFalse(grid.update_position((2, 0), (0, 1), 'P'))
+        grid.reset()
+        self.assertEqual(len(grid.get_food_positions()), 6)
+        self.assertEqual(''.join(grid.get_grid()[0]), '    ')
+
+    def test_large_map_memory(self):
+        size = 300
+        rng = random.Random(7)
+        rows = ["#" * size] + ["#" + "".join(rng.choice("#. ..") for _ in range(size - 2)) + "#" for _ in range(size - 2)] + ["#" * size]
+        rows[1] = "#P1G" + rows[1][4:-3] + "F1#"
+        path = self.write_map(rows)
+
+        gc.collect()
+        tracemalloc.start()
+        grid = Grid(path)
+        gc.collect()
+        compact = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # The legacy layout: a list of 1-char strings per row plus position tuple lists
+        gc.collect()
+        tracemalloc.start()
+        legacy = [[c if c == '#' else ' ' for c in row] for row in rows]
+        legacy_walls = [(x, y) for y, row in enumerate(rows) for x, c in enumerate(row) if c == '#']
+        legacy_food = [(x, y) for y, row in enumerate(rows) for x, c in enumerate(row) if c == '.']
+        gc.collect()
+        legacy_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.assertEqual(len(grid.walls), len(legacy_walls))
+        self.assertEqual(len(grid.food_positions), len(legacy_food))
+        self.assertLess(compact, size * size * 3)
+        self.assertGreaterEqual(legacy_size / compact, 10)
+
+class TestGridReference(TempMapTestCase):
+    """Grid's packed cell plane and move tables against a reading of the map text"""
+
+    def test_random_maps_match_text(self):
+        for seed, (width, height, density) in enumerate([(7, 5, 0.2), (23, 11, 0.35), (40, 33, 0.5)]):
+            rows = random_map(width, height, seed, agents=1 + seed % 2, wall_density=density)
+            rows[2] = rows[2][:width - 2 - seed]  # Short rows: the missing cells are open
+            grid = self.load_grid(rows, f"random{seed}")
+
+            def is_open(x, y):
+                return 0 <= y < len(rows) and 0 <= x < width and (x >= len(rows[y]) or rows[y][x] != '#')
+
+            for y in range(-1, height + 1):
+                for x in range(-1, width + 1):
+                    self.assertEqual(grid.is_valid((x, y)), is_open(x, y), (x, y))
+                    if is_open(x, y):
+                        expected = [(dx, dy) for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)] if is_open(x + dx, y + dy)]
+                        self.assertEqual(grid.get_valid_actions((x, y)), expected, (x, y))
+            self.assertEqual(list(grid.food_positions),
+                             [(x, y) for y, row in enumerate(rows) for x, c in enumerate(row) if c == '.'])
+            # The filled-in move table (open neighbors of every cell, walls included) matches the text
+            masks = grid.get_move_masks()
+            for index in range(width * height):
+                x, y = index % width, index // width
+                actions = [1 << bit for bit, (dx, dy) in enumerate([(0, -1), (1, 0), (0, 1), (-1, 0)])
+                           if is_open(x + dx, y + dy)]
+                self.assertEqual(masks[index], sum(actions), (x, y))
+
+
+class TestInfluenceMap(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.grid = self.load_grid([
+            "##########",
+            "#P1.....G#",
+            "#.##.##..#",
+            "#......F1#",
+            "##########",
+        ])
+
+    def test_stamps_match_per_cell_maximum(self):
+        influence = InfluenceMap(self.grid, radius=2, weight=10, predicted_weight=0.5)
+        ghosts, predicted = [(8, 1), (1, 3)], [(7, 1), (6, 1)]
+        penalties = influence.update(ghosts, predicted)
+        for y in range(self.grid.height):
+            for x in range(self.grid.width):
+                expected = max([10 * (3 - abs(x - gx) - abs(y - gy)) for gx, gy in ghosts] +
+                               [5 * (3 - abs(x - px) - abs(y - py)) for px, py in predicted] + [0])
+                self.assertEqual(influence.danger[y, x], expected)
+                if self.grid.is_valid((x, y)):
+                    self.assertEqual(penalties.get((x, y), 0), expected)
+                else:
+                    self.assertNotIn((x, y), penalties)
+
+        # Ghosts moving away leave no stale danger behind
+        influence.update([(4, 3)])
+        self.assertEqual(influence.cost((8, 1)), 0)
+        self.assertEqual(influence.cost((4, 3)), 30)
+        self.assertEqual(int((influence.danger > 0).sum()), 12)  # Diamond of 13 cells, one below the map
+
+    def test_one_map_per_tick_shared_by_all_pacmen(self):
+        saved = settings.PATH_SEARCH
+        try:
+            settings.PATH_SEARCH = "shortest"
+            self.assertIsNone(PacmanAgent(self.grid, "F1", (255, 255, 0)).influence)
+            settings.PATH_SEARCH = "weighted"
+            first, second = (PacmanAgent(self.grid, "F1", (255, 255, 0)) for _ in range(2))
+        finally:
+            settings.PATH_SEARCH = saved
+        self.assertIs(first.influence, second.influence)
+        for agent in (first, second):
+            agent.update_ghost_positions([(8, 1)])
+        penalties = first.danger_penalties()
+        self.assertIs(second.danger_penalties(), penalties)  # Not stamped again
+        self.assertEqual(penalties[(8, 1)], settings.INFLUENCE_WEIGHT * (settings.INFLUENCE_RADIUS + 1))
+
+class TestGhostForecast(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.grid = self.load_grid([
+            "##########",
+            "#P1.....G#",
+            "#.##.##..#",
+            "#......F1#",
+            "##########",
+            "#### #####",
+            "##########",
+        ])
+
+    def walk(self, start, steps):
+        """Exact distribution of a random ghost by enumerating its moves"""
+        distribution = {start: 1.0}
+        for _ in range(steps):
+            following = {}
+            for pos, p in distribution.items():
+                neighbors = self.grid.get_neighbors(pos) or [pos]
+                for neighbor in neighbors:
+                    following[neighbor] = following.get(neighbor, 0.0) + p / len(neighbors)
+            distribution = following
+        return distribution
+
+    def test_occupancy_is_exact(self):
+        forecast = GhostForecast(self.grid, horizon=4)
+        ghosts = [(8, 1), (2, 3)]
+        forecast.update(ghosts)
+        for step in range(5):
+            walks = [self.walk(ghost, step) for ghost in ghosts]
+            occupancy = forecast.occupancy(step)
+            self.assertAlmostEqual(occupancy.sum(), sum(1 - (1 - walks[0].get(pos, 0)) * (1 - walks[1].get(pos, 0))
+                                                         for pos in set(walks[0]) | set(walks[1])))
+            for pos in set(walks[0]) | set(walks[1]):
+                expected = 1 - (1 - walks[0].get(pos, 0)) * (1 - walks[1].get(pos, 0))
+                self.assertAlmostEqual(occupancy[forecast.cell_index[pos[1] * self.grid.width + pos[0]]], expected)
+        self.assertAlmostEqual(forecast.risk((7, 1), 1), 0.5)
+        self.assertAlmostEqual(forecast.risk((6, 1), 2), 1 / 6)  # Then one of the 3 moves out of (7, 1)
+        self.assertEqual(forecast.risk((0, 0), 3), 0.0)  # Walls never hold a ghost
+        self.assertIn((7, 1), forecast.cells_at_risk(0.5, 1))
+        self.assertNotIn((6, 1), forecast.cells_at_risk(0.5, 2))
+
+    def test_walled_in_ghost_stays(self):
+        forecast = GhostForecast(self.grid)
+        forecast.update([(4, 5), (8, 1)])
+        self.assertEqual(forecast.risk((4, 5), 3), 1.0)
+
+class TestBitboard(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.grid = self.load_grid([
+            "...#......",  # Open cells on both edges: rows must not wrap into each other
+            "#P1.....G.",
+            "..##.##..#",
+            "#......F1#",
+            "##########",
+            "#.. ######",  # Food nobody can reach
+            "##########",
+        ])
+        self.bitboard = self.grid.get_bitboard()
+
+    def reference_distances(self, start):
+        """Cell by cell BFS over get_neighbors"""
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for neighbor in self.grid.get_neighbors(current):
+                if neighbor not in distances:
+                    distances[neighbor] = distances[current] + 1
+                    queue.append(neighbor)
+        return distances
+
+    def test_distances_match_cell_by_cell_search(self):
+        bitboard, width = self.bitboard, self.grid.width
+        self.assertEqual(bitboard.positions(bitboard.expand(bitboard.bit((9, 1)))), [(9, 0), (8, 1)])  # Not (0, 2)
+        for start in [(0, 0), (9, 1), (1, 3), (1, 5)]:
+            expected = self.reference_distances(start)
+            field = bitboard.distance_field(bitboard.bit(start))
+            self.assertEqual({(i % width, i // width): int(d) for i, d in enumerate(field) if d >= 0}, expected)
+            self.assertEqual(BFS(self.grid).distance_map(start), expected)
+        layers = bitboard.distance_layers(bitboard.bit((1, 3)), max_distance=2)
+        self.assertEqual([sorted(bitboard.positions(layer)) for layer in layers],
+                         [[(1, 3)], [(1, 2), (2, 3)], [(0, 2), (1, 1), (3, 3)]])
+        self.assertEqual(bitboard.count(bitboard.reachable(bitboard.bit((1, 3)), 2)), 6)
+        self.assertEqual(bitboard.distance_field(bitboard.bit((3, 0))).max(), -1)  # From a wall
+
+    def test_numpy_and_table_conversions_agree(self):
+        bitboard = self.bitboard
+        cells = bitboard.positions(bitboard.open)
+        bitboard._table = None  # As on large boards
+        self.assertEqual(bitboard.positions(bitboard.open), cells)
+        self.assertEqual(len(cells), bitboard.count(bitboard.open))
+        self.assertEqual(bitboard.from_positions(cells), bitboard.open)
+
+    def test_food_reachability_follows_the_grid(self):
+        bitboard = self.bitboard
+        reachable = set(bitboard.positions(bitboard.reachable_food((1, 1))))
+        self.assertEqual(reachable, set(self.grid.food_positions) - {(1, 5), (2, 5)})
+        self.grid.food_positions.remove((3, 1))
+        self.assertNotIn((3, 1), bitboard.positions(bitboard.reachable_food((1, 1))))
+        self.grid.reset()
+        self.assertEqual(set(bitboard.positions(bitboard.food)), set(self.grid.food_positions))
+
+# SOLO with a dead-end corridor below it
+DEAD_END = SOLO[:4] + ["####.#####", "####.#####", "##########"]
+
+class TestMapAnalysis(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.map_path = self.write_map(DEAD_END)
+
+    def test_artifact_matches_live_computation(self):
+        self.assertEqual(analyze_map(self.map_path), artifact_path(self.map_path))
+        grid = Grid(self.map_path)
+        analysis = grid.get_analysis()
+        self.assertEqual(analysis.key_names, ["P1", "F1", "G1"])
+        bfs = BFS(grid)
+        for key, pos in enumerate(analysis.key_points.tolist()):
+            distances = bfs.distance_map(tuple(pos))
+            for y in range(grid.height):
+                for x in range(grid.width):
+                    self.assertEqual(analysis.distance(key, (x, y)), distances.get((x, y), -1))
+        self.assertEqual(analysis.key_distances.tolist(), [[0, 9, 7], [9, 0, 2], [7, 2, 0]])
+
+        grid.get_food_positions().remove((3, 1))
+        loaded, traced = grid.get_corridor_graph(), CorridorGraph(grid)
+        self.assertEqual(loaded.nodes, traced.nodes)
+        self.assertEqual(loaded.node_food, traced.node_food)
+        self.assertEqual([(e.a, e.b, e.cells, e.food) for e in loaded.edges],
+                         [(e.a, e.b, e.cells, e.food) for e in traced.edges])
+        self.assertEqual(loaded.locate((4, 4)), traced.locate((4, 4)))
+
+        planner = RoutePlanner(grid, (8, 3))
+        self.assertEqual(planner.distance((1, 3), (8, 3)), 7)
+        self.assertEqual(planner._distances, {})  # Answered from the artifact, no BFS run
+
+    def test_trap_depths_and_articulation_points(self):
+        analyze_map(self.map_path)
+        analysis = Grid(self.map_path).get_analysis()
+        traps = {(x, y): int(analysis.trap_depth[y, x]) for y, x in zip(*analysis.trap_depth.nonzero())}
+        self.assertEqual(traps, {(4, 4): 1, (4, 5): 2, (9, 3): 1})
+        self.assertTrue(analysis.is_trap((4, 5)) and not analysis.is_trap((4, 3)))
+        choke = {(x, y) for y, x in zip(*analysis.articulation.nonzero())}
+        self.assertEqual(choke, {(4, 3), (4, 4), (8, 3)})
+        self.assertTrue(analysis.is_articulation((8, 3)))
+
+        # Without any loop the whole map is a dead end, measured from its center
+        with open(self.map_path, "w") as f:
+            f.write("#########\n#P1.G.F1#\n#########")
+        analyze_map(self.map_path)
+        analysis = Grid(self.map_path).get_analysis()
+        self.assertEqual(analysis.trap_depth[1].tolist(), [0, 4, 3, 2, 1, 2, 3, 4, 0])
+
+    def test_stale_artifact_is_ignored(self):
+        analyze_map(self.map_path)
+        with open(self.map_path, "a") as f:
+            f.write("\n")
+        grid = Grid(self.map_path)
+        self.assertIsNone(grid.get_analysis())
+        self.assertEqual(len(grid.get_corridor_graph().edges), len(CorridorGraph(grid).edges))
+
+class TestSharedGrid(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.map_path = self.write_map(DEAD_END)
+        self.grid = Grid(self.map_path)
+        self.shared = SharedGrid(self.grid)
+
+    def tearDown(self):
+        self.shared.close()
+
+    def test_attached_grid_matches_loaded_grid(self):
+        grid, attached = self.grid, self.shared.attach()
+        self.assertEqual(bytes(attached.cells), bytes(grid.cells))
+        self.assertEqual((attached.get_start_positions(), attached.get_ghost_positions(),
+                          attached.get_flag_positions()),
+                         (grid.get_start_positions(), grid.get_ghost_positions(), grid.get_flag_positions()))
+        for y in range(-1, grid.height + 1):
+            for x in range(-1, grid.width + 1):
+                self.assertEqual(attached.get_valid_actions((x, y)), grid.get_valid_actions((x, y)))
+        self.assertEqual(attached.get_analysis().distance(1, (4, 5)), BFS(grid).distance_map((8, 3))[(4, 5)])
+        loaded, traced = attached.get_corridor_graph(), grid.get_corridor_graph()
+        self.assertEqual([(e.a, e.b, e.cells, e.food) for e in loaded.edges],
+                         [(e.a, e.b, e.cells, e.food) for e in traced.edges])
+
+        attached.food_positions.remove((3, 1))
+        self.assertEqual(len(attached.food_positions), len(grid.food_positions) - 1)
+        self.assertIn((3, 1), grid.food_positions)  # Food stays private to each grid
+        attached.reset()
+        self.assertEqual(bytes(attached.cells), bytes(grid.cells))
+
+    def test_pickled_grid_attaches_in_worker(self):
+        attached = self.shared.attach()
+        attached.food_positions.remove((3, 1))
+        attached.food_positions.remove((4, 5))
+        data = pickle.dumps(attached)
+        self.assertLess(len(data), len(pickle.dumps(self.grid)) // 4)  # Block name and food bitset only
+        script = ("import pickle, sys; grid = pickle.loads(bytes.fromhex(sys.argv[1])); "
+                  "print(len(grid.food_positions), (3, 1) in grid.food_positions, "
+                  "grid.get_analysis().distance(0, (4, 5)), len(grid.get_corridor_graph().edges))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", script, data.hex()], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.split(), [str(len(attached.food_positions)), "False", "7",
+                                          str(len(self.grid.get_corridor_graph().edges))])
+        # The worker's exit left the block in place for everyone else
+        self.assertEqual(bytes(self.shared.attach().cells), bytes(self.grid.cells))
+
+    def test_pool_workers_leave_the_block_to_its_creator(self):
+        script = ("import multiprocessing, sys\n"
+                  "from environment.grid import Grid\n"
+                  "from environment.shared_grid import SharedGrid, attach_grid\n"
+                  "def food(name):\n"
+                  "    return len(attach_grid(name).food_positions)\n"
+                  "if __name__ == '__main__':\n"
+                  "    with SharedGrid(Grid(sys.argv[1])) as shared:\n"
+                  "        with multiprocessing.get_context('spawn').Pool(2) as pool:\n"
+                  "            print(len(set(pool.map(food, [shared.name] * 4))))\n")
+        script_path = os.path.join(self.tmp.name, "pool.py")  # Spawned workers import it again
+        with open(script_path, "w") as f:
+            f.write(script)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, script_path, self.map_path], cwd=root,
+                                env={**os.environ, "PYTHONPATH": root}, capture_output=True, text=True,
+                                check=True, timeout=60)
+        self.assertEqual(result.stdout.split()[-1], "1")
+        self.assertNotIn("Traceback", result.stderr)  # The resource tracker's books stay balanced
+        self.assertNotIn("leaked", result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_kernels.py
+import random
+import unittest
+from config import settings
+from agents.agent_params import AgentParams
+from agents.pacman_agent import PacmanAgent
+from algorithms import kernels
+from algorithms.astar import AStar
+from algorithms.bfs import BFS
+from environment.map_analysis import _distance_field
+from tests.random_maps import TempMapTestCase, random_map
+
+class TestKernels(TempMapTestCase):
+    """Every accelerated backend against the interpreted implementations"""
+
+    def setUp(self):
+        super().setUp()
+        self.saved = (kernels.backend(), settings.GHOST_PREDICTION)
+        self.grids = [self.load_grid(random_map(width, height, seed), f"random{seed}")
+                      for seed, (width, height) in enumerate([(12, 9), (31, 17), (45, 40)])]
+        self.backends = ["arrays"]
+        try:
+            kernels.set_backend("numba")
+            self.backends.append("numba")
+        except ImportError:
+            pass  # Numba is optional, the interpreted kernels are still checked
+
+    def tearDown(self):
+        kernels.set_backend(self.saved[0])
+        settings.GHOST_PREDICTION = self.saved[1]
+
+    def each_backend(self, run):
+        """run() under "python" and under every accelerated backend, which must all agree"""
+        kernels.set_backend("python")
+        expected = run()
+        for name in self.backends:
+            kernels.set_backend(name)
+            self.assertEqual(run(), expected, name)
+        return expected
+
+    def open_cells(self, grid):
+        return [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_valid((x, y))]
+
+    def test_astar_paths_and_expansions(self):
+        rng = random.Random(4)
+        for grid in self.grids:
+            astar, cells = AStar(grid), self.open_cells(grid)
+            for _ in range(25):
+                start, goal = rng.choice(cells), rng.choice(cells)
+                penalties = {rng.choice(cells): rng.choice([0.5, 3, 10.0]) for _ in range(rng.randint(0, 12))}
+                self.each_backend(lambda: (astar.find_path(start, goal), astar.nodes_expanded,
+                                           astar.find_path(start, goal, penalties), astar.nodes_expanded))
+            self.assertIsNone(self.each_backend(lambda: astar.find_path((0, 0), cells[0])))
+
+    def test_distance_maps(self):
+        rng = random.Random(5)
+        for grid in self.grids:
+            bfs, cells = BFS(grid), self.open_cells(grid)
+            for start in rng.sample(cells, 5):
+                found = self.each_backend(lambda: list(bfs.distance_map(start).items()))  # Order included
+                self.assertEqual(found[0], (start, 0))
+                self.each_backend(lambda: _distance_field(grid, start).tolist())
+
+    def test_safest_food(self):
+        rng = random.Random(6)
+        for prediction in ("corridor", "markov"):
+            settings.GHOST_PREDICTION = prediction
+            for grid in self.grids:
+                cells = self.open_cells(grid)
+                # Threat weighs more than closeness, so the predicted ghost cells decide
+                agent = PacmanAgent(grid, "F1", (255, 255, 0), AgentParams(threat_penalty=2.0))
+                for _ in range(10):
+                    ghosts = rng.sample(cells, 3)
+                    agent.update_ghost_positions(ghosts)
+                    # Each ghost moved to a neighbor, so the corridor prediction has directions
+                    moved = [rng.choice(grid.get_neighbors(g) or [g]) for g in ghosts]
+                    agent.update_ghost_positions(moved)
+                    for position in (rng.choice(cells), moved[0]):  # Anywhere, and among the ghosts
+                        self.each_backend(lambda: agent.find_safest_food(position))
+
+    def test_backend_selection(self):
+        self.assertEqual(kernels.set_backend("python"), "python")
+        self.assertIsNone(kernels.accelerated())
+        self.assertEqual(kernels.set_backend("arrays"), "arrays")
+        self.assertEqual(kernels.accelerated().name, "arrays")
+        self.assertIn(kernels.set_backend("auto"), ("numba", "python"))
+        with self.assertRaises(ValueError):
+            kernels.set_backend("cuda")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# tests/test_metrics_store.py
+import os
+import random
+import sqlite3
+import unittest
+import numpy as np
+from config import settings
+from logic.game import Game
+from logic.metrics_store import SCHEMA_VERSION, MetricsStore, MetricsWriter
+from tests.random_maps import TempMapTestCase
+
+class TestMetricsStore(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmp.name, "metrics.db")
+
+    def agent_row(self, flag_id, traditional):
+        return {"flag_id": flag_id, "traditional": traditional, "intelligence": 5.0, "food_collected": 1,
+                "flags_reached": 0, "decisions": 10, "good_decisions": 9, "ghost_encounters": 1,
+                "decide_mean_ms": 0.1, "decide_p95_ms": 0.2}
+
+    def test_streamed_episodes_aggregate(self):
+        rng = random.Random(1)
+        writer = MetricsWriter(self.path, batch_size=64)
+        moves, wins = {"greedy": [], "route": []}, {"greedy": 0, "route": 0}
+        for n in range(300):
+            strategy = "greedy" if n % 3 else "route"
+            writer.new_episode()
+            moves[strategy].append(rng.randint(50, 500))
+            victory = rng.random() < 0.7
+            wins[strategy] += victory
+            writer.end_episode({"started": 0.0, "map": "m", "strategy": strategy, "ghosts": "random",
+                                "victory": int(victory), "moves": moves[strategy][-1],
+                                "sim_time": 1.0, "wall_time": 0.5},
+                               [self.agent_row("F1", 10 * n), self.agent_row("F2", 0)])
+        writer.close()
+
+        store = MetricsStore(self.path)
+        self.assertEqual(store.count(), 300)
+        self.assertAlmostEqual(store.win_rate(strategy="route"), wins["route"] / 100)
+        expected = np.percentile(moves["greedy"], [50, 90, 99])
+        self.assertEqual(list(store.percentiles("moves", strategy="greedy").values()), expected.tolist())
+        self.assertEqual(len(store.values("traditional")), 600)
+        self.assertEqual(store.summary()["route"]["episodes"], 100)
+        with self.assertRaises(ValueError):
+            store.values("moves; DROP TABLE episodes")
+        store.close()
+
+    def test_high_scores_persist(self):
+        writer = MetricsWriter(self.path)
+        writer.save_high_scores({"F1": 120, "F2": 40})
+        writer.close()
+        writer = MetricsWriter(self.path)
+        self.assertEqual(writer.high_scores, {"F1": 120, "F2": 40})
+        writer.save_high_scores({"F1": 80, "F2": 60})  # Lower scores never replace the record
+        writer.flush()
+        self.assertEqual(MetricsStore(self.path).load_high_scores(), {"F1": 120, "F2": 60})
+        writer.close()
+
+    def test_older_database_is_migrated(self):
+        connection = sqlite3.connect(self.path)  # Episodes as recorded before sim_time
+        connection.execute("CREATE TABLE episodes (run TEXT, episode INTEGER, started REAL, map TEXT, strategy TEXT, "
+                           "ghosts TEXT, victory INTEGER, moves INTEGER, wall_time REAL, PRIMARY KEY (run, episode))")
+        connection.execute("INSERT INTO episodes VALUES ('old', 1, 0.0, 'm', 'greedy', 'random', 1, 40, 0.5)")
+        connection.commit()
+        connection.close()
+
+        writer = MetricsWriter(self.path)
+        writer.new_episode()
+        writer.end_episode({"started": 0.0, "map": "m", "strategy": "greedy", "ghosts": "random", "victory": 0,
+                            "moves": 60, "sim_time": 7.5, "wall_time": 0.5}, [self.agent_row("F1", 10)])
+        writer.close()
+        store = MetricsStore(self.path)
+        self.assertEqual(store.values("moves").tolist(), [40, 60])
+        self.assertEqual(store.values("sim_time", run=writer.run).tolist(), [7.5])
+        self.assertEqual(store.values("wall_time").tolist(), [0.5, 0.5])
+        self.assertEqual(store.connection.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        store.close()
+
+    def test_write_errors_reach_flush_and_close(self):
+        writer = MetricsWriter(self.path)
+        writer.flush()  # The writer thread has created its tables
+        store = MetricsStore(self.path)
+        store.connection.execute("DROP TABLE episodes")
+        writer.new_episode()
+        writer.end_episode({"started": 0.0, "map": "m", "strategy": "greedy", "ghosts": "random", "victory": 1,
+                            "moves": 10, "sim_time": 1.0, "wall_time": 0.5}, [self.agent_row("F1", 10)])
+        with self.assertRaises(sqlite3.OperationalError):
+            writer.flush()
+        # The writer is still running: later records are written and nothing is left to raise
+        writer.save_high_scores({"F1": 10})
+        writer.flush()
+        self.assertEqual(store.load_high_scores(), {"F1": 10})
+        writer.close()
+        store.close()
+
+    def test_game_records_episodes(self):
+        map_path = self.write_map(["#######", "#P1..G#", "#.###.#", "#....F1", "#######"])
+        saved = settings.METRICS_DB, settings.METRICS_TICKS
+        settings.METRICS_DB, settings.METRICS_TICKS = self.path, True
+        try:
+            random.seed(0)
+            game = Game(map_path)
+            while not game.game_over and game.move_count < 100:
+                game.update()
+            if not game.game_over:
+                game.end_game(victory=False)
+            game.metrics.close()
+        finally:
+            settings.METRICS_DB, settings.METRICS_TICKS = saved
+
+        store = MetricsStore(self.path)
+        self.assertEqual(store.count(map=map_path), 1)
+        self.assertEqual(store.values("moves")[0], game.move_count)
+        self.assertEqual(store.values("traditional")[0], game.scores["F1"]["traditional"])
+        self.assertEqual(store.load_high_scores(), {"F1": game.high_scores["F1"]})
+        ticks = store.connection.execute("SELECT COUNT(*) FROM ticks").fetchone()[0]
+        self.assertEqual(ticks, game.move_count)
+        store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# tests/test_performance.py
+"""
+Performance budgets of the core engine on fixed random maps: a change that
+makes a search, a game tick or a frame of popups several times slower fails
+them. Budgets are about three times what one modest core measures, and the
+best of a few repeats is compared so a busy machine does not fail them.
+
+Wall-clock budgets depend on the machine, so the normal run checks them
+three times looser still and only catches gross regressions. PERF_BUDGETS
+tightens them to the budgets themselves or skips them, e.g. on shared CI
+runners, and PERF_BUDGET_SCALE sets the looseness directly:
+
+    PERF_BUDGETS=strict python -m pytest tests/test_performance.py
+    PERF_BUDGETS=skip python -m pytest
+"""
+import os
+import random
+import time
+import unittest
+from config import settings
+from environment.grid import Grid
+from algorithms.astar import AStar
+from algorithms.bfs import BFS
+from logic.game import Game
+from tests.random_maps import TempMapTestCase, quiet, random_map
+
+MODE = os.environ.get("PERF_BUDGETS", "")  # "" (loose), "strict" or "skip"
+SCALE = float(os.environ.get("PERF_BUDGET_SCALE", 1 if MODE == "strict" else 3))
+
+# Microseconds per query at most, by map side (square maps, a quarter walls)
+ASTAR_US = {64: 3000, 200: 25000}
+DISTANCE_MAP_US = {64: 9000, 200: 80000}
+# Headless game ticks per second at least, two Pacmen and two ghosts on a 40x30 map
+TICKS_PER_SECOND = 35
+# Milliseconds per frame at most to animate that many score popups in a 960x704 view
+POPUP_FRAME_MS = {4000: 60}
+
+def best_time(run, repeats: int = 3) -> float:
+    """Fastest of a few runs of run(), in seconds"""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+@unittest.skipIf(MODE == "skip", "wall-clock budgets skipped with PERF_BUDGETS=skip")
+class TestPerformanceBudgets(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.saved = settings.DISPLAY_BACKEND
+        settings.DISPLAY_BACKEND = "null"
+
+    def tearDown(self):
+        settings.DISPLAY_BACKEND = self.saved
+
+    def load(self, side: int) -> Grid:
+        return self.load_grid(random_map(side, side, 1, wall_density=0.25), f"square{side}")
+
+    def queries(self, grid: Grid, count: int):
+        rng = random.Random(0)
+        cells = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_valid((x, y))]
+        return [(rng.choice(cells), rng.choice(cells)) for _ in range(count)]
+
+    def test_astar_microseconds_per_query(self):
+        for side, budget in ASTAR_US.items():
+            astar = AStar(self.load(side))
+            pairs = self.queries(astar.grid, 40)
+            micros = best_time(lambda: [astar.find_path(start, goal) for start, goal in pairs]) / len(pairs) * 1e6
+            self.assertLess(micros, budget * SCALE, f"A* on {side}x{side}: {micros:.0f} us per query")
+
+    def test_distance_map_microseconds(self):
+        for side, budget in DISTANCE_MAP_US.items():
+            bfs = BFS(self.load(side))
+            starts = [start for start, _ in self.queries(bfs.grid, 5)]
+            micros = best_time(lambda: [bfs.distance_map(start) for start in starts]) / len(starts) * 1e6
+            self.assertLess(micros, budget * SCALE, f"distance map on {side}x{side}: {micros:.0f} us")
+
+    def test_game_ticks_per_second(self):
+        path = self.write_map(random_map(40, 30, 2, agents=2, wall_density=0.15), "game")
+        random.seed(0)
+        with quiet():
+            game = Game(path)
+
+            def play():
+                for _ in range(100):
+                    if game.game_over:
+                        game.reset()
+                    game.update()
+            ticks_per_second = 100 / best_time(play, repeats=2)
+        self.assertGreater(ticks_per_second, TICKS_PER_SECOND / SCALE, f"{ticks_per_second:.0f} ticks/s")
+
+    def test_popup_frame_milliseconds(self):
+        import pygame
+        from visualization.animation import GlyphCache, PopupPool
+        pygame.font.init()  # Glyphs only, blitted onto a plain surface without a display
+        self.addCleanup(pygame.font.quit)
+        screen = pygame.Surface((1024, 768))
+        view = pygame.Rect(32, 32, 960, 704)
+        for count, budget in POPUP_FRAME_MS.items():
+            pool = PopupPool(GlyphCache(pygame.font.Font(None, 18)), count, 4.0, 64)
+            rng = random.Random(0)
+            for i in range(count):
+                pool.add(rng.choice(["+10 Food", "+100 Flag"]), (255, 255, 0), rng.randrange(30), rng.randrange(22),
+                         i / count)
+            millis = best_time(lambda: [pool.draw(screen, 1.0 + f / 100, (32, 32), 32, view)
+                                        for f in range(10)]) / 10 * 1000
+            self.assertLess(millis, budget * SCALE, f"{count} popups: {millis:.1f} ms per frame")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# tests/test_tuner.py
+import os
+import random
+import unittest
+from config import settings
+from agents.agent_params import AgentParams
+from logic import tuner
+from logic.tuner import ResultCache, Tuner, play_games, random_candidates
+from tests.random_maps import SOLO, TempMapTestCase
+
+class TestAgentParams(unittest.TestCase):
+    def test_defaults_and_vectors(self):
+        params = AgentParams()
+        self.assertEqual(params.vector(), [0.6, 0.4, 0.5, 3, 2, 3])
+        self.assertEqual(AgentParams.from_vector(params.vector()), params)
+        self.assertEqual(AgentParams(horizon=4.4).horizon, 4)  # Integer parameters are rounded
+        with self.assertRaises(ValueError):
+            AgentParams(courage=1.0)
+
+    def test_samples_stay_in_bounds(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            for name, value in AgentParams.sample(rng).as_dict().items():
+                default, low, high = AgentParams.SPACE[name]
+                self.assertTrue(low <= value <= high)
+
+    def test_settings_override(self):
+        saved = settings.PACMAN_PARAMS
+        settings.PACMAN_PARAMS = {"threat_penalty": 1.5}
+        try:
+            self.assertEqual(AgentParams.from_settings().threat_penalty, 1.5)
+            self.assertNotEqual(AgentParams.from_settings().key(), AgentParams().key())
+        finally:
+            settings.PACMAN_PARAMS = saved
+
+
+class TestTuner(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.map_path = self.write_map(SOLO, "solo")
+
+    def tearDown(self):
+        tuner._games.clear()
+
+    def test_restarted_games_match_fresh_ones(self):
+        vector = AgentParams().vector()
+        reused = play_games(self.map_path, vector, [0, 1, 2], 60)  # One game, reset between seeds
+        fresh = {}
+        for seed in (0, 1, 2):
+            tuner._games.clear()
+            fresh.update(play_games(self.map_path, vector, [seed], 60))
+        self.assertEqual({seed: result[:2] for seed, result in reused.items()},
+                         {seed: result[:2] for seed, result in fresh.items()})
+
+    def test_successive_halving_with_cache(self):
+        path = os.path.join(self.tmp.name, "results.db")
+        candidates = random_candidates(4, seed=3)
+        with Tuner([self.map_path], ResultCache(path), workers=1, max_moves=60) as search:
+            ranking = search.successive_halving(candidates, min_seeds=2, eta=2, rungs=2)
+            self.assertEqual(search.games_played, 4 * 2 + 2 * 2)  # Only the new seeds of the survivors
+        self.assertEqual(sorted(evaluation.rung for evaluation in ranking), [0, 0, 1, 1])
+        self.assertEqual([evaluation.games for evaluation in ranking[:2]], [4, 4])
+        self.assertGreaterEqual(ranking[0].score(), ranking[1].score())
+
+        # Same search again: every game comes from the cache file
+        with Tuner([self.map_path], ResultCache(path), workers=1, max_moves=60) as search:
+            again = search.successive_halving(candidates, min_seeds=2, eta=2, rungs=2)
+            self.assertEqual(search.games_played, 0)
+        self.assertEqual([e.as_dict() for e in again], [e.as_dict() for e in ranking])
+
+    def test_games_in_this_process_play_like_workers(self):
+        candidates = random_candidates(3, seed=5)
+        saved = settings.AGENT_EXECUTOR, settings.METRICS_DB
+        settings.AGENT_EXECUTOR = "thread"
+        settings.METRICS_DB = os.path.join(self.tmp.name, "metrics.db")
+        try:
+            with Tuner([self.map_path], workers=1, max_moves=60) as search:
+                local = search.successive_halving(candidates, min_seeds=2, eta=2, rungs=2)
+            self.assertEqual((settings.AGENT_EXECUTOR, settings.METRICS_DB),
+                             ("thread", os.path.join(self.tmp.name, "metrics.db")))  # Restored
+        finally:
+            settings.AGENT_EXECUTOR, settings.METRICS_DB = saved
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "metrics.db")))
+        with Tuner([self.map_path], workers=2, max_moves=60) as search:
+            pooled = search.successive_halving(candidates, min_seeds=2, eta=2, rungs=2)
+            self.assertEqual(search.games_played, 3 * 2 + 2 * 2)
+        self.assertEqual([e.as_dict() for e in pooled], [e.as_dict() for e in local])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# tests/test_vector_game.py
+import random
+import unittest
+import numpy as np
+from logic.game import Game
+from logic.vector_game import VectorGame, ACTIONS, STAY, action_index
+from tests.random_maps import TempMapTestCase
+
+MAP = [
+    "#########",
+    "#P1.....#",
+    "#.##.##.#",
+    "#..G.F1.#",
+    "#.##.##.#",
+    "#F2...GP2",
+    "#########",
+]
+
+class TestVectorGame(TempMapTestCase):
+    def setUp(self):
+        super().setUp()
+        self.map_path = self.write_map(MAP, "vector")
+
+    def scripted_game(self, rng: random.Random, script: dict):
+        """Scalar Game whose agents draw seeded random moves and log them into script"""
+        game = Game(self.map_path)
+
+        def pacman_policy(agent):
+            def choose_action(position):
+                if agent.protected:
+                    action = (0, 0)
+                else:
+                    action = rng.choice(game.grid.get_valid_actions(position) + [(0, 0)])
+                script["pacman"][-1].append(action_index(action))
+                return action
+            return choose_action
+
+        def ghost_policy(position):
+            action = rng.choice(game.grid.get_valid_actions(position))
+            script["ghost"][-1].append(action_index(action))
+            return action
+
+        for agent in game.pacman_agents:
+            agent.choose_action = pacman_policy(agent)
+        for agent in game.ghost_agents:
+            agent.choose_action = ghost_policy
+        return game
+
+    def test_matches_scalar_game(self):
+        seeds = list(range(12))
+        games, scripts = [], []
+        for seed in seeds:
+            script = {"pacman": [], "ghost": []}
+            games.append(self.scripted_game(random.Random(seed), script))
+            scripts.append(script)
+        vector = VectorGame(games[0].grid, len(seeds))
+
+        for _ in range(80):
+            ghost_actions = np.full((len(seeds), vector.num_ghosts), STAY)
+            pacman_actions = np.full((len(seeds), vector.num_pacmans), STAY)
+            for b, (game, script) in enumerate(zip(games, scripts)):
+                script["pacman"].append([])
+                script["ghost"].append([])
+                game.update()
+                if script["ghost"][-1]:
+                    ghost_actions[b] = script["ghost"][-1]
+                    pacman_actions[b] = script["pacman"][-1]
+            vector.step(pacman_actions, ghost_actions)
+
+            for b, game in enumerate(games):
+                self.assertEqual(vector.positions(b), (game.pacman_positions, game.ghost_positions))
+                self.assertEqual(bool(vector.done[b]), game.game_over)
+                self.assertEqual(bool(vector.victory[b]), game.game_over and "VICTORY" in game.game_result)
+                self.assertEqual(int(vector.move_count[b]), game.move_count)
+                self.assertEqual(int(vector.food_left[b]), len(game.grid.food_positions))
+                for i, flag_id in enumerate(sorted(game.scores)):
+                    self.assertEqual(int(vector.scores[b, i]), game.scores[flag_id]["traditional"])
+                    self.assertEqual(int(vector.food_collected[b, i]), game.scores[flag_id]["food_collected"])
+                    self.assertEqual(int(vector.flags_reached[b, i]), game.scores[flag_id]["flags_reached"])
+        self.assertTrue(any(g.game_over for g in games))
+        self.assertTrue(vector.food_collected.any())
+
+    def test_random_ghosts_stay_legal_and_reset(self):
+        game = Game(self.map_path)
+        vector = VectorGame(game.grid, 256, seed=3)
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            before, running = vector.ghost_positions.copy(), ~vector.done
+            vector.step(rng.integers(0, len(ACTIONS), (256, vector.num_pacmans)))
+            for g in range(vector.num_ghosts):
+                legal = vector.moves[before[running, g], :4]
+                self.assertTrue((legal == vector.ghost_positions[running, g, None]).any(axis=1).all())
+                self.assertTrue((before[~running, g] == vector.ghost_positions[~running, g]).all())
+        self.assertTrue(vector.done.any())
+        vector.reset(vector.done)
+        self.assertFalse(vector.done.any())
+        self.assertTrue((vector.food_left[vector.move_count == 0] == vector.num_food).all())
+
+if __name__ == '__main__':
+    unittest.main()
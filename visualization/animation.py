@@ -0,0 +1,119 @@
+# visualization/animation.py
+"""
+Score popups animated against time rather than frames: a popup rises and
+fades over settings.POPUP_SECONDS whatever the frame rate. Popups live in a
+fixed-capacity ring of NumPy arrays in the order they were added, so adding
+one is O(1), the expired ones are always the oldest and a frame costs a few
+array operations and one batched blit, even with thousands of popups in flight.
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+import pygame
+
+ALPHA_STEP = 8  # Alpha levels a glyph is prepared at, the old per-frame fade step
+_START_ALPHA, _END_ALPHA = 255, 15  # Opacity at the start and end of a popup's life
+
+
+class GlyphCache:
+    """Rendered popup texts, each with one faded copy per alpha level, shared by every popup showing them"""
+
+    def __init__(self, font: pygame.font.Font):
+        self.font = font
+        self.ids: Dict[Tuple[str, Tuple[int, int, int]], int] = {}
+        self.levels: List[List[pygame.Surface]] = []  # Glyph id: its copies by alpha // ALPHA_STEP
+
+    def get(self, text: str, color: Tuple[int, int, int]) -> int:
+        """Id of the glyph of text in color, rendered on first use"""
+        key = (text, tuple(color))
+        glyph = self.ids.get(key)
+        if glyph is None:
+            surface = self.font.render(text, True, color)
+            copies = []
+            for level in range(256 // ALPHA_STEP):
+                copy = surface.copy()
+                copy.set_alpha(level * ALPHA_STEP + ALPHA_STEP - 1)
+                copies.append(copy)
+            glyph = self.ids[key] = len(self.levels)
+            self.levels.append(copies)
+        return glyph
+
+    def size(self, glyph: int) -> Tuple[int, int]:
+        return self.levels[glyph][-1].get_size()
+
+
+class PopupPool:
+    """
+    Up to capacity popups (glyph, cell x, cell y, start time) in a ring
+    starting at slot head, oldest first. When full, a new popup replaces the
+    oldest one.
+    """
+
+    def __init__(self, glyphs: GlyphCache, capacity: int, duration: float, rise: int):
+        self.glyphs = glyphs
+        self.capacity = capacity
+        self.duration = duration  # Seconds a popup is shown
+        self.rise = rise  # Pixels a popup moves up over its life
+        self.glyph = np.zeros(capacity, dtype=np.int32)
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.start = np.zeros(capacity, dtype=np.float64)
+        self.head = 0  # Slot of the oldest popup
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        self.head = self.count = 0
+
+    def _drop(self, k: int):
+        """Remove the k oldest popups"""
+        self.head = (self.head + k) % self.capacity
+        self.count -= k
+
+    def slots(self) -> np.ndarray:
+        """Slots of the live popups, oldest first"""
+        return (self.head + np.arange(self.count)) % self.capacity
+
+    def add(self, text: str, color: Tuple[int, int, int], x: int, y: int, now: float):
+        if self.count == self.capacity:
+            self._drop(1)
+        i = (self.head + self.count) % self.capacity
+        self.glyph[i] = self.glyphs.get(text, color)
+        self.x[i], self.y[i], self.start[i] = x, y, now
+        self.count += 1
+
+    def expire(self, now: float):
+        """Remove the popups shown for longer than duration"""
+        # The live start times are two sorted runs: head to the end of the arrays, then the wrapped part
+        cutoff = now - self.duration
+        end = min(self.head + self.count, self.capacity)
+        expired = int(np.searchsorted(self.start[self.head:end], cutoff, side="left"))
+        if expired == end - self.head:
+            expired += int(np.searchsorted(self.start[:self.count - expired], cutoff, side="left"))
+        if expired:
+            self._drop(expired)
+
+    def draw(self, surface: pygame.Surface, now: float, origin: Tuple[int, int], cell_size: int,
+             bounds: pygame.Rect):
+        """
+        Blit the live popups at time now, cell (0, 0) having its top-left
+        corner at pixel origin; popups entirely outside bounds are skipped.
+        """
+        self.expire(now)
+        if self.count == 0:
+            return
+        slots = self.slots()
+        progress = np.clip((now - self.start[slots]) / self.duration, 0.0, 1.0)
+        px = self.x[slots] * cell_size + origin[0]
+        py = self.y[slots] * cell_size + origin[1] - (progress * self.rise).astype(np.int32)
+        levels = ((_START_ALPHA - (_START_ALPHA - _END_ALPHA) * progress) // ALPHA_STEP).astype(np.int32)
+        # Cull against the widest and the tallest glyph, the texts are all about the same size
+        sizes = [self.glyphs.size(g) for g in range(len(self.glyphs.levels))]
+        width, height = max(w for w, _ in sizes), max(h for _, h in sizes)
+        shown = np.flatnonzero((px > bounds.left - width) & (px < bounds.right) &
+                               (py > bounds.top - height) & (py < bounds.bottom))
+        copies = self.glyphs.levels
+        surface.blits([(copies[g][level], (x, y)) for g, level, x, y in
+                       zip(self.glyph[slots[shown]].tolist(), levels[shown].tolist(),
+                           px[shown].tolist(), py[shown].tolist())], doreturn=False)
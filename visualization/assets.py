@@ -0,0 +1,215 @@
+# visualization/assets.py
+"""
+Display assets prepared once instead of at every launch or frame:
+
+- fonts: the file behind a system font name is looked up once (pygame's
+  SysFont scans every installed font first, slow where many are installed)
+  and remembered in fonts.json in the cache directory
+- SpriteAtlas: the Pacman, ghost, flag, wall and food sprites of one cell
+  size and set of colors, drawn once onto one surface and saved as a PNG in
+  the cache directory, so later launches load them instead of drawing them
+
+The cache directory is settings.ASSET_CACHE_DIR; None keeps both in memory.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import pygame
+from config import settings
+
+ATLAS_VERSION = 1  # Bump when draw_sprite changes, so cached atlases are drawn again
+
+# Font name: file, None for pygame's default font (what SysFont falls back to)
+_font_paths: Dict[str, Optional[str]] = {}
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _replace_file(path: str, write):
+    """Write a cache file through a temporary name, so a concurrent launch never reads half of it"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    root, extension = os.path.splitext(path)
+    temporary = f"{root}.{os.getpid()}.tmp{extension}"
+    write(temporary)
+    os.replace(temporary, path)
+
+def font_path(name: str, cache_dir: Optional[str] = None) -> Optional[str]:
+    """File of the system font name, None when it is not installed"""
+    if name in _font_paths:
+        return _font_paths[name]
+    index = os.path.join(cache_dir, "fonts.json") if cache_dir else None
+    known = _read_json(index) if index else {}
+    if name in known and (known[name] is None or os.path.exists(known[name])):
+        path = known[name]
+    else:  # Never looked up, or uninstalled since
+        path = pygame.font.match_font(name)
+        if index:
+            known[name] = path
+
+            def write(temporary: str):
+                with open(temporary, "w") as f:
+                    json.dump(known, f, indent=1)
+            _replace_file(index, write)
+    _font_paths[name] = path
+    return path
+
+def load_font(name: str, size: int, cache_dir: Optional[str] = None) -> pygame.font.Font:
+    """The font SysFont(name, size) gives, without scanning the system fonts again"""
+    return pygame.font.Font(font_path(name, cache_dir), size)
+
+
+def draw_sprite(surface: pygame.Surface, shape: str, color: Tuple[int, int, int], rect: pygame.Rect):
+    """Draw a sprite into the cell at rect; ghosts stick out below their cell by up to SpriteAtlas.PAD pixels"""
+    cx, cy, size = rect.x, rect.y, rect.width
+    if shape == 'wall':
+        pygame.draw.rect(surface, color, rect)
+        pygame.draw.rect(surface, (50, 50, 150), rect, 2)
+        # Add texture to walls
+        for i in range(0, size, 4):
+            pygame.draw.line(surface, (70, 70, 120),
+                             (cx, cy + i), (cx + size, cy + i), 1)
+
+    elif shape == 'food':
+        center = rect.center
+        radius = int(size * 0.15)
+        pygame.draw.circle(surface, color, center, radius)
+        # Add shine effect
+        pygame.draw.circle(surface, (255, 255, 150),
+                           (center[0] - radius//3, center[1] - radius//3),
+                           radius//4)
+
+    elif shape == 'pacman':
+        center = rect.center
+        radius = int(size * 0.4)
+        # Body with gradient effect
+        for r in range(radius, 0, -2):
+            alpha = 255 * r // radius
+            color_with_alpha = (color[0], color[1], color[2], alpha)
+            s = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
+            pygame.draw.circle(s, color_with_alpha, (r, r), r)
+            surface.blit(s, (center[0]-r, center[1]-r))
+
+        # Mouth
+        pygame.draw.polygon(surface, (0, 0, 0), [
+            center,
+            (center[0] + radius, center[1] - radius // 2),
+            (center[0] + radius, center[1] + radius // 2)
+        ])
+        # Eye
+        eye_pos = (center[0] - radius//3, center[1] - radius//3)
+        pygame.draw.circle(surface, (0, 0, 0), eye_pos, radius//6)
+
+    elif shape == 'ghost':
+        # Body with outline
+        body_rect = pygame.Rect(cx + 2, cy + size * 0.2, size - 4, size * 0.6)
+        pygame.draw.rect(surface, color, body_rect, border_radius=8)
+        pygame.draw.rect(surface, (0, 0, 0), body_rect, border_radius=8, width=2)
+
+        # Wavy bottom
+        wave_points = []
+        for i in range(5):
+            wave_x = cx + 2 + (size - 4) * i / 4
+            wave_y = cy + size * 0.8 + (10 if i % 2 == 0 else -5)
+            wave_points.append((wave_x, wave_y))
+        wave_points.append((cx + size - 2, cy + size * 0.8))
+        wave_points.append((cx + 2, cy + size * 0.8))
+        pygame.draw.polygon(surface, color, wave_points)
+        pygame.draw.polygon(surface, (0, 0, 0), wave_points, 2)
+
+        # Eyes
+        eye_radius = size // 6
+        eye_y = int(cy + size * 0.35)
+        left_eye_pos = (cx + size // 3, eye_y)
+        right_eye_pos = (cx + 2 * size // 3, eye_y)
+
+        pygame.draw.circle(surface, (255, 255, 255), left_eye_pos, eye_radius)
+        pygame.draw.circle(surface, (255, 255, 255), right_eye_pos, eye_radius)
+
+        # Pupils
+        pupil_radius = size // 10
+        pygame.draw.circle(surface, (0, 0, 100), left_eye_pos, pupil_radius)
+        pygame.draw.circle(surface, (0, 0, 100), right_eye_pos, pupil_radius)
+
+    elif shape == 'flag':
+        # Pole
+        pole_color = (100, 100, 100)
+        pygame.draw.line(surface, pole_color,
+                         (cx + size // 4, cy + size // 6),
+                         (cx + size // 4, cy + size * 0.9), 5)
+        # Flag
+        flag_points = [
+            (cx + size // 4, cy + size // 6),
+            (cx + size // 4 + size // 2, cy + size // 3),
+            (cx + size // 4, cy + size // 2)
+        ]
+        pygame.draw.polygon(surface, color, flag_points)
+        pygame.draw.polygon(surface, (0, 0, 0), flag_points, 2)
+        # Flag pattern
+        if color == (255, 255, 0):  # Yellow flag
+            pygame.draw.line(surface, (200, 0, 0),
+                             (cx + size // 4 + 2, cy + size // 6 + 5),
+                             (cx + size // 4 + size // 2 - 2, cy + size // 3 - 5), 2)
+
+
+class SpriteAtlas:
+    """
+    Every sprite of one cell size on a single transparent surface, one slot
+    of cell_size + 2 * PAD pixels per (shape, color) in a row: walls, food
+    and ghosts in their settings colors, a Pacman and a flag per team color.
+    Drawn with draw_sprite, so a blit gives the same pixels as drawing in
+    place. Saved to cache_dir under a name covering everything it depends
+    on; loaded tells whether it came from there.
+    """
+    PAD = 12  # Room around each cell for sprites that stick out of it
+
+    def __init__(self, cell_size: int, colors: List[Tuple[int, int, int]], cache_dir: Optional[str] = None):
+        self.cell_size = cell_size
+        self.keys = [('wall', tuple(settings.COLOR_WALL)), ('food', tuple(settings.COLOR_FOOD)),
+                     ('ghost', tuple(settings.COLOR_GHOST))]
+        for color in dict.fromkeys(tuple(color) for color in colors):
+            self.keys += [('pacman', color), ('flag', color)]
+        self.slots = {key: i for i, key in enumerate(self.keys)}
+        self.span = cell_size + 2 * self.PAD
+        self.loaded = False
+        self.path = None
+        if cache_dir:
+            digest = hashlib.sha1(repr((ATLAS_VERSION, cell_size, self.keys)).encode()).hexdigest()[:16]
+            self.path = os.path.join(cache_dir, f"atlas-{cell_size}-{digest}.png")
+        self.surface = self._load() or self._draw()
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()  # Blits faster in the window's pixel format
+
+    def _load(self) -> Optional[pygame.Surface]:
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        try:
+            surface = pygame.image.load(self.path)
+        except pygame.error:
+            return None  # Damaged file, drawn again
+        if surface.get_size() != (self.span * len(self.keys), self.span):
+            return None
+        self.loaded = True
+        return surface
+
+    def _draw(self) -> pygame.Surface:
+        surface = pygame.Surface((self.span * len(self.keys), self.span), pygame.SRCALPHA)
+        for i, (shape, color) in enumerate(self.keys):
+            draw_sprite(surface, shape, color, pygame.Rect(i * self.span + self.PAD, self.PAD,
+                                                           self.cell_size, self.cell_size))
+        if self.path is not None:
+            _replace_file(self.path, lambda temporary: pygame.image.save(surface, temporary))
+        return surface
+
+    def blit(self, target: pygame.Surface, shape: str, color: Tuple[int, int, int], x: int, y: int):
+        """Draw a sprite with its cell's top-left corner at (x, y), in place if it is not in the atlas"""
+        slot = self.slots.get((shape, tuple(color)))
+        if slot is None:
+            draw_sprite(target, shape, color, pygame.Rect(x, y, self.cell_size, self.cell_size))
+            return
+        target.blit(self.surface, (x - self.PAD, y - self.PAD),
+                    pygame.Rect(slot * self.span, 0, self.span, self.span))
@@ -1,12 +1,18 @@
-
-
 # visualization/console_display.py
+import time
 from typing import List, Tuple, Dict
+from config import settings
 
 class ConsoleDisplay:
-    def __init__(self, grid, flag_colors: Dict[str, Tuple[int, int, int]]):
+    interactive = False
+
+    def __init__(self, grid, flag_colors: Dict[str, Tuple[int, int, int]], scores: Dict[str, dict] = None,
+                 high_scores: Dict[str, int] = None):
         self.grid = grid
         self.flag_colors = flag_colors
+        self.scores = scores or {}
+        self.high_scores = high_scores or {}
+        self.show_help = False
         self.symbols = {
             'P': 'P',
             'G': 'G',
@@ -16,19 +22,24 @@ class ConsoleDisplay:
             ' ': ' '
         }
 
-    def render(self, pacman_positions: List[Tuple[Tuple[int, int], Tuple[int, int, int]]], 
-               ghost_positions: List[Tuple[int, int]]):
-        grid = self.grid.get_grid()
+    def reset(self):
+        self.show_help = False
+
+    def render(self, pacman_positions: List[Tuple[Tuple[int, int], Tuple[int, int, int]]],
+               ghost_positions: List[Tuple[int, int]], scores: Dict[str, dict] = None):
+        pacman_cells = {p[0] for p in pacman_positions}
+        ghost_cells = set(ghost_positions)
+        flag_cells = {(fx, fy) for fx, fy, _ in self.grid.flag_positions}
         display = []
         for y in range(self.grid.height):
             row = []
             for x in range(self.grid.width):
                 pos = (x, y)
-                if pos in [p[0] for p in pacman_positions]:
+                if pos in pacman_cells:
                     row.append('P')
-                elif pos in ghost_positions:
+                elif pos in ghost_cells:
                     row.append('G')
-                elif any(pos == (fx, fy) for fx, fy, _ in self.grid.flag_positions):
+                elif pos in flag_cells:
                     row.append('F')
                 elif pos in self.grid.food_positions:
                     row.append('.')
@@ -39,6 +50,24 @@ class ConsoleDisplay:
             display.append(''.join(row))
         for line in display:
             print(line)
+        for flag_id, score_data in (scores or {}).items():
+            print(f"{flag_id}: {score_data['traditional']} points, "
+                  f"intelligence {score_data['intelligence']:.1f}/10")
+
+    def render_game_over(self, message: str, victory: bool = False):
+        print(message)
+        for flag_id, score_data in self.scores.items():
+            print(f"{flag_id} final score: {score_data['traditional']} points, "
+                  f"intelligence {score_data['intelligence']:.1f}/10")
+
+    def add_score_popup(self, text: str, x: int, y: int):
+        pass  # The game already prints scoring events
+
+    def poll_events(self) -> List[str]:
+        return []
+
+    def wait(self, game_over: bool):
+        time.sleep(1 / settings.FPS)
 
     def close(self):
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,23 @@
+# visualization/display_factory.py
+import importlib
+from typing import Tuple, Dict, Optional
+from config import settings
+
+# Display backends selectable by name: module and class, imported on first use
+# so that headless backends never load pygame
+DISPLAY_BACKENDS = {
+    "null": ("visualization.null_display", "NullDisplay"),
+    "console": ("visualization.console_display", "ConsoleDisplay"),
+    "pygame": ("visualization.pygame_display", "PygameDisplay"),
+    "frames": ("visualization.frame_export", "FrameExportDisplay"),
+}
+
+def create_display(grid, flag_colors: Dict[str, Tuple[int, int, int]], scores: Dict[str, dict],
+                   high_scores: Dict[str, int], backend: Optional[str] = None):
+    """Create the display for a game, backend defaults to settings.DISPLAY_BACKEND"""
+    backend = backend or settings.DISPLAY_BACKEND
+    if backend not in DISPLAY_BACKENDS:
+        raise ValueError(f"Unknown display backend '{backend}', expected one of {sorted(DISPLAY_BACKENDS)}")
+    module, name = DISPLAY_BACKENDS[backend]
+    display_class = getattr(importlib.import_module(module), name)
+    return display_class(grid, flag_colors, scores, high_scores)
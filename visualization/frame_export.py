@@ -0,0 +1,143 @@
+# visualization/frame_export.py
+import os
+import queue
+import struct
+import threading
+import zlib
+from typing import List, Tuple, Dict
+import numpy as np
+import pygame
+from config import settings
+from visualization.pygame_display import PygameDisplay
+
+def write_png(path: str, data: bytes, size: Tuple[int, int], level: int = 6):
+    """Write raw RGB bytes as a PNG file (zlib releases the GIL while compressing)"""
+    width, height = size
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # Each row starts with filter type 0
+    rows[:, 1:] = np.frombuffer(data, dtype=np.uint8).reshape(height, width * 3)
+
+    def chunk(kind: bytes, payload: bytes) -> bytes:
+        return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), level)))
+        f.write(chunk(b"IEND", b""))
+
+
+class FrameEncoder:
+    """
+    Background thread turning raw RGB frames into files, so recording costs
+    the game loop one byte copy per frame. Formats: "png" (numbered images in
+    a directory), "gif" (one animated file, needs Pillow) or "array" (NumPy
+    RGB arrays kept in frames, for analysis and tests).
+    """
+
+    def __init__(self, path: str, fmt: str, size: Tuple[int, int], frame_ms: int, max_pending: int = 256):
+        if fmt not in ("png", "gif", "array"):
+            raise ValueError(f"Unknown frame format '{fmt}', expected 'png', 'gif' or 'array'")
+        self.path = path
+        self.format = fmt
+        self.size = size
+        self.frame_ms = frame_ms
+        self.frames: List[np.ndarray] = []  # Decoded frames in "array" format
+        self.written = 0
+        self.error = None
+        self._gif_frames = []
+        if fmt == "png":
+            os.makedirs(path, exist_ok=True)
+        elif fmt == "gif":
+            from PIL import Image  # Optional dependency, only needed for GIF export
+            self._image = Image
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._queue = queue.Queue(maxsize=max_pending)  # Bounds memory if encoding falls far behind
+        self._thread = threading.Thread(target=self._encode_loop, name="frame-encoder", daemon=True)
+        self._thread.start()
+
+    def submit(self, data: bytes):
+        self._queue.put(data)
+
+    def close(self):
+        """Encode the remaining frames and finish the output file"""
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _encode_loop(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            try:
+                self._encode(data)
+            except Exception as error:  # Reported by close(), recording keeps draining the queue
+                self.error = self.error or error
+        try:
+            if self.format == "gif" and self._gif_frames:
+                first, rest = self._gif_frames[0], self._gif_frames[1:]
+                first.save(self.path, save_all=True, append_images=rest, duration=self.frame_ms, loop=0)
+        except Exception as error:
+            self.error = self.error or error
+
+    def _encode(self, data: bytes):
+        width, height = self.size
+        if self.format == "png":
+            write_png(os.path.join(self.path, f"frame_{self.written:05d}.png"), data, self.size)
+        elif self.format == "gif":
+            # Quantize as frames arrive so only palette images stay in memory
+            self._gif_frames.append(self._image.frombytes("RGB", self.size, data).quantize(
+                colors=256, method=self._image.Quantize.FASTOCTREE))
+        else:
+            self.frames.append(np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3))
+        self.written += 1
+
+
+class FrameExportDisplay(PygameDisplay):
+    """
+    Pygame renderer drawing into an offscreen surface, with every frame
+    handed to a FrameEncoder. Works without a screen through SDL's dummy
+    video driver and never waits between frames.
+    """
+    interactive = False
+
+    def __init__(self, grid, flag_colors: Dict[str, Tuple[int, int, int]], scores: Dict[str, dict],
+                 high_scores: Dict[str, int], path: str = None, fmt: str = None):
+        self._video_driver = os.environ.get("SDL_VIDEODRIVER")  # Put back on close for later pygame users
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Headless boxes have no display
+        super().__init__(grid, flag_colors, scores, high_scores)
+        self.fps = 0  # Render as fast as the game runs
+        self.frames = 0  # Frames presented, the clock of the animations
+        fmt = fmt or settings.FRAME_EXPORT_FORMAT
+        path = path or settings.FRAME_EXPORT_PATH
+        if fmt == "gif" and not path.endswith(".gif"):
+            path += ".gif"
+        self.encoder = FrameEncoder(path, fmt, (self.width, self.height), 1000 // settings.FPS)
+
+    def create_screen(self) -> pygame.Surface:
+        return pygame.Surface((self.width, self.height))
+
+    def present(self):
+        self.encoder.submit(pygame.image.tobytes(self.screen, "RGB"))
+        self.frames += 1
+
+    def now(self) -> float:
+        # Recordings play at settings.FPS, so animations advance one frame's time per frame
+        return self.frames / settings.FPS
+
+    def poll_events(self) -> List[str]:
+        return []
+
+    def wait(self, game_over: bool):
+        pass
+
+    def close(self):
+        try:
+            self.encoder.close()
+        finally:
+            pygame.quit()
+            if self._video_driver is None:
+                os.environ.pop("SDL_VIDEODRIVER", None)
+            else:
+                os.environ["SDL_VIDEODRIVER"] = self._video_driver
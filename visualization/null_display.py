@@ -0,0 +1,31 @@
+# visualization/null_display.py
+from typing import List, Tuple, Dict
+
+class NullDisplay:
+    """Display that draws nothing, for headless simulation"""
+    interactive = False
+
+    def __init__(self, grid, flag_colors: Dict[str, Tuple[int, int, int]], scores: Dict[str, dict], high_scores: Dict[str, int]):
+        self.grid = grid
+        self.show_help = False
+
+    def reset(self):
+        pass
+
+    def render(self, pacman_positions=None, ghost_positions=None, scores=None):
+        pass
+
+    def render_game_over(self, message: str, victory: bool = False):
+        pass
+
+    def add_score_popup(self, text: str, x: int, y: int):
+        pass
+
+    def poll_events(self) -> List[str]:
+        return []
+
+    def wait(self, game_over: bool):
+        pass
+
+    def close(self):
+        pass
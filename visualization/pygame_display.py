@@ -1,49 +1,138 @@
 # visualization/pygame_display.py
+import time
 import pygame
 from config import settings
+from environment.grid import CELL_WALL, CELL_FOOD
+from visualization.animation import GlyphCache, PopupPool
+from visualization.assets import SpriteAtlas, load_font
+from visualization.viewport import Camera, ChunkCache, Minimap
 from typing import List, Tuple, Dict
 
 class PygameDisplay:
+    interactive = True  # Shown in a window and driven by keyboard events
+
     def __init__(self, grid, flag_colors: Dict[str, Tuple[int, int, int]], scores: Dict[str, dict], high_scores: Dict[str, int]):
         pygame.init()
         self.grid = grid
         self.flag_colors = flag_colors
         self.scores = scores
         self.high_scores = high_scores
-        self.cell_size = settings.CELL_SIZE
+        self.cell_size = settings.CELL_SIZE  # Current zoom, the layout below keeps the configured size
         self.fps = settings.FPS
-        self.padding = self.cell_size
-        self.status_bar_width = self.cell_size * 18  # Increased for better visibility
-        self.width = self.grid.width * self.cell_size + self.padding * 2 + self.status_bar_width
-        self.height = max(self.grid.height * self.cell_size + self.padding * 2, 600)
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Pacman AI - Intelligent Scoring System")
+        self.padding = settings.CELL_SIZE
+        self.status_bar_width = settings.CELL_SIZE * 18  # Increased for better visibility
+        # Maps larger than the view scroll in it
+        self.view_width = min(self.grid.width * self.cell_size, settings.VIEW_MAX_WIDTH)
+        self.view_height = min(self.grid.height * self.cell_size, settings.VIEW_MAX_HEIGHT)
+        self.width = self.view_width + self.padding * 2 + self.status_bar_width
+        self.height = max(self.view_height + self.padding * 2, 600)
+        self.screen = self.create_screen()
         self.clock = pygame.time.Clock()
-        
-        # Font setup with larger sizes for clarity
-        base_font_size = max(14, min(18, self.cell_size // 2))  # Increased base font size
-        self.font = pygame.font.SysFont('Arial', base_font_size)
-        self.large_font = pygame.font.SysFont('Arial', base_font_size + 12)  # Larger for headers
-        self.title_font = pygame.font.SysFont('Arial', base_font_size + 20)
+
+        self.camera = Camera(self.grid.width, self.grid.height, self.view_width, self.view_height, self.cell_size)
+        self.follow = settings.CAMERA_FOLLOW  # Index of the Pacman kept in view, None for a free camera
+        self.chunks = ChunkCache(self.grid, self.cell_size, self.draw_cell, (50, 50, 150),
+                                 settings.VIEW_CHUNK_CELLS, settings.VIEW_CHUNK_CACHE)
+        self.minimap = None
+        self.show_minimap = settings.MINIMAP_SIZE > 0
+        if self.show_minimap:
+            food = tuple(c // 2 for c in settings.COLOR_FOOD)  # Dimmed so the markers stand out
+            self.minimap = Minimap(self.grid, settings.MINIMAP_SIZE, ((50, 50, 150), settings.COLOR_WALL, food))
+        
+        # Font setup with larger sizes for clarity, the font file is looked up once and cached
+        base_font_size = max(14, min(18, settings.CELL_SIZE // 2))  # Increased base font size
+        self.font = load_font('Arial', base_font_size, settings.ASSET_CACHE_DIR)
+        self.large_font = load_font('Arial', base_font_size + 12, settings.ASSET_CACHE_DIR)  # Larger for headers
+        self.title_font = load_font('Arial', base_font_size + 20, settings.ASSET_CACHE_DIR)
+        self.atlases: Dict[int, SpriteAtlas] = {}  # Sprites by cell size, baked or loaded on first use
+        self.sidebar_background = None  # Gradient behind the status bar, drawn on first use
         
         self.move_count = 0
-        self.score_popups = []
+        self.score_popups = PopupPool(GlyphCache(self.font), settings.POPUP_CAPACITY,
+                                      settings.POPUP_SECONDS, settings.POPUP_RISE)
         self.score_highlights = {}  # Track score changes for highlight effect
         self.previous_scores = {flag_id: {"traditional": 0, "intelligence": 0.0} for flag_id in scores}
         self.show_help = False
-        self.help_surface = None
-        self.prepare_help_surface()
+        self.help_surface = None  # Rendered on the first H press
+
+    def reset(self):
+        """Clear the per-episode effects, for a restart in the same window"""
+        self.move_count = 0
+        self.score_popups.clear()
+        self.score_highlights.clear()
+        for previous in self.previous_scores.values():
+            previous["traditional"], previous["intelligence"] = 0, 0.0
+        self.show_help = False
+        self.chunks.invalidate()  # The food is back
+        if self.minimap is not None:
+            self.minimap.refresh()
+
+    def create_screen(self) -> pygame.Surface:
+        """Open the game window and return its surface"""
+        screen = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption("Pacman AI - Intelligent Scoring System")
+        return screen
+
+    def present(self):
+        """Show the finished frame"""
+        pygame.display.flip()
+
+    def poll_events(self) -> List[str]:
+        """Translate pending window events into game commands ("quit", "restart", "help")"""
+        commands = []
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                commands.append("quit")
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r and pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                    commands.append("restart")
+                elif event.key == pygame.K_h:  # Toggle help
+                    commands.append("help")
+                else:
+                    self.handle_camera_key(event.key)
+            elif event.type == pygame.MOUSEWHEEL:
+                self.zoom(event.y)
+        return commands
+
+    def handle_camera_key(self, key: int):
+        """Arrows scroll (and stop following), +/- zoom, TAB follows the next Pacman, M toggles the minimap"""
+        step_x, step_y = self.view_width // 4, self.view_height // 4
+        pans = {pygame.K_LEFT: (-step_x, 0), pygame.K_RIGHT: (step_x, 0),
+                pygame.K_UP: (0, -step_y), pygame.K_DOWN: (0, step_y)}
+        if key in pans:
+            self.follow = None
+            self.camera.pan(*pans[key])
+        elif key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.zoom(1)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.zoom(-1)
+        elif key == pygame.K_TAB:
+            self.follow = 0 if self.follow is None else (self.follow + 1) % len(self.grid.pacman_start_positions)
+        elif key == pygame.K_m:
+            self.show_minimap = self.minimap is not None and not self.show_minimap
+
+    def zoom(self, steps: int):
+        """Move steps zoom levels in (positive) or out, redrawing the static layer at the new size"""
+        levels = sorted(set(settings.ZOOM_LEVELS) | {settings.CELL_SIZE})
+        current = min(range(len(levels)), key=lambda i: abs(levels[i] - self.cell_size))
+        size = levels[max(0, min(len(levels) - 1, current + steps))]
+        if size != self.cell_size:
+            self.cell_size = size
+            self.camera.zoom(size)
+            self.chunks.invalidate(size)
+
+    def wait(self, game_over: bool):
+        """Pace the main loop between frames"""
+        if game_over:
+            pygame.time.wait(100)
+        else:
+            self.clock.tick(settings.FPS)
 
     def prepare_help_surface(self):
-        """Pre-render the help surface for better performance"""
+        """Render the help surface, tall enough for its text and scaled down when the window is shorter"""
         help_width = min(800, self.width - 100)
-        help_height = min(600, self.height - 100)
-        self.help_surface = pygame.Surface((help_width, help_height))
-        self.help_surface.fill((0, 0, 50))
-        pygame.draw.rect(self.help_surface, (100, 100, 200), (0, 0, help_width, help_height), 3)
-        
         title = self.title_font.render("INTELLIGENT SCORING SYSTEM", True, (255, 255, 0))
-        self.help_surface.blit(title, (help_width//2 - title.get_width()//2, 30))
+        lines = [(title, help_width//2 - title.get_width()//2, 30)]
         
         y_offset = 80
         explanations = [
@@ -55,115 +144,49 @@ class PygameDisplay:
             ("- Safety Score (10%)", "Avoiding ghosts and dangerous areas"),
             ("", "Press H to close this help"),
             ("CONTROLS", "SHIFT+R: Restart game"),
+            ("", "Arrows: Scroll, +/-: Zoom, TAB: Follow next Pacman, M: Minimap"),
             ("", "ESC: Quit game")
         ]
         
         for label, text in explanations:
             if label:
-                label_surf = self.large_font.render(label, True, (255, 255, 0))
-                self.help_surface.blit(label_surf, (40, y_offset))
+                lines.append((self.large_font.render(label, True, (255, 255, 0)), 40, y_offset))
                 y_offset += 35
             if text:
-                text_surf = self.font.render(text, True, (255, 255, 255))
-                self.help_surface.blit(text_surf, (60, y_offset))
+                lines.append((self.font.render(text, True, (255, 255, 255)), 60, y_offset))
                 y_offset += 30
             y_offset += 10
 
+        help_height = y_offset + 20
+        surface = pygame.Surface((help_width, help_height))
+        surface.fill((0, 0, 50))
+        pygame.draw.rect(surface, (100, 100, 200), (0, 0, help_width, help_height), 3)
+        for line, x, y in lines:
+            surface.blit(line, (x, y))
+        room = self.height - 40
+        if help_height > room:  # Shrink the whole page rather than cut its last lines
+            surface = pygame.transform.smoothscale(surface, (help_width * room // help_height, room))
+        self.help_surface = surface
+
+    def sprites(self) -> SpriteAtlas:
+        """Sprite atlas of the current cell size"""
+        atlas = self.atlases.get(self.cell_size)
+        if atlas is None:
+            atlas = SpriteAtlas(self.cell_size, list(self.flag_colors.values()), settings.ASSET_CACHE_DIR)
+            self.atlases[self.cell_size] = atlas
+        return atlas
+
+    def draw_cell(self, surface: pygame.Surface, rect: pygame.Rect, cell: int):
+        """Draw a cell of the static layer into rect (empty cells are left as they are)"""
+        if cell == CELL_WALL:
+            self.sprites().blit(surface, 'wall', settings.COLOR_WALL, rect.x, rect.y)
+        elif cell == CELL_FOOD:
+            self.sprites().blit(surface, 'food', settings.COLOR_FOOD, rect.x, rect.y)
+
     def draw_shape(self, x: int, y: int, shape: str, color: Tuple[int, int, int]):
-        """Draw game elements with enhanced visuals"""
-        cx = x * self.cell_size + self.padding
-        cy = y * self.cell_size + self.padding
-        size = self.cell_size
-        rect = pygame.Rect(cx, cy, size, size)
-        
-        if shape == 'rect':  # Walls
-            pygame.draw.rect(self.screen, settings.COLOR_WALL, rect)
-            pygame.draw.rect(self.screen, (50, 50, 150), rect, 2)
-            # Add texture to walls
-            for i in range(0, size, 4):
-                pygame.draw.line(self.screen, (70, 70, 120), 
-                               (cx, cy + i), (cx + size, cy + i), 1)
-        
-        elif shape == 'circle':  # Food
-            center = rect.center
-            radius = int(size * 0.15)
-            pygame.draw.circle(self.screen, settings.COLOR_FOOD, center, radius)
-            # Add shine effect
-            pygame.draw.circle(self.screen, (255, 255, 150), 
-                             (center[0] - radius//3, center[1] - radius//3), 
-                             radius//4)
-        
-        elif shape == 'pacman':
-            center = rect.center
-            radius = int(size * 0.4)
-            # Body with gradient effect
-            for r in range(radius, 0, -2):
-                alpha = 255 * r // radius
-                color_with_alpha = (color[0], color[1], color[2], alpha)
-                s = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
-                pygame.draw.circle(s, color_with_alpha, (r, r), r)
-                self.screen.blit(s, (center[0]-r, center[1]-r))
-            
-            # Mouth
-            pygame.draw.polygon(self.screen, (0, 0, 0), [
-                center,
-                (center[0] + radius, center[1] - radius // 2),
-                (center[0] + radius, center[1] + radius // 2)
-            ])
-            # Eye
-            eye_pos = (center[0] - radius//3, center[1] - radius//3)
-            pygame.draw.circle(self.screen, (0, 0, 0), eye_pos, radius//6)
-        
-        elif shape == 'ghost':
-            # Body with outline
-            body_rect = pygame.Rect(cx + 2, cy + size * 0.2, size - 4, size * 0.6)
-            pygame.draw.rect(self.screen, settings.COLOR_GHOST, body_rect, border_radius=8)
-            pygame.draw.rect(self.screen, (0, 0, 0), body_rect, border_radius=8, width=2)
-            
-            # Wavy bottom
-            wave_points = []
-            for i in range(5):
-                wave_x = cx + 2 + (size - 4) * i / 4
-                wave_y = cy + size * 0.8 + (10 if i % 2 == 0 else -5)
-                wave_points.append((wave_x, wave_y))
-            wave_points.append((cx + size - 2, cy + size * 0.8))
-            wave_points.append((cx + 2, cy + size * 0.8))
-            pygame.draw.polygon(self.screen, settings.COLOR_GHOST, wave_points)
-            pygame.draw.polygon(self.screen, (0, 0, 0), wave_points, 2)
-            
-            # Eyes
-            eye_radius = size // 6
-            eye_y = int(cy + size * 0.35)
-            left_eye_pos = (cx + size // 3, eye_y)
-            right_eye_pos = (cx + 2 * size // 3, eye_y)
-            
-            pygame.draw.circle(self.screen, (255, 255, 255), left_eye_pos, eye_radius)
-            pygame.draw.circle(self.screen, (255, 255, 255), right_eye_pos, eye_radius)
-            
-            # Pupils (look toward nearest pacman)
-            pupil_radius = size // 10
-            pygame.draw.circle(self.screen, (0, 0, 100), left_eye_pos, pupil_radius)
-            pygame.draw.circle(self.screen, (0, 0, 100), right_eye_pos, pupil_radius)
-        
-        elif shape == 'flag':
-            # Pole
-            pole_color = (100, 100, 100)
-            pygame.draw.line(self.screen, pole_color, 
-                           (cx + size // 4, cy + size // 6), 
-                           (cx + size // 4, cy + size * 0.9), 5)
-            # Flag
-            flag_points = [
-                (cx + size // 4, cy + size // 6),
-                (cx + size // 4 + size // 2, cy + size // 3),
-                (cx + size // 4, cy + size // 2)
-            ]
-            pygame.draw.polygon(self.screen, color, flag_points)
-            pygame.draw.polygon(self.screen, (0, 0, 0), flag_points, 2)
-            # Flag pattern
-            if color == (255, 255, 0):  # Yellow flag
-                pygame.draw.line(self.screen, (200, 0, 0), 
-                               (cx + size // 4 + 2, cy + size // 6 + 5),
-                               (cx + size // 4 + size // 2 - 2, cy + size // 3 - 5), 2)
+        """Draw the sprite of a game element at cell (x, y)"""
+        vx, vy = self.camera.to_view(x, y)
+        self.sprites().blit(self.screen, shape, color, vx + self.padding, vy + self.padding)
 
     def render(self, pacman_positions: List[Tuple[Tuple[int, int], Tuple[int, int, int]]] = None, 
                ghost_positions: List[Tuple[int, int]] = None, scores: Dict[str, dict] = None):
@@ -174,38 +197,53 @@ class PygameDisplay:
         # Clear screen with dark background
         self.screen.fill(settings.COLOR_BG)
         
+        # Keep the followed Pacman in view
+        if self.follow is not None and self.follow < len(pacman_positions):
+            self.camera.center_on(pacman_positions[self.follow][0])
+
         # Draw game area border with glow effect
         border_rect = pygame.Rect(
             self.padding - 5, 
             self.padding - 5, 
-            self.grid.width * self.cell_size + 10, 
-            self.grid.height * self.cell_size + 10
+            self.view_width + 10,
+            self.view_height + 10
         )
         pygame.draw.rect(self.screen, (50, 50, 150), border_rect, 0)
         pygame.draw.rect(self.screen, settings.COLOR_BORDER, border_rect, 5)
         
-        # Draw grid elements
-        for y in range(self.grid.height):
-            for x in range(self.grid.width):
-                pos = (x, y)
-                if pos in self.grid.walls:
-                    self.draw_shape(x, y, 'rect', settings.COLOR_WALL)
-                elif pos in self.grid.food_positions:
-                    self.draw_shape(x, y, 'circle', settings.COLOR_FOOD)
+        # Static layer: only the cached chunks in view, clipped to the game area
+        view_rect = pygame.Rect(self.padding, self.padding, self.view_width, self.view_height)
+        self.screen.set_clip(view_rect)
+        changed = self.chunks.sync()
+        self.chunks.blit(self.screen, self.camera, (self.padding, self.padding))
         
         # Draw flags with team colors
         for fx, fy, flag_id in self.grid.flag_positions:
-            color = self.flag_colors.get(flag_id, (255, 255, 255))
-            self.draw_shape(fx, fy, 'flag', color)
+            if self.camera.is_visible((fx, fy)):
+                color = self.flag_colors.get(flag_id, (255, 255, 255))
+                self.draw_shape(fx, fy, 'flag', color)
         
         # Draw ghosts
         for gx, gy in ghost_positions:
-            self.draw_shape(gx, gy, 'ghost', settings.COLOR_GHOST)
+            if self.camera.is_visible((gx, gy)):
+                self.draw_shape(gx, gy, 'ghost', settings.COLOR_GHOST)
         
         # Draw pacmans with their team colors
         for (px, py), color in pacman_positions:
-            if self.grid.is_valid((px, py)):
+            if self.grid.is_valid((px, py)) and self.camera.is_visible((px, py)):
                 self.draw_shape(px, py, 'pacman', color)
+
+        # Render score pop-ups
+        self.render_score_popups()
+        self.screen.set_clip(None)
+
+        # Minimap in the top-right corner of the game area, when the map does not fit
+        if self.minimap is not None:
+            self.minimap.food_changed(changed)
+            if self.show_minimap and self.camera.scrolls:
+                origin = (self.padding + self.view_width - self.minimap.size[0] - 8, self.padding + 8)
+                markers = [(pos, settings.COLOR_GHOST) for pos in ghost_positions] + pacman_positions
+                self.minimap.blit(self.screen, origin, self.camera, markers)
         
         # Detect score changes for highlight effect
         for flag_id, score_data in scores.items():
@@ -225,28 +263,25 @@ class PygameDisplay:
         # Render sidebar with detailed scores
         self.render_status_bar(scores)
         
-        # Render score pop-ups
-        self.render_score_popups()
-        
         # Show help if toggled
         if self.show_help:
             self.render_help()
         
-        pygame.display.flip()
+        self.present()
         self.clock.tick(self.fps)
 
     def render_status_bar(self, scores: Dict[str, dict]):
-        sidebar_x = self.grid.width * self.cell_size + self.padding
+        sidebar_x = self.view_width + self.padding
         sidebar_y = self.padding
         sidebar_height = self.height - self.padding * 2
         
         # Sidebar background with gradient
-        for y in range(sidebar_y, sidebar_y + sidebar_height):
-            alpha = 255 * (y - sidebar_y) // sidebar_height
-            color = (30, 30, 80, alpha)
-            s = pygame.Surface((self.status_bar_width, 1), pygame.SRCALPHA)
-            s.fill(color)
-            self.screen.blit(s, (sidebar_x, y))
+        if self.sidebar_background is None:
+            self.sidebar_background = pygame.Surface((self.status_bar_width, sidebar_height), pygame.SRCALPHA)
+            for y in range(sidebar_height):
+                alpha = 255 * y // sidebar_height
+                self.sidebar_background.fill((30, 30, 80, alpha), (0, y, self.status_bar_width, 1))
+        self.screen.blit(self.sidebar_background, (sidebar_x, sidebar_y))
         
         # Sidebar border
         pygame.draw.rect(self.screen, (100, 100, 200), 
@@ -324,6 +359,8 @@ class PygameDisplay:
 
     def render_help(self):
         """Render the help overlay"""
+        if self.help_surface is None:
+            self.prepare_help_surface()
         help_x = (self.width - self.help_surface.get_width()) // 2
         help_y = (self.height - self.help_surface.get_height()) // 2
         
@@ -336,23 +373,14 @@ class PygameDisplay:
         self.screen.blit(self.help_surface, (help_x, help_y))
 
     def render_score_popups(self):
-        """Render animated score pop-ups"""
-        for popup in self.score_popups[:]:
-            text, x, y, age = popup
-            alpha = max(0, 255 - age * 8)
-            text.set_alpha(alpha)
-            
-            # Add slight movement and fade
-            self.screen.blit(text, (x, y - age * 2))
-            
-            # Update popup state
-            new_popup = (text, x, y, age + 1)
-            popup_index = self.score_popups.index(popup)
-            self.score_popups[popup_index] = new_popup
-            
-            # Remove old popups
-            if age > 30:
-                self.score_popups.remove(new_popup)
+        """Render animated score pop-ups, rising and fading with time and following the camera"""
+        origin = (self.padding - self.camera.x, self.padding - self.camera.y)
+        view_rect = pygame.Rect(self.padding, self.padding, self.view_width, self.view_height)
+        self.score_popups.draw(self.screen, self.now(), origin, self.cell_size, view_rect)
+
+    def now(self) -> float:
+        """Seconds on the clock of the animations"""
+        return time.perf_counter()
 
     def render_game_over(self, message: str, victory: bool = False):
         """Enhanced game over screen with detailed scores"""
@@ -407,7 +435,7 @@ class PygameDisplay:
         restart_rect = restart_surface.get_rect(center=(self.width // 2, y_offset + 40))
         self.screen.blit(restart_surface, restart_rect)
         
-        pygame.display.flip()
+        self.present()
 
     def render_final_score(self, label: str, value: str, x: int, y: int):
         """Render score line in game over screen"""
@@ -426,10 +454,8 @@ class PygameDisplay:
         else:
             popup_color = (255, 255, 255)
         
-        popup_text = self.font.render(text, True, popup_color)
-        popup_x = x * self.cell_size + self.padding
-        popup_y = y * self.cell_size + self.padding
-        self.score_popups.append((popup_text, popup_x, popup_y, 0))
+        # Cell position, placed in the view when drawn
+        self.score_popups.add(text, popup_color, x, y, self.now())
 
     def close(self):
         pygame.quit()
\ No newline at end of file
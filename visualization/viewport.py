@@ -0,0 +1,224 @@
+# visualization/viewport.py
+import math
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+import pygame
+from environment.grid import CELL_EMPTY, CELL_WALL, CELL_FOOD
+
+
+class Camera:
+    """
+    Window of view_width x view_height pixels over the map drawn at cell_size
+    pixels per cell. x and y are the map pixel shown at the top-left corner of
+    the view; a map smaller than the view is centered in it instead.
+    """
+
+    def __init__(self, map_width: int, map_height: int, view_width: int, view_height: int, cell_size: int):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.view_width = view_width
+        self.view_height = view_height
+        self.cell_size = cell_size
+        self.x = self.y = 0
+        self.clamp()
+
+    @property
+    def scrolls(self) -> bool:
+        """Whether part of the map is out of view"""
+        return (self.map_width * self.cell_size > self.view_width or
+                self.map_height * self.cell_size > self.view_height)
+
+    def clamp(self):
+        """Keep the view over the map"""
+        def axis(offset: int, map_pixels: int, view_pixels: int) -> int:
+            if map_pixels <= view_pixels:
+                return -(view_pixels - map_pixels) // 2
+            return max(0, min(offset, map_pixels - view_pixels))
+        self.x = axis(self.x, self.map_width * self.cell_size, self.view_width)
+        self.y = axis(self.y, self.map_height * self.cell_size, self.view_height)
+
+    def center_on(self, pos: Tuple[float, float]):
+        """Put the center of the cell at pos in the middle of the view"""
+        self.x = int((pos[0] + 0.5) * self.cell_size) - self.view_width // 2
+        self.y = int((pos[1] + 0.5) * self.cell_size) - self.view_height // 2
+        self.clamp()
+
+    def center(self) -> Tuple[float, float]:
+        """Map cell (fractional) in the middle of the view"""
+        return ((self.x + self.view_width / 2) / self.cell_size - 0.5,
+                (self.y + self.view_height / 2) / self.cell_size - 0.5)
+
+    def pan(self, dx: int, dy: int):
+        self.x += dx
+        self.y += dy
+        self.clamp()
+
+    def zoom(self, cell_size: int):
+        """Change the cell size, keeping the same cell in the middle of the view"""
+        center = self.center()
+        self.cell_size = cell_size
+        self.center_on(center)
+
+    def visible_cells(self) -> Tuple[int, int, int, int]:
+        """(x0, y0, x1, y1): the cells at least partly in view are x0 <= x < x1, y0 <= y < y1"""
+        size = self.cell_size
+        x0, y0 = max(0, self.x // size), max(0, self.y // size)
+        x1 = min(self.map_width, -(-(self.x + self.view_width) // size))
+        y1 = min(self.map_height, -(-(self.y + self.view_height) // size))
+        return x0, y0, x1, y1
+
+    def is_visible(self, pos: Tuple[int, int]) -> bool:
+        x0, y0, x1, y1 = self.visible_cells()
+        return x0 <= pos[0] < x1 and y0 <= pos[1] < y1
+
+    def to_view(self, x: int, y: int) -> Tuple[int, int]:
+        """View pixel of the top-left corner of cell (x, y)"""
+        return x * self.cell_size - self.x, y * self.cell_size - self.y
+
+
+class ChunkCache:
+    """
+    Static layer of the map (walls and food) pre-rendered in square chunks of
+    chunk_cells cells, so a frame blits the few chunks in view whatever the
+    map size. Chunks are drawn on first sight and the least recently shown are
+    dropped beyond max_chunks. Eaten food is erased from the cached chunks cell
+    by cell, following the grid's food change log.
+    """
+
+    def __init__(self, grid, cell_size: int, draw_cell: Callable[[pygame.Surface, pygame.Rect, int], None],
+                 background: Tuple[int, int, int], chunk_cells: int = 16, max_chunks: int = 64):
+        self.grid = grid
+        self.cell_size = cell_size
+        self.draw_cell = draw_cell  # Draws a cell type into a rect of a surface
+        self.background = background
+        self.chunk_cells = chunk_cells
+        self.max_chunks = max_chunks
+        self.chunks: "OrderedDict[Tuple[int, int], pygame.Surface]" = OrderedDict()
+        self.built = 0  # Chunks drawn since the cache was created
+        self._seen = 0  # Entries of the grid's food log already applied
+
+    def invalidate(self, cell_size: Optional[int] = None):
+        """Drop every chunk, after a zoom or a restart of the map"""
+        if cell_size is not None:
+            self.cell_size = cell_size
+        self.chunks.clear()
+        self._seen = len(self.grid._food_log)
+
+    def sync(self) -> List[Tuple[int, int]]:
+        """Apply the food changes since the last call to the cached chunks and return their positions"""
+        log = self.grid._food_log
+        if len(log) < self._seen:  # The grid was reset behind our back
+            self.invalidate()
+            return []
+        changed = [pos for pos, _ in log[self._seen:]]
+        self._seen = len(log)
+        size, cells = self.cell_size, self.chunk_cells
+        for x, y in changed:
+            chunk = self.chunks.get((x // cells, y // cells))
+            if chunk is not None:
+                rect = pygame.Rect((x % cells) * size, (y % cells) * size, size, size)
+                chunk.fill(self.background, rect)
+                self.draw_cell(chunk, rect, self.grid.cells[y * self.grid.width + x])
+        return changed
+
+    def get(self, cx: int, cy: int) -> pygame.Surface:
+        """Surface of chunk (cx, cy), drawn if it is not cached"""
+        chunk = self.chunks.get((cx, cy))
+        if chunk is not None:
+            self.chunks.move_to_end((cx, cy))
+            return chunk
+        size, cells, grid = self.cell_size, self.chunk_cells, self.grid
+        chunk = pygame.Surface((cells * size, cells * size))
+        chunk.fill(self.background)
+        for y in range(cy * cells, min(grid.height, (cy + 1) * cells)):
+            row = y * grid.width
+            for x in range(cx * cells, min(grid.width, (cx + 1) * cells)):
+                cell = grid.cells[row + x]
+                if cell != CELL_EMPTY:
+                    self.draw_cell(chunk, pygame.Rect((x % cells) * size, (y % cells) * size, size, size), cell)
+        self.chunks[(cx, cy)] = chunk
+        self.built += 1
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def blit(self, target: pygame.Surface, camera: Camera, origin: Tuple[int, int]):
+        """Draw the chunks in view onto target, with the view's top-left corner at origin"""
+        x0, y0, x1, y1 = camera.visible_cells()
+        cells = self.chunk_cells
+        for cy in range(y0 // cells, -(-y1 // cells)):
+            for cx in range(x0 // cells, -(-x1 // cells)):
+                vx, vy = camera.to_view(cx * cells, cy * cells)
+                target.blit(self.get(cx, cy), (origin[0] + vx, origin[1] + vy))
+
+
+class Minimap:
+    """
+    Whole map shrunk to fit max_size pixels: the cell plane is cut into square
+    blocks of cells, one minimap pixel each, colored as wall when mostly walls,
+    food when any food is left and background otherwise. Food changes only
+    recolor their block.
+    """
+
+    def __init__(self, grid, max_size: int, colors: Tuple[Tuple[int, int, int], ...]):
+        self.grid = grid
+        self.colors = np.array(colors, dtype=np.uint8)  # Background, wall, food
+        self.block = max(1, math.ceil(max(grid.width, grid.height) / max_size))
+        self.blocks_x = -(-grid.width // self.block)
+        self.blocks_y = -(-grid.height // self.block)
+        self.scale = max(1, max_size // max(self.blocks_x, self.blocks_y))  # Pixels per block on screen
+        self.size = (self.blocks_x * self.scale, self.blocks_y * self.scale)
+        self.surface = pygame.Surface((self.blocks_x, self.blocks_y))
+        self.refresh()
+
+    def _block_colors(self, cells: np.ndarray) -> np.ndarray:
+        """RGB color of each block of a (blocks_y * block, blocks_x * block) cell array"""
+        b = self.block
+        blocks = cells.reshape(cells.shape[0] // b, b, cells.shape[1] // b, b)
+        walls = (blocks == CELL_WALL).sum(axis=(1, 3))
+        food = (blocks == CELL_FOOD).any(axis=(1, 3))
+        kind = np.where(walls * 2 > b * b, 1, np.where(food, 2, 0))
+        return self.colors[kind]
+
+    def _cells(self) -> np.ndarray:
+        """Cell plane padded with empty cells to whole blocks"""
+        grid = self.grid
+        cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.height, grid.width)
+        return np.pad(cells, ((0, self.blocks_y * self.block - grid.height), (0, self.blocks_x * self.block - grid.width)))
+
+    def refresh(self):
+        """Recolor every block"""
+        pygame.surfarray.blit_array(self.surface, self._block_colors(self._cells()).transpose(1, 0, 2))
+        self._scaled = None
+
+    def food_changed(self, positions: List[Tuple[int, int]]):
+        """Recolor the blocks holding these cells"""
+        if not positions:
+            return
+        grid, b = self.grid, self.block
+        for bx, by in {(x // b, y // b) for x, y in positions}:
+            cells = np.zeros((b, b), dtype=np.uint8)
+            for y in range(by * b, min(grid.height, (by + 1) * b)):
+                row = y * grid.width
+                end = min(grid.width, (bx + 1) * b)
+                cells[y - by * b, :end - bx * b] = np.frombuffer(bytes(grid.cells[row + bx * b:row + end]), dtype=np.uint8)
+            self.surface.set_at((bx, by), tuple(self._block_colors(cells)[0, 0]))
+        self._scaled = None
+
+    def blit(self, target: pygame.Surface, origin: Tuple[int, int], camera: Camera,
+             markers: List[Tuple[Tuple[int, int], Tuple[int, int, int]]]):
+        """Draw the minimap at origin with a dot per marker and the camera's view as a frame"""
+        if self._scaled is None:
+            self._scaled = pygame.transform.scale(self.surface, self.size)
+        target.blit(self._scaled, origin)
+        pixels = self.scale / self.block  # Minimap pixels per cell
+        for (x, y), color in markers:
+            center = (origin[0] + int((x + 0.5) * pixels), origin[1] + int((y + 0.5) * pixels))
+            pygame.draw.circle(target, color, center, max(2, self.scale // 2))
+        view = pygame.Rect(origin[0] + int(camera.x / camera.cell_size * pixels),
+                           origin[1] + int(camera.y / camera.cell_size * pixels),
+                           max(2, int(camera.view_width / camera.cell_size * pixels)),
+                           max(2, int(camera.view_height / camera.cell_size * pixels)))
+        pygame.draw.rect(target, (255, 255, 255), view.clip(pygame.Rect(origin, self.size)), 1)
+        pygame.draw.rect(target, (100, 100, 200), pygame.Rect(origin, self.size).inflate(4, 4), 2)